@@ -65,7 +65,25 @@ class TestAttachmentViewSet(TestAbstractViewSet):
         response = self.retrieve_view(request, pk=pk, format=ext)
         self.assertNotEqual(response.get('Cache-Control'), None)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.content_type, 'image/jpeg')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        size = int(response['Content-Length'])
+        self.assertEqual(len(b''.join(response.streaming_content)), size)
+
+        # partial file download
+        request = self.factory.get('/', HTTP_RANGE='bytes=10-19',
+                                   **self.extra)
+        response = self.retrieve_view(request, pk=pk, format=ext)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'],
+                         'bytes 10-19/{}'.format(size))
+        self.assertEqual(len(b''.join(response.streaming_content)), 10)
+
+        request = self.factory.get(
+            '/', HTTP_RANGE='bytes={}-'.format(size), **self.extra)
+        response = self.retrieve_view(request, pk=pk, format=ext)
+        self.assertEqual(response.status_code, 416)
 
         self.attachment.instance.xform.deleted_at = timezone.now()
         self.attachment.instance.xform.save()
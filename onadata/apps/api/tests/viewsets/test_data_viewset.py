@@ -1835,6 +1835,65 @@ class TestDataViewSet(TestBase):
         self.assertEquals(response.data['features'][0]['geometry']['type'],
                           'Polygon')
 
+    def test_geojson_bbox(self):
+        self._publish_submit_geojson()
+
+        view = DataViewSet.as_view({'get': 'list'})
+        request = self.factory.get(
+            '/', data={'bbox': '36.7,-1.4,36.9,-1.2'}, **self.extra)
+        response = view(request, pk=self.xform.pk, format='geojson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['features']), 4)
+
+        request = self.factory.get(
+            '/', data={'bbox': '30.0,1.0,31.0,2.0'}, **self.extra)
+        response = view(request, pk=self.xform.pk, format='geojson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['features']), 0)
+
+        request = self.factory.get(
+            '/', data={'bbox': '30.0,1.0'}, **self.extra)
+        response = view(request, pk=self.xform.pk, format='geojson')
+        self.assertEqual(response.status_code, 400)
+
+    def test_vector_tile_format(self):
+        self._publish_submit_geojson()
+
+        view = DataViewSet.as_view({'get': 'list'})
+        # clustered world tile
+        request = self.factory.get(
+            '/', data={'z': 0, 'x': 0, 'y': 0}, **self.extra)
+        response = view(request, pk=self.xform.pk, format='mvt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'],
+                         'application/vnd.mapbox-vector-tile')
+        self.assertTrue(len(response.content) > 0)
+
+        # cached until the data changes
+        with patch('onadata.libs.utils.tile_tools.connection') as mock_conn:
+            response = view(request, pk=self.xform.pk, format='mvt')
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(mock_conn.cursor.called)
+
+        # unclustered tile with the 36.787219, -1.294197 submissions
+        request = self.factory.get(
+            '/', data={'z': 16, 'x': 39464, 'y': 33003}, **self.extra)
+        response = view(request, pk=self.xform.pk, format='mvt')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(len(response.content) > 0)
+
+        # empty tile
+        request = self.factory.get(
+            '/', data={'z': 16, 'x': 0, 'y': 0}, **self.extra)
+        response = view(request, pk=self.xform.pk, format='mvt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+
+        request = self.factory.get(
+            '/', data={'z': 1, 'x': 2, 'y': 0}, **self.extra)
+        response = view(request, pk=self.xform.pk, format='mvt')
+        self.assertEqual(response.status_code, 400)
+
     def test_data_in_public_project(self):
         self._make_submissions()
 
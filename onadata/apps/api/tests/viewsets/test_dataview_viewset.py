@@ -6,7 +6,6 @@ from builtins import open
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.test.utils import override_settings
-from django.core.cache import cache
 from django.core.files.storage import default_storage
 from django.utils.timezone import utc
 from mock import patch
@@ -24,7 +23,9 @@ from onadata.libs.serializers.xform_serializer import XFormSerializer
 from onadata.libs.utils.cache_tools import (
     DATAVIEW_COUNT,
     DATAVIEW_LAST_SUBMISSION_TIME,
-    PROJECT_LINKED_DATAVIEWS)
+    PROJECT_LINKED_DATAVIEWS,
+    cache_get,
+    cache_set)
 from onadata.libs.utils.common_tags import EDITED, MONGO_STRFTIME
 from onadata.apps.api.viewsets.xform_viewset import XFormViewSet
 from onadata.libs.utils.common_tools import (
@@ -1059,8 +1060,8 @@ class TestDataViewViewSet(TestAbstractViewSet):
 
         self.assertEquals(response.status_code, 200)
 
-        cached_dataviews = cache.get('{}{}'.format(PROJECT_LINKED_DATAVIEWS,
-                                                   self.project.pk))
+        cached_dataviews = cache_get(PROJECT_LINKED_DATAVIEWS,
+                                     self.project.pk)
 
         self.assertIsNotNone(cached_dataviews)
 
@@ -1068,8 +1069,7 @@ class TestDataViewViewSet(TestAbstractViewSet):
         self.data_view.name = "updated name"
         self.data_view.save()
 
-        updated_cache = cache.get('{}{}'.format(PROJECT_LINKED_DATAVIEWS,
-                                                self.project.pk))
+        updated_cache = cache_get(PROJECT_LINKED_DATAVIEWS, self.project.pk)
 
         self.assertIsNone(updated_cache)
 
@@ -1078,30 +1078,28 @@ class TestDataViewViewSet(TestAbstractViewSet):
 
         self.assertEquals(response.status_code, 200)
 
-        cached_dataviews = cache.get('{}{}'.format(PROJECT_LINKED_DATAVIEWS,
-                                                   self.project.pk))
+        cached_dataviews = cache_get(PROJECT_LINKED_DATAVIEWS,
+                                     self.project.pk)
 
         self.assertIsNotNone(cached_dataviews)
 
         self.data_view.delete()
 
-        updated_cache = cache.get('{}{}'.format(PROJECT_LINKED_DATAVIEWS,
-                                                self.project.pk))
+        updated_cache = cache_get(PROJECT_LINKED_DATAVIEWS, self.project.pk)
         self.assertIsNone(updated_cache)
 
     def test_dataview_update_refreshes_cached_data(self):
         self._create_dataview()
-        cache.set('{}{}'.format(DATAVIEW_COUNT, self.data_view.xform.pk), 5)
-        cache.set('{}{}'.format(DATAVIEW_LAST_SUBMISSION_TIME,
-                                self.data_view.xform.pk),
+        cache_set(DATAVIEW_COUNT, self.data_view.xform.pk, 5)
+        cache_set(DATAVIEW_LAST_SUBMISSION_TIME, self.data_view.xform.pk,
                   '2015-03-09T13:34:05')
         self.data_view.name = "Updated Dataview"
         self.data_view.save()
 
         self.assertIsNone(
-            cache.get('{}{}'.format(DATAVIEW_COUNT, self.data_view.xform.pk)))
-        self.assertIsNone(cache.get('{}{}'.format(
-            DATAVIEW_LAST_SUBMISSION_TIME, self.data_view.xform.pk)))
+            cache_get(DATAVIEW_COUNT, self.data_view.xform.pk))
+        self.assertIsNone(cache_get(
+            DATAVIEW_LAST_SUBMISSION_TIME, self.data_view.xform.pk))
 
         request = self.factory.get('/', **self.extra)
         response = self.view(request, pk=self.data_view.pk)
@@ -1113,11 +1111,10 @@ class TestDataViewViewSet(TestAbstractViewSet):
         self.assertEquals(response.data['last_submission_time'],
                           '2015-03-09T13:34:05')
 
-        cache_dict = cache.get('{}{}'.format(DATAVIEW_COUNT,
-                                             self.data_view.xform.pk))
+        cache_dict = cache_get(DATAVIEW_COUNT, self.data_view.xform.pk)
         self.assertEquals(cache_dict.get(self.data_view.pk), expected_count)
-        self.assertEquals(cache.get('{}{}'.format(
-            DATAVIEW_LAST_SUBMISSION_TIME, self.data_view.xform.pk)),
+        self.assertEquals(cache_get(
+            DATAVIEW_LAST_SUBMISSION_TIME, self.data_view.xform.pk),
             expected_last_submission_time)
 
     def test_export_dataview_not_affected_by_normal_exports(self):
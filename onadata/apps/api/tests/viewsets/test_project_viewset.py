@@ -9,9 +9,11 @@ from future.utils import iteritems
 from operator import itemgetter
 
 from django.conf import settings
+from django.db import connection
 from django.db.models import Q
 from django.core.cache import cache
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from httmock import HTTMock, urlmatch
 from mock import MagicMock, patch
 import requests
@@ -28,7 +30,7 @@ from onadata.apps.logger.models import Project, XForm
 from onadata.apps.main.models import MetaData
 from onadata.libs import permissions as role
 from onadata.libs.models.share_project import ShareProject
-from onadata.libs.utils.cache_tools import PROJ_OWNER_CACHE, safe_key
+from onadata.libs.utils.cache_tools import PROJ_OWNER_CACHE, cache_get
 from onadata.libs.permissions import (ROLES_ORDERED, DataEntryMinorRole,
                                       DataEntryOnlyRole, DataEntryRole,
                                       EditorMinorRole, EditorRole, ManagerRole,
@@ -109,6 +111,32 @@ class TestProjectViewSet(TestAbstractViewSet):
         self.assertEqual(response.data, [serializer.data])
         self.assertIn('created_by', list(response.data[0]))
 
+    def test_projects_list_query_count(self):
+        """
+        Test the number of queries to list projects does not grow with the
+        number of projects, forms and users
+        """
+        def count_list_queries():
+            cache.clear()
+            request = self.factory.get('/', **self.extra)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.view(request)
+            self.assertEqual(response.status_code, 200)
+
+            return len(queries)
+
+        self._publish_xls_form_to_project()
+        count_list_queries()
+        num_queries = count_list_queries()
+
+        alice_data = {'username': 'alice', 'email': 'alice@localhost.com'}
+        alice_profile = self._create_user_profile(alice_data)
+        for name in ['demo2', 'demo3']:
+            self._project_create({'name': name})
+            self._publish_xls_form_to_project()
+            ReadOnlyRole.add(alice_profile.user, self.project)
+        self.assertEqual(count_list_queries(), num_queries)
+
     def test_project_list_returns_projects_for_active_users_only(self):
         self._project_create()
         alice_data = {'username': 'alice', 'email': 'alice@localhost.com'}
@@ -1726,7 +1754,7 @@ class TestProjectViewSet(TestAbstractViewSet):
 
         self.assertEqual(response.status_code, 400)
         self.assertIsNone(
-            cache.get(safe_key(f'{PROJ_OWNER_CACHE}{self.project.pk}')))
+            cache_get(PROJ_OWNER_CACHE, self.project.pk))
         self.assertEqual(
             response.data,
             {'username': [u'The following user(s) is/are not active: alice']})
@@ -1757,7 +1785,7 @@ class TestProjectViewSet(TestAbstractViewSet):
 
         self.assertEqual(response.status_code, 204)
         self.assertIsNone(
-            cache.get(safe_key(f'{PROJ_OWNER_CACHE}{self.project.pk}')))
+            cache_get(PROJ_OWNER_CACHE, self.project.pk))
 
         self.assertTrue(ReadOnlyRole.user_has_role(alice_profile.user,
                                                    self.project))
@@ -2227,7 +2255,7 @@ class TestProjectViewSet(TestAbstractViewSet):
 
         self.assertEqual(response.status_code, 204)
         self.assertIsNone(
-            cache.get(safe_key(f'{PROJ_OWNER_CACHE}{self.project.pk}')))
+            cache_get(PROJ_OWNER_CACHE, self.project.pk))
 
         self.assertTrue(ReadOnlyRole.user_has_role(alice_profile.user,
                                                    self.project))
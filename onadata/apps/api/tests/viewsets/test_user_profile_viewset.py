@@ -29,7 +29,9 @@ from onadata.apps.main.models.user_profile import \
 from onadata.libs.authentication import DigestAuthentication
 from onadata.libs.serializers.user_profile_serializer import \
     _get_first_last_names
-from onadata.libs.utils.cache_tools import USER_PROFILE_PREFIX, safe_key
+from onadata.libs.utils.cache_tools import (USER_NAMESPACE,
+                                            USER_PROFILE_PREFIX,
+                                            bump_namespace, cache_get)
 
 
 def _profile_data():
@@ -213,14 +215,14 @@ class TestUserProfileViewSet(TestAbstractViewSet):
         })
 
         # clear cache
-        cache.delete(safe_key(f'{USER_PROFILE_PREFIX}bob'))
+        bump_namespace(USER_NAMESPACE, 'bob')
 
-        self.assertIsNone(cache.get(safe_key(f'{USER_PROFILE_PREFIX}bob')))
+        self.assertIsNone(cache_get(USER_PROFILE_PREFIX, 'bob'))
 
         request = self.factory.get('/', **self.extra)
         view(request, user='bob')
 
-        self.assertIsNotNone(cache.get(f'{USER_PROFILE_PREFIX}bob'))
+        self.assertIsNotNone(cache_get(USER_PROFILE_PREFIX, 'bob'))
 
     def test_profiles_get_anon(self):
         view = UserProfileViewSet.as_view({
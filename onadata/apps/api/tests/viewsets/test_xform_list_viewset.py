@@ -526,6 +526,46 @@ class TestXFormListViewSet(TestAbstractViewSet, TransactionTestCase):
             self.assertEqual(response['Content-Type'],
                              'text/xml; charset=utf-8')
 
+    def test_get_xform_list_cached(self):
+        """
+        Test the formList is cached, supports If-None-Match and is refreshed
+        when forms or permissions change.
+        """
+        def get_form_list(username, password, etag=None, **kwargs):
+            extra = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+            request = self.factory.get('/', **extra)
+            response = self.view(request, **kwargs)
+            auth = DigestAuth(username, password)
+            request.META.update(auth(request.META, response))
+
+            return self.view(request, **kwargs)
+
+        response = get_form_list('bob', 'bobbob')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        etag = response['ETag']
+        response = get_form_list('bob', 'bobbob', etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        self.xform.title = 'Transportation Survey'
+        self.xform.save()
+        response = get_form_list('bob', 'bobbob', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data[0]['name'], 'Transportation Survey')
+
+        alice = self._create_user_profile(
+            {'username': 'alice', 'email': 'alice@localhost.com'}).user
+        response = get_form_list('alice', 'bobbob')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 0)
+        ReadOnlyRole.add(alice, self.xform)
+        response = get_form_list('alice', 'bobbob')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
     def test_get_xform_list_inactive_form(self):
         self.xform.downloadable = False
         self.xform.save()
@@ -730,6 +770,34 @@ class TestXFormListViewSet(TestAbstractViewSet, TransactionTestCase):
         self.assertTrue(response.has_header('Date'))
         self.assertEqual(response['Content-Type'], 'text/xml; charset=utf-8')
 
+    def test_retrieve_xform_manifest_cached(self):
+        """
+        Test the manifest is cached and refreshed when the media changes.
+        """
+        self._load_metadata(self.xform)
+        self.view = XFormListViewSet.as_view({"get": "manifest"})
+
+        def get_manifest(etag=None):
+            extra = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+            request = self.factory.get('/', **extra)
+            response = self.view(request, pk=self.xform.pk)
+            auth = DigestAuth('bob', 'bobbob')
+            request.META.update(auth(request.META, response))
+
+            return self.view(request, pk=self.xform.pk)
+
+        response = get_manifest()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        etag = response['ETag']
+        self.assertEqual(get_manifest(etag).status_code, 304)
+
+        self.metadata.delete()
+        response = get_manifest(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 0)
+
     def test_retrieve_xform_manifest_anonymous_user(self):
         self._load_metadata(self.xform)
         self.view = XFormListViewSet.as_view({"get": "manifest"})
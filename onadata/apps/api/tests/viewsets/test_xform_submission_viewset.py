@@ -7,6 +7,8 @@ from builtins import open  # pylint: disable=redefined-builtin
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.core.files.base import File
+from django.core.files.storage import get_storage_class
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.http import UnreadablePostError
 from django.test import TransactionTestCase
@@ -22,6 +24,9 @@ from onadata.apps.api.viewsets.xform_submission_viewset import \
 from onadata.apps.logger.models import Attachment, Instance, XForm
 from onadata.libs.permissions import DataEntryRole
 from onadata.libs.utils.common_tools import get_uuid
+from onadata.libs.utils.logger_tools import OpenRosaResponseBadRequest
+from onadata.libs.utils.presigned_uploads import (get_upload_name,
+                                                  get_upload_token)
 
 
 # pylint: disable=W0201,R0904,C0103
@@ -836,3 +841,113 @@ class TestXFormSubmissionViewSet(TestAbstractViewSet, TransactionTestCase):
                 self.assertEqual(
                     Instance.objects.filter(xform=self.xform).count(),
                     count + 1)
+
+    @mock.patch('onadata.apps.api.viewsets.xform_submission_viewset.'
+                'get_presigned_upload_storage')
+    def test_upload_urls(self, storage_mock):
+        """
+        Test presigned URLs are returned for the media files of a submission
+        """
+        view = XFormSubmissionViewSet.as_view({'post': 'upload_urls'})
+        storage = storage_mock.return_value
+        storage.bucket.name = 'onadata'
+        storage._normalize_name.side_effect = lambda name: name
+        storage.bucket.meta.client.generate_presigned_url.return_value = \
+            'https://minio/onadata/upload'
+        data = {'xform': self.xform.pk, 'files': [
+            {'name': '1335783522563.jpg', 'content_type': 'image/jpeg'}]}
+        request = self.factory.post(
+            '/', data=json.dumps(data), content_type='application/json',
+            **self.extra)
+        response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['url'],
+                         'https://minio/onadata/upload')
+        self.assertEqual(response.data[0]['method'], 'PUT')
+        self.assertEqual(response.data[0]['headers'],
+                         {'Content-Type': 'image/jpeg'})
+        self.assertIn('token', response.data[0])
+
+        storage_mock.return_value = None
+        request = self.factory.post(
+            '/', data=json.dumps(data), content_type='application/json',
+            **self.extra)
+        response = view(request)
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_submission_presigned_media(self):
+        """
+        Test media files uploaded straight to the storage are attached to
+        the submission
+        """
+        s = self.surveys[0]
+        media_file = "1335783522563.jpg"
+        path = os.path.join(self.main_directory, 'fixtures',
+                            'transportation', 'instances', s, media_file)
+        storage = get_storage_class()()
+        with open(path, 'rb') as f:
+            storage_name = storage.save(
+                get_upload_name(self.xform, media_file), File(f))
+        token = get_upload_token(
+            storage_name, media_file, 'image/jpeg', self.xform, self.user)
+        submission_path = os.path.join(
+            self.main_directory, 'fixtures',
+            'transportation', 'instances', s, s + '.xml')
+        with open(submission_path, 'rb') as sf:
+            data = {'xml_submission_file': sf, 'uploaded_media': 'invalid'}
+            request = self.factory.post('/submission', data, **self.extra)
+            response = self.view(request)
+            self.assertEqual(response.status_code, 400)
+
+            # an upload token is only valid for the form it was issued for
+            sf.seek(0)
+            other_xform = mock.Mock(pk=self.xform.pk + 1, id_string='other')
+            data = {
+                'xml_submission_file': sf,
+                'uploaded_media': get_upload_token(
+                    storage_name, media_file, 'image/jpeg', other_xform,
+                    self.user)}
+            request = self.factory.post('/submission', data, **self.extra)
+            response = self.view(request)
+            self.assertContains(
+                response, 'The upload token was issued for another form',
+                status_code=400)
+
+            # the upload token of a failed submission can be used again
+            sf.seek(0)
+            data = {'xml_submission_file': sf, 'uploaded_media': token}
+            request = self.factory.post('/submission', data, **self.extra)
+            with mock.patch(
+                    'onadata.libs.serializers.data_serializer.'
+                    'safe_create_instance',
+                    return_value=[
+                        OpenRosaResponseBadRequest(u"Failed"), None]):
+                response = self.view(request)
+            self.assertEqual(response.status_code, 400)
+
+            sf.seek(0)
+            data = {'xml_submission_file': sf, 'uploaded_media': token}
+            request = self.factory.post('/submission', data, **self.extra)
+            response = self.view(request)
+            self.assertContains(response, 'Successful submission',
+                                status_code=201)
+        attachment = Attachment.objects.get(instance__xform=self.xform)
+        self.assertEqual(attachment.media_file.name, storage_name)
+        self.assertEqual(attachment.name, media_file)
+        self.assertEqual(attachment.mimetype, 'image/jpeg')
+        self.assertEqual(attachment.file_size, os.path.getsize(path))
+
+        # an upload token is used once
+        s = self.surveys[1]
+        submission_path = os.path.join(
+            self.main_directory, 'fixtures',
+            'transportation', 'instances', s, s + '.xml')
+        with open(submission_path, 'rb') as sf:
+            data = {'xml_submission_file': sf, 'uploaded_media': token}
+            request = self.factory.post('/submission', data, **self.extra)
+            response = self.view(request)
+            self.assertContains(response, 'The upload token was already used',
+                                status_code=400)
+        self.assertEqual(
+            Attachment.objects.filter(media_file=storage_name).count(), 1)
@@ -23,9 +23,10 @@ from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
 from django.core.files.storage import default_storage
+from django.db import connection
 from django.db.models import Q
 from django.http import HttpResponseRedirect
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.utils.dateparse import parse_datetime
 from django.utils.timezone import utc
 from django_digest.test import DigestAuth
@@ -60,8 +61,9 @@ from onadata.libs.permissions import (
 from onadata.libs.serializers.xform_serializer import (
     XFormBaseSerializer, XFormSerializer)
 from onadata.libs.utils.cache_tools import (
-    ENKETO_URL_CACHE, PROJ_FORMS_CACHE, XFORM_DATA_VERSIONS,
-    XFORM_PERMISSIONS_CACHE, safe_delete)
+    ENKETO_URL_CACHE, PROJ_FORMS_CACHE, XFORM_NAMESPACE,
+    XFORM_PERMISSIONS_CACHE, bump_namespace, cache_get, cache_set,
+    safe_delete)
 from onadata.libs.utils.common_tags import (
     GROUPNAME_REMOVED_FLAG, MONGO_STRFTIME)
 from onadata.libs.utils.common_tools import (
@@ -253,6 +255,34 @@ class TestXFormViewSet(TestAbstractViewSet):
             response = self.view(request)
             self.assertNotEqual(response.get('Cache-Control'), None)
 
+    def test_form_list_query_count(self):
+        """
+        Test the number of queries to list forms does not grow with the
+        number of forms, users and dataviews
+        """
+        def count_list_queries():
+            cache.clear()
+            request = self.factory.get('/', **self.extra)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.view(request)
+            self.assertEqual(response.status_code, 200)
+
+            return len(queries)
+
+        with HTTMock(enketo_mock):
+            self._publish_xls_form_to_project()
+            count_list_queries()
+            num_queries = count_list_queries()
+
+            alice_data = {'username': 'alice', 'email': 'alice@localhost.com'}
+            alice_profile = self._create_user_profile(alice_data)
+            for name in ['demo2', 'demo3']:
+                self._project_create({'name': name})
+                self._publish_xls_form_to_project()
+                ReadOnlyRole.add(alice_profile.user, self.xform)
+                self._create_dataview()
+            self.assertEqual(count_list_queries(), num_queries)
+
     @override_settings(STREAM_DATA=True)
     def test_form_list_stream(self):
         view = XFormViewSet.as_view({
@@ -1596,20 +1626,17 @@ nhMo+jI88L3qfm4/rtWKuQ9/a268phlNj34uQeoDDHuRViQo00L5meE/pFptm
             self._project_create()
 
             # set project XForm cache
-            cache.set('{}{}'.format(PROJ_FORMS_CACHE, self.project.pk),
-                      ["forms"])
+            cache_set(PROJ_FORMS_CACHE, self.project.pk, ["forms"])
 
             self.assertNotEqual(
-                cache.get('{}{}'.format(PROJ_FORMS_CACHE,
-                                        self.project.pk)),
+                cache_get(PROJ_FORMS_CACHE, self.project.pk),
                 None)
 
             self._publish_xls_form_to_project()
 
             # test project XForm cache is empty
             self.assertEqual(
-                cache.get('{}{}'.format(PROJ_FORMS_CACHE,
-                                        self.project.pk)),
+                cache_get(PROJ_FORMS_CACHE, self.project.pk),
                 None)
 
     def test_form_delete(self):
@@ -1624,12 +1651,10 @@ nhMo+jI88L3qfm4/rtWKuQ9/a268phlNj34uQeoDDHuRViQo00L5meE/pFptm
             self.assertNotEqual(etag_value, None)
 
             # set project XForm cache
-            cache.set('{}{}'.format(PROJ_FORMS_CACHE, self.project.pk),
-                      ["forms"])
+            cache_set(PROJ_FORMS_CACHE, self.project.pk, ["forms"])
 
             self.assertNotEqual(
-                cache.get('{}{}'.format(PROJ_FORMS_CACHE,
-                                        self.project.pk)),
+                cache_get(PROJ_FORMS_CACHE, self.project.pk),
                 None)
 
             view = XFormViewSet.as_view({
@@ -1644,8 +1669,7 @@ nhMo+jI88L3qfm4/rtWKuQ9/a268phlNj34uQeoDDHuRViQo00L5meE/pFptm
 
             # test project XForm cache is emptied
             self.assertEqual(
-                cache.get('{}{}'.format(PROJ_FORMS_CACHE,
-                                        self.project.pk)),
+                cache_get(PROJ_FORMS_CACHE, self.project.pk),
                 None)
 
             self.xform.refresh_from_db()
@@ -4276,7 +4300,7 @@ nhMo+jI88L3qfm4/rtWKuQ9/a268phlNj34uQeoDDHuRViQo00L5meE/pFptm
         instance.set_deleted()
 
         # delete cache
-        safe_delete('{}{}'.format(XFORM_DATA_VERSIONS, self.xform.pk))
+        bump_namespace(XFORM_NAMESPACE, self.xform.pk)
 
         request = self.factory.get('/', **self.extra)
         response = view(request, pk=self.xform.pk)
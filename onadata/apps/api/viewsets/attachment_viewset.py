@@ -1,8 +1,8 @@
+import errno
 from builtins import str as text
 
 from django.http import Http404
 from django.utils.translation import ugettext as _
-from django.core.files.storage import default_storage
 from django.conf import settings
 from rest_framework import renderers
 from rest_framework import viewsets
@@ -23,20 +23,22 @@ from onadata.libs.serializers.attachment_serializer import AttachmentSerializer
 from onadata.libs.renderers.renderers import MediaFileContentNegotiation, \
     MediaFileRenderer
 from onadata.libs.utils.image_tools import image_url
+from onadata.libs.utils.media_tools import get_media_file_response
 from onadata.libs.utils.viewer_tools import get_path
 
 
-def get_attachment_data(attachment, suffix):
+def get_attachment_file_name(attachment, suffix):
+    """
+    Returns the storage name of the attachment file or of its suffix
+    thumbnail, generating the thumbnail if needed.
+    """
     if suffix in list(settings.THUMB_CONF):
         image_url(attachment, suffix)
         suffix = settings.THUMB_CONF.get(suffix).get('suffix')
-        f = default_storage.open(
-            get_path(attachment.media_file.name, suffix))
-        data = f.read()
-    else:
-        data = attachment.media_file.read()
 
-    return data
+        return get_path(attachment.media_file.name, suffix)
+
+    return attachment.media_file.name
 
 
 class AttachmentViewSet(AuthenticateHeaderMixin, CacheControlMixin, ETagsMixin,
@@ -65,14 +67,19 @@ class AttachmentViewSet(AuthenticateHeaderMixin, CacheControlMixin, ETagsMixin,
                 and self.object.media_file is not None:
             suffix = request.query_params.get('suffix')
             try:
-                data = get_attachment_data(self.object, suffix)
+                response = get_media_file_response(
+                    request, get_attachment_file_name(self.object, suffix),
+                    self.object.mimetype)
             except IOError as e:
-                if text(e).startswith('File does not exist'):
+                if text(e).startswith('File does not exist') or \
+                        getattr(e, 'errno', None) == errno.ENOENT:
                     raise Http404()
 
                 raise ParseError(e)
             else:
-                return Response(data, content_type=self.object.mimetype)
+                self.set_cache_control(response)
+
+                return response
 
         filename = request.query_params.get('filename')
         serializer = self.get_serializer(self.object)
@@ -25,8 +25,8 @@ from onadata.libs.serializers.project_serializer import ProjectSerializer
 from onadata.libs.serializers.user_profile_serializer import \
     UserProfileWithTokenSerializer
 from onadata.settings.common import DEFAULT_SESSION_EXPIRY_TIME
-from onadata.libs.utils.cache_tools import (cache,
-                                            USER_PROFILE_PREFIX)
+from onadata.libs.utils.cache_tools import (USER_PROFILE_PREFIX,
+                                            cache_get, cache_set)
 
 
 def user_profile_w_token_response(request, status):
@@ -44,14 +44,13 @@ def user_profile_w_token_response(request, status):
     try:
         user_profile = request.user.profile
     except UserProfile.DoesNotExist:
-        user_profile = cache.get(
-            f'{USER_PROFILE_PREFIX}{request.user.username}')
+        user_profile = cache_get(
+            USER_PROFILE_PREFIX, request.user.username)
         if not user_profile:
             user_profile, __ = UserProfile.objects.get_or_create(
                 user=request.user)
-            cache.set(
-                f'{USER_PROFILE_PREFIX}{request.user.username}',
-                user_profile)
+            cache_set(
+                USER_PROFILE_PREFIX, request.user.username, user_profile)
 
     serializer = UserProfileWithTokenSerializer(
         instance=user_profile, context={"request": request})
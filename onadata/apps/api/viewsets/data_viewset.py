@@ -3,6 +3,7 @@ import types
 from builtins import str as text
 
 from django.conf import settings
+from django.contrib.gis.geos import Polygon
 from django.core.exceptions import PermissionDenied
 from django.db.models import Q
 from django.db.models.query import QuerySet
@@ -55,6 +56,7 @@ from onadata.libs.serializers.data_serializer import OSMSerializer
 from onadata.libs.serializers.geojson_serializer import GeoJsonSerializer
 from onadata.libs.utils.api_export_tools import custom_response_handler
 from onadata.libs.utils.common_tools import json_stream
+from onadata.libs.utils.tile_tools import get_vector_tile
 from onadata.libs.utils.viewer_tools import get_enketo_edit_url
 from onadata.apps.api.permissions import ConnectViewsetPermissions
 from onadata.apps.api.tools import get_baseviewset_class
@@ -101,8 +103,10 @@ class DataViewSet(AnonymousUserPublicFormsMixin,
         renderers.CSVRenderer,
         renderers.CSVZIPRenderer,
         renderers.SAVZIPRenderer,
+        renderers.ParquetZIPRenderer,
         renderers.SurveyRenderer,
         renderers.GeoJsonRenderer,
+        renderers.MVTRenderer,
         renderers.KMLRenderer,
         renderers.OSMRenderer,
         renderers.FLOIPRenderer
@@ -444,10 +448,31 @@ class DataViewSet(AnonymousUserPublicFormsMixin,
             return super(DataViewSet, self).list(request, *args, **kwargs)
 
         elif export_type == 'geojson':
+            bbox = request.GET.get('bbox')
+            if bbox:
+                try:
+                    self.object_list = self.object_list.filter(
+                        geom__bboxoverlaps=Polygon.from_bbox(
+                            [float(i) for i in bbox.split(',')]))
+                except ValueError:
+                    raise ParseError(
+                        _(u"Invalid bbox %(bbox)s, expected "
+                          u"min_lng,min_lat,max_lng,max_lat." %
+                          {'bbox': bbox}))
             serializer = self.get_serializer(self.object_list, many=True)
 
             return Response(serializer.data)
 
+        elif export_type == renderers.MVTRenderer.format:
+            try:
+                tile = get_vector_tile(
+                    xform, self.object_list, request.GET.get('z'),
+                    request.GET.get('x'), request.GET.get('y'))
+            except (TypeError, ValueError) as e:
+                raise ParseError(text(e))
+
+            return Response(tile)
+
         return custom_response_handler(request, xform, query, export_type)
 
     def set_object_list(
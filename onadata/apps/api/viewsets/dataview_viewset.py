@@ -30,9 +30,8 @@ from onadata.libs.utils.api_export_tools import (custom_response_handler,
                                                  include_hxl_row,
                                                  process_async_export,
                                                  response_for_format)
-from onadata.libs.utils.cache_tools import (PROJECT_LINKED_DATAVIEWS,
-                                            PROJ_OWNER_CACHE,
-                                            safe_delete)
+from onadata.libs.utils.cache_tools import (PROJECT_NAMESPACE,
+                                            bump_namespace)
 from onadata.libs.utils.chart_tools import (get_chart_data_for_field,
                                             get_field_from_field_name)
 from onadata.libs.utils.export_tools import str_to_bool
@@ -62,6 +61,7 @@ class DataViewViewSet(AuthenticateHeaderMixin,
         renderers.CSVRenderer,
         renderers.CSVZIPRenderer,
         renderers.SAVZIPRenderer,
+        renderers.ParquetZIPRenderer,
         renderers.ZipRenderer,
     ]
 
@@ -88,7 +88,7 @@ class DataViewViewSet(AuthenticateHeaderMixin,
             data = DataView.query_data(self.object, start, limit,
                                        str_to_bool(count), sort=sort,
                                        filter_query=query)
-            if 'error' in data:
+            if isinstance(data, dict):
                 raise ParseError(data.get('error'))
 
             serializer = self.get_serializer(data, many=True)
@@ -250,20 +250,19 @@ class DataViewViewSet(AuthenticateHeaderMixin,
         dataview = self.get_object()
         user = request.user
         dataview.soft_delete(user)
-        safe_delete('{}{}'.format(PROJ_OWNER_CACHE, dataview.project.pk))
+        bump_namespace(PROJECT_NAMESPACE, dataview.project_id)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 def dataview_post_save_callback(sender, instance=None, created=False,
                                 **kwargs):
-    safe_delete('{}{}'.format(PROJECT_LINKED_DATAVIEWS, instance.project.pk))
+    bump_namespace(PROJECT_NAMESPACE, instance.project_id)
 
 
 def dataview_post_delete_callback(sender, instance, **kwargs):
-    if instance.project:
-        safe_delete('{}{}'.format(PROJECT_LINKED_DATAVIEWS,
-                                  instance.project.pk))
+    if instance.project_id:
+        bump_namespace(PROJECT_NAMESPACE, instance.project_id)
 
 
 post_save.connect(dataview_post_save_callback,
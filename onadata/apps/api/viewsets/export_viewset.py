@@ -28,6 +28,7 @@ class ExportViewSet(DestroyModelMixin, ReadOnlyModelViewSet):
         renderers.CSVZIPRenderer,
         renderers.KMLRenderer,
         renderers.OSMExportRenderer,
+        renderers.ParquetZIPRenderer,
         renderers.SAVZIPRenderer,
         renderers.XLSRenderer,
         renderers.XLSXRenderer,
@@ -2,7 +2,6 @@ from distutils.util import strtobool
 
 from django.core.mail import send_mail
 from django.shortcuts import get_object_or_404
-from django.core.cache import cache
 
 from rest_framework import status
 from rest_framework.decorators import action
@@ -30,7 +29,8 @@ from onadata.libs.serializers.share_project_serializer import \
 from onadata.libs.serializers.user_profile_serializer import \
     UserProfileSerializer
 from onadata.libs.utils.cache_tools import (
-    PROJ_OWNER_CACHE, safe_delete)
+    PROJ_OWNER_CACHE, PROJECT_NAMESPACE, bump_namespace, cache_get,
+    cache_set)
 from onadata.libs.serializers.xform_serializer import (XFormCreateSerializer,
                                                        XFormSerializer)
 from onadata.libs.utils.common_tools import merge_dicts
@@ -78,13 +78,13 @@ class ProjectViewSet(AuthenticateHeaderMixin,
     def retrieve(self, request, *args, **kwargs):
         """ Retrieve single project """
         project_id = kwargs.get('pk')
-        project = cache.get(f'{PROJ_OWNER_CACHE}{project_id}')
+        project = cache_get(PROJ_OWNER_CACHE, project_id)
         if project:
             return Response(project)
         self.object = self.get_object()
         serializer = ProjectSerializer(
             self.object, context={'request': request})
-        cache.set(f'{PROJ_OWNER_CACHE}{self.object.pk}', serializer.data)
+        cache_set(PROJ_OWNER_CACHE, self.object.pk, serializer.data)
 
         return Response(serializer.data)
 
@@ -115,7 +115,7 @@ class ProjectViewSet(AuthenticateHeaderMixin,
                     MetaData.published_by_formbuilder(survey, 'True')
 
                 # clear project from cache
-                safe_delete(f'{PROJ_OWNER_CACHE}{survey.project.pk}')
+                bump_namespace(PROJECT_NAMESPACE, survey.project_id)
 
                 return Response(serializer.data,
                                 status=status.HTTP_201_CREATED)
@@ -162,7 +162,7 @@ class ProjectViewSet(AuthenticateHeaderMixin,
                             status=status.HTTP_400_BAD_REQUEST)
 
         # clear cache
-        safe_delete(f'{PROJ_OWNER_CACHE}{self.object.pk}')
+        bump_namespace(PROJECT_NAMESPACE, self.object.pk)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -12,7 +12,7 @@ from past.builtins import basestring  # pylint: disable=redefined-builtin
 from django.conf import settings
 from django.core.cache import cache
 from django.core.validators import ValidationError
-from django.db.models import Count
+from django.db.models import Sum
 from django.http import HttpResponseRedirect, HttpResponseBadRequest
 from django.utils.translation import ugettext as _
 from django.utils import timezone
@@ -30,13 +30,17 @@ from rest_framework.viewsets import ModelViewSet
 from onadata.apps.api.tasks import send_verification_email
 from onadata.apps.api.permissions import UserProfilePermissions
 from onadata.apps.api.tools import get_baseviewset_class
-from onadata.apps.logger.models.instance import Instance
+from onadata.apps.logger.models.daily_submission_count import \
+    DailySubmissionCount
 from onadata.apps.main.models import UserProfile
 from onadata.libs.utils.email import (get_verification_email_data,
                                       get_verification_url)
-from onadata.libs.utils.cache_tools import (safe_delete,
+from onadata.libs.utils.cache_tools import (bump_namespace,
+                                            cache_get,
+                                            cache_set,
                                             CHANGE_PASSWORD_ATTEMPTS,
                                             LOCKOUT_CHANGE_PASSWORD_USER,
+                                            USER_NAMESPACE,
                                             USER_PROFILE_PREFIX)
 from onadata.libs import filters
 from onadata.libs.utils.user_auth import invalidate_and_regen_tokens
@@ -170,7 +174,7 @@ class UserProfileViewSet(
             raise ParseError(
                 'Expected URL keyword argument `%s`.' % self.lookup_field)
         user_name = self.kwargs[self.lookup_field]
-        user_profile = cache.get(f'{USER_PROFILE_PREFIX}{user_name}')
+        user_profile = cache_get(USER_PROFILE_PREFIX, user_name)
 
         if user_profile:
             return user_profile
@@ -203,7 +207,7 @@ class UserProfileViewSet(
 
         # cache user profile object
         obj.refresh_from_db()
-        cache.set(f'{USER_PROFILE_PREFIX}{user_name}', obj)
+        cache_set(USER_PROFILE_PREFIX, user_name, obj)
 
         return obj
 
@@ -213,7 +217,7 @@ class UserProfileViewSet(
         Change user's password.
         """
         # clear cache
-        safe_delete(f'{USER_PROFILE_PREFIX}{request.user.username}')
+        bump_namespace(USER_NAMESPACE, request.user.username)
         user_profile = self.get_object()
         current_password = request.data.get('current_password', None)
         new_password = request.data.get('new_password', None)
@@ -252,7 +256,7 @@ class UserProfileViewSet(
 
     def partial_update(self, request, *args, **kwargs):
         # clear cache
-        safe_delete(f'{USER_PROFILE_PREFIX}{request.user.username}')
+        bump_namespace(USER_NAMESPACE, request.user.username)
         profile = self.get_object()
         metadata = profile.metadata or {}
         if request.data.get('overwrite') == 'false':
@@ -273,7 +277,7 @@ class UserProfileViewSet(
 
             # cache user profile object
             profile.refresh_from_db()
-            cache.set(f'{USER_PROFILE_PREFIX}{profile.user.username}', profile)
+            cache_set(USER_PROFILE_PREFIX, profile.user.username, profile)
             return Response(data=profile.metadata, status=status.HTTP_200_OK)
 
         return super(UserProfileViewSet, self).partial_update(
@@ -283,7 +287,7 @@ class UserProfileViewSet(
     def monthly_submissions(self, request, *args, **kwargs):
         """ Get the total number of submissions for a user """
         # clear cache
-        safe_delete(f'{USER_PROFILE_PREFIX}{request.user.username}')
+        bump_namespace(USER_NAMESPACE, request.user.username)
         profile = self.get_object()
         month_param = self.request.query_params.get('month', None)
         year_param = self.request.query_params.get('year', None)
@@ -303,12 +307,12 @@ class UserProfileViewSet(
         month = month_param if month_param else now.month
         year = year_param if year_param else now.year
 
-        instance_count = Instance.objects.filter(
+        instance_count = DailySubmissionCount.objects.filter(
             xform__user=profile.user,
             xform__deleted_at__isnull=True,
-            date_created__year=year,
-            date_created__month=month).values('xform__shared').annotate(
-                num_instances=Count('id'))
+            date__year=year,
+            date__month=month).values('xform__shared').annotate(
+                num_instances=Sum('count'))
 
         serializer = MonthlySubmissionsSerializer(instance_count, many=True)
         return Response(serializer.data[0])
@@ -1,15 +1,19 @@
+from builtins import str as text
+from hashlib import md5
+
 from django.conf import settings
 from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.views.decorators.cache import never_cache
 from django_filters import rest_framework as django_filter_filters
 
 from rest_framework import viewsets
 from rest_framework import permissions
+from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from onadata.apps.api.tools import get_media_file_response
+from onadata.apps.logger.models.data_view import DataView
 from onadata.apps.logger.models.xform import XForm, get_forms_shared_with_user
 from onadata.apps.main.models.meta_data import MetaData
 from onadata.apps.main.models.user_profile import UserProfile
@@ -24,6 +28,11 @@ from onadata.libs.renderers.renderers import XFormManifestRenderer
 from onadata.libs.serializers.xform_serializer import XFormListSerializer
 from onadata.libs.serializers.xform_serializer import XFormManifestSerializer
 from onadata.apps.api.tools import get_baseviewset_class
+from onadata.libs.utils.cache_tools import (FORMLIST_CACHE,
+                                            FORMLIST_NAMESPACE,
+                                            MANIFEST_CACHE, XFORM_NAMESPACE,
+                                            cache_get, cache_set,
+                                            get_namespace_version, safe_key)
 from onadata.libs.utils.export_tools import ExportBuilder
 from onadata.libs.utils.common_tags import (GROUP_DELIMETER_TAG,
                                             REPEAT_INDEX_TAGS)
@@ -36,6 +45,47 @@ BaseViewset = get_baseviewset_class()
 DEFAULT_CONTENT_LENGTH = getattr(settings, 'DEFAULT_CONTENT_LENGTH', 10000000)
 
 
+def get_etag(data):
+    """
+    Returns the ETag of the response data.
+    """
+    return md5(text(data).encode('utf-8')).hexdigest()
+
+
+def etag_matches(request, etag):
+    """
+    Returns True if the request If-None-Match header matches the etag.
+    """
+    for value in request.META.get('HTTP_IF_NONE_MATCH', '').split(','):
+        value = value.strip()
+        if value.startswith('W/'):
+            value = value[2:]
+        if value.strip('"') == etag:
+            return True
+
+    return False
+
+
+def get_linked_xform_ids(metadata_list):
+    """
+    Returns the ids of the forms whose submissions the linked datasets, i.e.
+    "xform PK name" and "dataview PK name" media files, come from.
+    """
+    xform_ids, dataview_ids = set(), set()
+    for metadata in metadata_list:
+        parts = metadata.data_value.split(' ')
+        if len(parts) > 2 and not metadata.data_file and parts[1].isdigit():
+            if parts[0] == 'xform':
+                xform_ids.add(int(parts[1]))
+            else:
+                dataview_ids.add(int(parts[1]))
+    if dataview_ids:
+        xform_ids.update(DataView.objects.filter(
+            pk__in=dataview_ids).values_list('xform_id', flat=True))
+
+    return xform_ids
+
+
 class XFormListViewSet(ETagsMixin, BaseViewset,
                        viewsets.ReadOnlyModelViewSet):
     authentication_classes = (DigestAuthentication,
@@ -79,14 +129,14 @@ class XFormListViewSet(ETagsMixin, BaseViewset,
             # raises a permission denied exception, forces authentication
             self.permission_denied(self.request)
 
-        profile = None
+        profile = self.profile = None
         if username:
-            profile = get_object_or_404(
+            profile = self.profile = get_object_or_404(
                 UserProfile, user__username=username)
         elif form_pk:
             queryset = queryset.filter(pk=form_pk)
             if queryset.first():
-                profile = queryset.first().user.profile
+                profile = self.profile = queryset.first().user.profile
 
         if profile:
             if profile.require_auth and self.request.user.is_anonymous:
@@ -114,16 +164,59 @@ class XFormListViewSet(ETagsMixin, BaseViewset,
 
         return queryset
 
-    @never_cache
+    def get_cache_key(self, *args):
+        """
+        Returns the key the response for args is cached with, responses
+        include absolute URLs and are cached per host.
+        """
+        args = (self.__class__.__name__, ) + args + (
+            self.request.scheme, self.request.get_host())
+
+        return safe_key(u'-'.join(text(arg) for arg in args))
+
+    def get_cached_response(self, data, headers):
+        """
+        Returns a 304 response when the client already has data, otherwise
+        sets the ETag of the response. Clients may keep the response but have
+        to revalidate it with the ETag before every use.
+        """
+        headers['Cache-Control'] = 'private, no-cache'
+        if etag_matches(self.request, data['etag']):
+            headers['ETag'] = data['etag']
+
+            return Response(
+                headers=headers, status=status.HTTP_304_NOT_MODIFIED)
+
+        self.etag_hash = data['etag']
+
+        return Response(data['data'], headers=headers)
+
     def list(self, request, *args, **kwargs):
         self.object_list = self.filter_queryset(self.get_queryset())
 
         headers = get_openrosa_headers(request, location=False)
-        serializer = self.get_serializer(self.object_list, many=True)
         if request.method in ['HEAD']:
             return Response('', headers=headers, status=204)
 
-        return Response(serializer.data, headers=headers)
+        # the forms listed change with the forms and permissions of the
+        # request user and of the owner of the forms
+        user_versions = [
+            u'{}-v{}'.format(
+                user_id, get_namespace_version(FORMLIST_NAMESPACE, user_id))
+            for user_id in (request.user.pk,
+                            getattr(self.profile, 'user_id', None))
+            if user_id is not None]
+        cache_key = self.get_cache_key(
+            self.kwargs.get('username'), self.kwargs.get('xform_pk'),
+            request.query_params.get('formID'), *user_versions)
+        data = cache_get(FORMLIST_CACHE, cache_key)
+        if data is None:
+            serializer = self.get_serializer(self.object_list, many=True)
+            data = {'data': serializer.data}
+            data['etag'] = get_etag(data['data'])
+            cache_set(FORMLIST_CACHE, cache_key, data)
+
+        return self.get_cached_response(data, headers)
 
     def retrieve(self, request, *args, **kwargs):
         self.object = self.get_object()
@@ -134,16 +227,30 @@ class XFormListViewSet(ETagsMixin, BaseViewset,
     @action(methods=['GET', 'HEAD'], detail=True)
     def manifest(self, request, *args, **kwargs):
         self.object = self.get_object()
-        object_list = MetaData.objects.filter(data_type='media',
-                                              object_id=self.object.pk)
-        context = self.get_serializer_context()
-        context[GROUP_DELIMETER_TAG] = ExportBuilder.GROUP_DELIMITER_DOT
-        context[REPEAT_INDEX_TAGS] = '_,_'
-        serializer = XFormManifestSerializer(object_list, many=True,
-                                             context=context)
-
-        return Response(serializer.data,
-                        headers=get_openrosa_headers(request, location=False))
+        headers = get_openrosa_headers(request, location=False)
+        cache_key = self.get_cache_key(
+            self.object.pk,
+            get_namespace_version(FORMLIST_NAMESPACE, self.object.user_id))
+        data = cache_get(MANIFEST_CACHE, cache_key)
+        # the hashes of linked datasets change with their submissions
+        if data is None or any(
+                get_namespace_version(XFORM_NAMESPACE, xform_id) != version
+                for xform_id, version in data['linked_xforms'].items()):
+            object_list = MetaData.objects.filter(data_type='media',
+                                                  object_id=self.object.pk)
+            context = self.get_serializer_context()
+            context[GROUP_DELIMETER_TAG] = ExportBuilder.GROUP_DELIMITER_DOT
+            context[REPEAT_INDEX_TAGS] = '_,_'
+            linked_xforms = {
+                xform_id: get_namespace_version(XFORM_NAMESPACE, xform_id)
+                for xform_id in get_linked_xform_ids(object_list)}
+            serializer = XFormManifestSerializer(object_list, many=True,
+                                                 context=context)
+            data = {'data': serializer.data, 'linked_xforms': linked_xforms}
+            data['etag'] = get_etag(data['data'])
+            cache_set(MANIFEST_CACHE, cache_key, data)
+
+        return self.get_cached_response(data, headers)
 
     @action(methods=['GET', 'HEAD'], detail=True)
     def media(self, request, *args, **kwargs):
@@ -9,13 +9,16 @@ from django.utils.translation import ugettext as _
 from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.authentication import (BasicAuthentication,
                                            TokenAuthentication)
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import get_object_or_404
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework.response import Response
 
 from onadata.apps.api.permissions import IsAuthenticatedSubmission
 from onadata.apps.api.tools import get_baseviewset_class
-from onadata.apps.logger.models import Instance
+from onadata.apps.logger.models import Instance, XForm
 from onadata.libs import filters
 from onadata.libs.authentication import (DigestAuthentication,
                                          EnketoTokenAuthentication)
@@ -27,7 +30,10 @@ from onadata.libs.serializers.data_serializer import (
     FLOIPSubmissionSerializer, JSONSubmissionSerializer,
     RapidProSubmissionSerializer, SubmissionSerializer,
     RapidProJSONSubmissionSerializer)
-from onadata.libs.utils.logger_tools import OpenRosaResponseBadRequest
+from onadata.libs.utils.logger_tools import (OpenRosaResponseBadRequest,
+                                             check_submission_permissions)
+from onadata.libs.utils.presigned_uploads import (
+    create_presigned_upload, get_presigned_upload_storage)
 
 BaseViewset = get_baseviewset_class()  # pylint: disable=C0103
 
@@ -111,6 +117,30 @@ class XFormSubmissionViewSet(AuthenticateHeaderMixin,  # pylint: disable=R0901
         return super(XFormSubmissionViewSet, self).create(
             request, *args, **kwargs)
 
+    @action(methods=['POST'], detail=False, url_path='upload-urls',
+            permission_classes=[permissions.IsAuthenticated],
+            renderer_classes=[JSONRenderer], parser_classes=[JSONParser])
+    def upload_urls(self, request, *args, **kwargs):
+        """
+        Returns presigned URLs to upload the media files of a submission to
+        a form straight to the storage.
+        """
+        storage = get_presigned_upload_storage()
+        if storage is None:
+            raise NotFound(_(u"Presigned uploads are not enabled."))
+
+        xform = get_object_or_404(
+            XForm, pk=request.data.get('xform'), deleted_at__isnull=True)
+        check_submission_permissions(request, xform)
+        uploads = [
+            create_presigned_upload(
+                storage, xform, request.user, media_file['name'],
+                media_file.get('content_type', ''))
+            for media_file in request.data.get('files', [])
+            if media_file.get('name')]
+
+        return Response(uploads)
+
     def handle_exception(self, exc):
         """
         Handles exceptions thrown by handler method and
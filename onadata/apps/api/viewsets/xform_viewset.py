@@ -76,7 +76,8 @@ from onadata.libs.utils.viewer_tools import (enketo_url,
                                              get_enketo_single_submit_url)
 from onadata.libs.exceptions import EnketoError
 from onadata.settings.common import XLS_EXTENSIONS, CSV_EXTENSION
-from onadata.libs.utils.cache_tools import PROJ_OWNER_CACHE, safe_delete
+from onadata.libs.utils.cache_tools import (PROJECT_NAMESPACE,
+                                            bump_namespace)
 
 ENKETO_AUTH_COOKIE = getattr(settings, 'ENKETO_AUTH_COOKIE',
                              '__enketo')
@@ -247,6 +248,7 @@ class XFormViewSet(AnonymousUserPublicFormsMixin,
         renderers.CSVRenderer,
         renderers.CSVZIPRenderer,
         renderers.SAVZIPRenderer,
+        renderers.ParquetZIPRenderer,
         renderers.SurveyRenderer,
         renderers.OSMExportRenderer,
         renderers.ZipRenderer,
@@ -272,7 +274,7 @@ class XFormViewSet(AnonymousUserPublicFormsMixin,
             'uuid', 'bamboo_dataset', 'instances_with_osm',
             'instances_with_geopoints', 'version', 'has_hxl_support',
             'project', 'last_updated_at', 'user', 'allows_sms', 'description',
-            'is_merged_dataset'
+            'is_merged_dataset', 'public_key', 'hash'
         )
     serializer_class = XFormSerializer
     lookup_field = 'pk'
@@ -727,7 +729,7 @@ class XFormViewSet(AnonymousUserPublicFormsMixin,
                 u'time_async_triggered': datetime.now()}
 
             # clear project from cache
-            safe_delete(f'{PROJ_OWNER_CACHE}{xform.project.pk}')
+            bump_namespace(PROJECT_NAMESPACE, xform.project_id)
             resp_code = status.HTTP_202_ACCEPTED
 
         elif request.method == 'GET':
@@ -2,41 +2,55 @@
 # vim: ai ts=4 sts=4 et sw=4 coding=utf-8
 import sys
 
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import BaseCommand
 from django.core.files.storage import get_storage_class
 from django.utils.translation import ugettext as _, ugettext_lazy
 
+from onadata.libs.utils.batch_runner import (BatchRunner, add_batch_arguments,
+                                             iterable_batches)
 
-class Command(BaseCommand):
-    help = ugettext_lazy("Makes all s3 files private")
+PERMISSIONS = ('private', 'public-read', 'authenticated-read')
 
-    def handle(self, *args, **kwargs):
-        permissions = ('private', 'public-read', 'authenticated-read')
 
-        if len(args) < 1:
-            raise CommandError(_("Missing permission argument"))
+class Command(BaseCommand):
+    help = ugettext_lazy("Makes all s3 files private")
 
-        permission = args[0]
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'permission',
+            choices=PERMISSIONS,
+            help=ugettext_lazy("the ACL to set on all s3 files"))
+        add_batch_arguments(parser)
 
-        if permission not in permissions:
-            raise CommandError(_(
-                "Expected %s as permission") % ' or '.join(permissions))
+    def handle(self, *args, **kwargs):
+        permission = kwargs['permission']
 
         try:
-            s3 = get_storage_class('storages.backends.s3boto.S3BotoStorage')()
+            s3 = get_storage_class(
+                'storages.backends.s3boto3.S3Boto3Storage')()
         except Exception:
             self.stderr.write(_(
                 u"Missing necessary libraries. Try running: pip install "
-                "-r requirements-s3.pip"))
+                "-r requirements/s3.pip"))
             sys.exit(1)
         else:
-            all_files = s3.bucket.list()
+            # unlike the bucket resource, the client is thread safe
+            client = s3.bucket.meta.client
+            bucket_name = s3.bucket.name
+
+            def get_batches(after):
+                objects = s3.bucket.objects.filter(Marker=after) \
+                    if after else s3.bucket.objects.all()
+
+                return iterable_batches(objects, runner.batch_size)
+
+            def set_acl(f):
+                client.put_object_acl(
+                    Bucket=bucket_name, Key=f.key, ACL=permission)
 
-            for i, f in enumerate(all_files):
-                f.set_acl(permission)
-                if i % 1000 == 0:
-                    self.stdout.write(_(
-                        "%s file objects processed" % i))
+            runner = BatchRunner.from_options(kwargs, self.stdout, self.stderr)
+            processed, failed = runner.run_batches(
+                get_batches, set_acl, key=lambda f: f.key)
 
             self.stdout.write(_(
-                "A total of %s file objects processed" % i))
+                "A total of %s file objects processed" % processed))
@@ -1,18 +1,14 @@
 #!/usr/bin/env python
-from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.storage import get_storage_class
 from django.core.management.base import BaseCommand, CommandError
 from django.utils.translation import ugettext as _
 from django.utils.translation import ugettext_lazy
 
-from onadata.apps.logger.models.attachment import Attachment
+from onadata.apps.logger.models.attachment import (
+    Attachment, generate_attachment_thumbnails)
 from onadata.apps.logger.models.xform import XForm
-from onadata.libs.utils.image_tools import resize, resize_local_env
-from onadata.libs.utils.model_tools import queryset_iterator
-from onadata.libs.utils.viewer_tools import get_path
-
-THUMB_CONF = settings.THUMB_CONF
+from onadata.libs.utils.batch_runner import BatchRunner, add_batch_arguments
+from onadata.libs.utils.image_tools import generate_thumbnails
 
 
 class Command(BaseCommand):
@@ -29,8 +25,16 @@ class Command(BaseCommand):
         parser.add_argument(
             '-f',
             '--force',
-            action='store_false',
+            action='store_true',
             help=ugettext_lazy("regenerate thumbnails if they exist."))
+        parser.add_argument(
+            '-a',
+            '--async',
+            action='store_true',
+            dest='async_',
+            help=ugettext_lazy("queue the thumbnails of each image to be "
+                               "created in parallel by the celery workers."))
+        add_batch_arguments(parser)
 
     def handle(self, *args, **options):
         attachments_qs = Attachment.objects.select_related(
@@ -53,34 +57,21 @@ class Command(BaseCommand):
                     "Error: Form with id_string %(id_string)s does not exist" %
                     {'id_string': id_string})
             attachments_qs = attachments_qs.filter(instance__xform=xform)
-        fs = get_storage_class('django.core.files.storage.FileSystemStorage')()
-        for att in queryset_iterator(attachments_qs):
-            filename = att.media_file.name
-            default_storage = get_storage_class()()
-            full_path = get_path(filename,
-                                 settings.THUMB_CONF['small']['suffix'])
-            if options.get('force') is not None:
-                for s in ['small', 'medium', 'large']:
-                    fp = get_path(filename, settings.THUMB_CONF[s]['suffix'])
-                    if default_storage.exists(fp):
-                        default_storage.delete(fp)
-            if not default_storage.exists(full_path):
-                try:
-                    if default_storage.__class__ != fs.__class__:
-                        resize(filename, att.extension)
-                    else:
-                        resize_local_env(filename, att.extension)
-                    path = get_path(
-                        filename, '%s' % THUMB_CONF['small']['suffix'])
-                    if default_storage.exists(path):
-                        self.stdout.write(
-                            _(u'Thumbnails created for %(file)s') %
-                            {'file': filename})
-                    else:
-                        self.stdout.write(
-                            _(u'Problem with the file %(file)s') %
-                            {'file': filename})
-                except (IOError, OSError) as e:
-                    self.stderr.write(_(
-                        u'Error on %(filename)s: %(error)s')
-                        % {'filename': filename, 'error': e})
+        attachments_qs = attachments_qs.filter(mimetype__startswith='image')
+        if not options.get('force'):
+            attachments_qs = attachments_qs.filter(thumbnails=[])
+        if options.get('async_'):
+            def process(attachment):
+                generate_attachment_thumbnails.apply_async(
+                    args=[attachment.pk])
+        else:
+            process = generate_thumbnails
+
+        runner = BatchRunner.from_options(options, self.stdout, self.stderr)
+        processed, failed = runner.run(attachments_qs, process)
+        self.stdout.write(
+            _(u'Thumbnails %(action)s for %(count)d images, %(failed)d '
+              u'failed') % {
+                  'action': _(u'queued') if options.get('async_')
+                  else _(u'created'),
+                  'count': processed - failed, 'failed': failed})
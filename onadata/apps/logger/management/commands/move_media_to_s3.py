@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 import sys
+import threading
+from functools import partial
 
 from django.core.files.storage import get_storage_class
 from django.core.management.base import BaseCommand
@@ -10,17 +12,23 @@ from onadata.apps.logger.models.attachment import upload_to as\
     attachment_upload_to
 from onadata.apps.logger.models.xform import XForm, upload_to as\
     xform_upload_to
+from onadata.libs.utils.batch_runner import BatchRunner, add_batch_arguments
+
+S3_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 
 
 class Command(BaseCommand):
     help = ugettext_lazy("Moves all attachments and xls files "
                          "to s3 from the local file system storage.")
 
+    def add_arguments(self, parser):
+        add_batch_arguments(parser)
+
     def handle(self, *args, **kwargs):
         try:
             fs = get_storage_class(
                 'django.core.files.storage.FileSystemStorage')()
-            s3 = get_storage_class('storages.backends.s3boto.S3BotoStorage')()
+            s3 = get_storage_class(S3_STORAGE)()
         except Exception:
             self.stderr.write(_(
                 u"Missing necessary libraries. Try running: pip install -r"
@@ -38,22 +46,41 @@ class Command(BaseCommand):
             (Attachment, 'media_file', attachment_upload_to),
             (XForm, 'xls', xform_upload_to),
         ]
+        # boto3 resources are not thread safe, every worker has its own
+        self.local = threading.local()
+        self.fs = fs
 
         for cls, file_field, upload_to in classes_to_move:
             self.stdout.write(_(
                 u"Moving %(class)ss to s3...") % {'class': cls.__name__})
-            for i in cls.objects.all():
-                f = getattr(i, file_field)
-                old_filename = f.name
-                if f.name and fs.exists(f.name) and not s3.exists(
-                        upload_to(i, f.name)):
-                    f.save(fs.path(f.name), fs.open(fs.path(f.name)))
-                    self.stdout.write(_(
-                        "\t+ '%(fname)s'\n\t---> '%(url)s'")
-                        % {'fname': fs.path(old_filename), 'url': f.url})
-                else:
-                    self.stderr.write(
-                        "\t- (f.name=%s, fs.exists(f.name)=%s, not s3.exist"
-                        "s(upload_to(i, f.name))=%s)" % (
-                            f.name, fs.exists(f.name),
-                            not s3.exists(upload_to(i, f.name))))
+            runner = BatchRunner.from_options(
+                kwargs, self.stdout, self.stderr, suffix=cls.__name__.lower())
+            runner.run(cls.objects.all(), partial(
+                self.move, file_field=file_field, upload_to=upload_to))
+
+    def get_s3(self):
+        s3 = getattr(self.local, 's3', None)
+        if s3 is None:
+            s3 = self.local.s3 = get_storage_class(S3_STORAGE)()
+
+        return s3
+
+    def move(self, i, file_field, upload_to):
+        fs = self.fs
+        s3 = self.get_s3()
+        f = getattr(i, file_field)
+        f.storage = s3
+        old_filename = f.name
+        fs_exists = bool(f.name) and fs.exists(f.name)
+        s3_exists = bool(f.name) and s3.exists(upload_to(i, f.name))
+        if fs_exists and not s3_exists:
+            with fs.open(f.name) as content:
+                f.save(fs.path(f.name), content)
+            self.stdout.write(_(
+                "\t+ '%(fname)s'\n\t---> '%(url)s'")
+                % {'fname': fs.path(old_filename), 'url': f.url})
+        else:
+            self.stderr.write(
+                "\t- (f.name=%s, fs.exists(f.name)=%s, not s3.exist"
+                "s(upload_to(i, f.name))=%s)" % (
+                    f.name, fs_exists, not s3_exists))
@@ -16,12 +16,17 @@ class Command(BaseCommand):
         parser.add_argument('-u', '--username', help=_("Username"))
         parser.add_argument('-p', '--password', help=_("Password"))
         parser.add_argument('--to', help=_("username in this server"))
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help=_("number of submissions and media files to download at a"
+                   " time"))
 
     def handle(self, *args, **kwargs):
         url = kwargs.get('url')
         username = kwargs.get('username')
         password = kwargs.get('password')
         to = kwargs.get('to')
+        workers = kwargs.get('workers')
         if username is None or password is None or to is None or url is None:
             self.stderr.write(
                 'pull_form_aggregate -u username -p password --to=username'
@@ -29,5 +34,6 @@ class Command(BaseCommand):
         else:
             user = User.objects.get(username=to)
             bc = BriefcaseClient(
-                username=username, password=password, user=user, url=url)
+                username=username, password=password, user=user, url=url,
+                workers=workers)
             bc.download_xforms(include_instances=True)
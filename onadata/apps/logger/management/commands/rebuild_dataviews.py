@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+# vim: ai ts=4 sts=4 et sw=4 fileencoding=utf-8
+
+from django.core.management.base import BaseCommand
+from django.utils.translation import ugettext_lazy
+
+from onadata.apps.logger.models import DataView
+
+
+class Command(BaseCommand):
+    help = ugettext_lazy("Rebuild the members of materialized dataviews")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'dataview_ids', nargs='*', type=int,
+            help=ugettext_lazy("Ids of the dataviews to rebuild, defaults to"
+                               " all materialized dataviews"))
+
+    def handle(self, *args, **kwargs):
+        queryset = DataView.objects.filter(
+            materialized=True, deleted_at__isnull=True)
+        if kwargs.get('dataview_ids'):
+            queryset = queryset.filter(pk__in=kwargs['dataview_ids'])
+
+        dataview_count = queryset.count()
+        for i, data_view in enumerate(queryset.iterator(), 1):
+            data_view.rebuild_membership()
+            self.stdout.write('Processing {} of {}: {} ({})'.format(
+                i, dataview_count, data_view.name,
+                data_view.memberships.count()))
@@ -9,35 +9,52 @@ Sample usage: python manage.py recover_deleted_attachments --form 1
 from django.core.management.base import BaseCommand
 
 from onadata.apps.logger.models import Instance
+from onadata.libs.utils.batch_runner import BatchRunner, add_batch_arguments
 
 
-def recover_deleted_attachments(form_id: str, stdout=None):
+def recover_instance_attachments(instance, stdout=None):
+    """
+    Recovers the soft-deleted attachments of an instance that are still
+    present within the submission XML
+
+    :param: (Instance) instance: Instance object
+    :param: (sys.stdout) stdout: Python standard output. Default: None
+    """
+    expected_attachments = instance.get_expected_media()
+    if not instance.attachments.filter(
+            deleted_at__isnull=True).count() == len(expected_attachments):
+        attachments_to_recover = instance.attachments.filter(
+            deleted_at__isnull=False,
+            name__in=expected_attachments)
+        for attachment in attachments_to_recover:
+            attachment.deleted_at = None
+            attachment.deleted_by = None
+            attachment.save()
+
+            if stdout:
+                stdout.write(
+                    f'Recovered {attachment.name} ID: {attachment.id}')
+        # Regenerate instance JSON
+        instance.json = instance.get_full_dict(load_existing=False)
+        instance.save()
+
+
+def recover_deleted_attachments(form_id: str, stdout=None, runner=None):
     """
     Recovers attachments that were accidentally soft-deleted
 
     :param: (str) form_id: Unique identifier for an XForm object
     :param: (sys.stdout) stdout: Python standard output. Default: None
+    :param: (BatchRunner) runner: Runner processing the instances.
+        Default: None, the instances are processed one at a time and errors
+        are raised
     """
     instances = Instance.objects.filter(
         xform__id=form_id, deleted_at__isnull=True)
-    for instance in instances:
-        expected_attachments = instance.get_expected_media()
-        if not instance.attachments.filter(
-                deleted_at__isnull=True).count() == len(expected_attachments):
-            attachments_to_recover = instance.attachments.filter(
-                deleted_at__isnull=False,
-                name__in=expected_attachments)
-            for attachment in attachments_to_recover:
-                attachment.deleted_at = None
-                attachment.deleted_by = None
-                attachment.save()
-
-                if stdout:
-                    stdout.write(
-                        f'Recovered {attachment.name} ID: {attachment.id}')
-            # Regenerate instance JSON
-            instance.json = instance.get_full_dict(load_existing=False)
-            instance.save()
+    runner = runner or BatchRunner()
+    runner.run(
+        instances,
+        lambda instance: recover_instance_attachments(instance, stdout))
 
 
 class Command(BaseCommand):
@@ -49,7 +66,9 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('-f', '--form', dest='form_id', type=int)
+        add_batch_arguments(parser)
 
     def handle(self, *args, **options):
         form_id = options.get('form_id')
-        recover_deleted_attachments(form_id, self.stdout)
+        runner = BatchRunner.from_options(options, self.stdout, self.stderr)
+        recover_deleted_attachments(form_id, self.stdout, runner)
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.9 on 2020-03-20 09:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logger', '0060_auto_20200305_0357'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataview',
+            name='materialized',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='DataViewInstance',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_view', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='logger.DataView')),
+                ('instance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dataview_memberships', to='logger.Instance')),
+            ],
+            options={
+                'unique_together': {('data_view', 'instance')},
+            },
+        ),
+    ]
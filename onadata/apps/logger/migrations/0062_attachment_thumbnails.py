@@ -0,0 +1,19 @@
+# Generated by Django 2.2.9 on 2020-03-24 10:41
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logger', '0061_dataview_materialized'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachment',
+            name='thumbnails',
+            field=django.contrib.postgres.fields.jsonb.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 2.2.9 on 2020-03-27 08:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_daily_submission_counts(apps, schema_editor):
+    """
+    Counts the submissions received so far per form and day.
+    """
+    schema_editor.execute(
+        'INSERT INTO logger_dailysubmissioncount (xform_id, date, count) '
+        'SELECT xform_id, (date_created AT TIME ZONE %s)::date, COUNT(*) '
+        'FROM logger_instance GROUP BY 1, 2',
+        [settings.TIME_ZONE])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logger', '0062_attachment_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySubmissionCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('xform', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_submission_counts', to='logger.XForm')),
+            ],
+            options={
+                'unique_together': {('xform', 'date')},
+            },
+        ),
+        migrations.RunPython(populate_daily_submission_counts,
+                             migrations.RunPython.noop),
+    ]
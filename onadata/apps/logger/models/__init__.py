@@ -1,5 +1,6 @@
 from onadata.apps.logger.models.attachment import Attachment  # noqa
-from onadata.apps.logger.models.data_view import DataView  # noqa
+from onadata.apps.logger.models.daily_submission_count import DailySubmissionCount  # noqa
+from onadata.apps.logger.models.data_view import DataView, DataViewInstance  # noqa
 from onadata.apps.logger.models.instance import Instance  # noqa
 from onadata.apps.logger.models.merged_xform import MergedXForm  # noqa
 from onadata.apps.logger.models.note import Note # noqa
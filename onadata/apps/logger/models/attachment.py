@@ -2,8 +2,17 @@ import mimetypes
 import os
 from hashlib import md5
 
-from django.db import models
+from celery import task
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.postgres.fields import JSONField
+from django.db import models, transaction
+from django.db.models.signals import post_save
+
+from onadata.libs.utils.image_tools import generate_thumbnails
+
+ASYNC_POST_SUBMISSION_PROCESSING_ENABLED = \
+    getattr(settings, 'ASYNC_POST_SUBMISSION_PROCESSING_ENABLED', False)
 
 
 def get_original_filename(filename):
@@ -55,12 +64,22 @@ class Attachment(models.Model):
     name = models.CharField(max_length=100, null=True, blank=True)
     deleted_by = models.ForeignKey(User, related_name='deleted_attachments',
                                    null=True, on_delete=models.SET_NULL)
+    # sizes of the thumbnails created for image attachments
+    thumbnails = JSONField(default=list, blank=True)
 
     class Meta:
         app_label = 'logger'
         ordering = ("pk", )
 
     def save(self, *args, **kwargs):
+        self.set_media_file_fields()
+
+        super(Attachment, self).save(*args, **kwargs)
+
+    def set_media_file_fields(self):
+        """
+        Sets the mimetype, when missing, and the size of the media file.
+        """
         if self.media_file and self.mimetype == '':
             # guess mimetype
             mimetype, encoding = mimetypes.guess_type(self.media_file.name)
@@ -77,8 +96,6 @@ class Attachment(models.Model):
         except (OSError, AttributeError):
             pass
 
-        super(Attachment, self).save(*args, **kwargs)
-
     @property
     def file_hash(self):
         if self.media_file.storage.exists(self.media_file.name):
@@ -89,3 +106,33 @@ class Attachment(models.Model):
     def filename(self):
         if self.media_file:
             return os.path.basename(self.media_file.name)
+
+
+@task
+def generate_attachment_thumbnails(attachment_id):
+    """Creates the thumbnails of an image attachment"""
+    try:
+        attachment = Attachment.objects.get(pk=attachment_id)
+    except Attachment.DoesNotExist:
+        pass
+    else:
+        generate_thumbnails(attachment)
+
+
+def post_save_attachment(sender, instance=None, created=False, **kwargs):
+    """
+    Creates the thumbnails of new image attachments in the background once
+    the attachment is committed, without
+    ASYNC_POST_SUBMISSION_PROCESSING_ENABLED the thumbnails are created when
+    first requested.
+    """
+    if created and ASYNC_POST_SUBMISSION_PROCESSING_ENABLED and \
+            instance.mimetype.startswith('image'):
+        attachment_id = instance.pk
+        transaction.on_commit(
+            lambda: generate_attachment_thumbnails.apply_async(
+                args=[attachment_id]))
+
+
+post_save.connect(post_save_attachment, sender=Attachment,
+                  dispatch_uid='post_save_attachment')
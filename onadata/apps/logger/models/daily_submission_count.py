@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+DailySubmissionCount model class
+"""
+from django.db import connection, models
+from django.utils import timezone
+
+
+class DailySubmissionCount(models.Model):
+    """
+    Number of submissions a form received on a day, in the TIME_ZONE of the
+    server.
+    """
+
+    xform = models.ForeignKey('logger.XForm',
+                              related_name='daily_submission_counts',
+                              on_delete=models.CASCADE)
+    date = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        app_label = 'logger'
+        unique_together = ('xform', 'date')
+
+
+def get_submission_date(date_created):
+    """
+    Returns the day of a submission received at date_created.
+    """
+    return timezone.localtime(
+        date_created, timezone.get_default_timezone()).date()
+
+
+def update_daily_submission_count(xform_id, date, delta=1):
+    """
+    Adds delta to the number of submissions of the form on date. A negative
+    delta only updates an existing count, the count of a form being deleted
+    is not created again while its submissions are deleted.
+    """
+    cursor = connection.cursor()
+    if delta < 0:
+        cursor.execute(
+            'UPDATE logger_dailysubmissioncount SET '
+            'count = GREATEST(count + %s, 0) '
+            'WHERE xform_id = %s AND date = %s',
+            [delta, xform_id, date])
+        return
+
+    cursor.execute(
+        'INSERT INTO logger_dailysubmissioncount (xform_id, date, count) '
+        'VALUES (%s, %s, %s) '
+        'ON CONFLICT (xform_id, date) DO UPDATE SET '
+        'count = GREATEST(logger_dailysubmissioncount.count + %s, 0)',
+        [xform_id, date, delta, delta])
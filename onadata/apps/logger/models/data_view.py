@@ -4,11 +4,12 @@ DataView model class
 """
 import datetime
 from builtins import str as text
+from copy import deepcopy
 
 from django.conf import settings
 from django.contrib.gis.db import models
 from django.contrib.postgres.fields import JSONField
-from django.db import connection
+from django.db import connection, transaction
 from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 from django.utils.encoding import python_2_unicode_compatible
@@ -17,11 +18,8 @@ from django.utils.translation import ugettext as _
 from onadata.apps.viewer.parsed_instance_tools import get_where_clause
 from onadata.libs.models.sorting import (json_order_by, json_order_by_params,
                                          sort_from_mongo_sort_str)
-from onadata.libs.utils.cache_tools import (DATAVIEW_COUNT,
-                                            DATAVIEW_LAST_SUBMISSION_TIME,
-                                            XFORM_LINKED_DATAVIEWS,
-                                            PROJ_OWNER_CACHE,
-                                            safe_delete)
+from onadata.libs.utils.cache_tools import (PROJECT_NAMESPACE,
+                                            XFORM_NAMESPACE, bump_namespace)
 from onadata.libs.utils.common_tags import (ATTACHMENTS, EDITED, GEOLOCATION,
                                             ID, LAST_EDITED, MONGO_STRFTIME,
                                             NOTES, SUBMISSION_TIME)
@@ -30,6 +28,8 @@ SUPPORTED_FILTERS = ['=', '>', '<', '>=', '<=', '<>', '!=']
 ATTACHMENT_TYPES = ['photo', 'audio', 'video']
 DEFAULT_COLUMNS = [
     ID, SUBMISSION_TIME, EDITED, LAST_EDITED, NOTES]
+# rows fetched at a time when streaming the data of a dataview
+QUERY_CHUNK_SIZE = 1000
 
 
 def _json_sql_str(key, known_integers=None, known_dates=None,
@@ -46,6 +46,18 @@ def _json_sql_str(key, known_integers=None, known_dates=None,
     return _json_str
 
 
+def get_json_projection_sql(columns):
+    """
+    Returns the SQL that selects the json of submissions with only the keys in
+    columns, one parameter per column.
+    """
+    return (
+        u"SELECT COALESCE((SELECT jsonb_object_agg(key, value)"
+        u" FROM jsonb_each(json) WHERE key IN (" +
+        u", ".join([u"%s"] * len(columns)) +
+        u")), '{}'::jsonb) FROM logger_instance")
+
+
 def get_name_from_survey_element(element):
     return element.get_abbreviated_xpath()
 
@@ -102,6 +114,7 @@ class DataView(models.Model):
     query = JSONField(default=dict, blank=True)
     instances_with_geopoints = models.BooleanField(default=False)
     matches_parent = models.BooleanField(default=False)
+    materialized = models.BooleanField(default=False)
     date_created = models.DateTimeField(auto_now_add=True)
     date_modified = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(blank=True, null=True)
@@ -115,9 +128,25 @@ class DataView(models.Model):
         verbose_name = _('Data View')
         verbose_name_plural = _('Data Views')
 
+    # the query, materialized and xform_id values the members were built for
+    saved_membership_state = None
+
     def __str__(self):
         return getattr(self, "name", "")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        data_view = super(DataView, cls).from_db(db, field_names, values)
+        if {'query', 'materialized', 'xform_id'}.issubset(field_names):
+            data_view.saved_membership_state = \
+                data_view.get_membership_state()
+
+        return data_view
+
+    def get_membership_state(self):
+        """Return the values the members of the dataview depend on"""
+        return (deepcopy(self.query), self.materialized, self.xform_id)
+
     def has_geo_columnn_n_data(self):
         """
         Check if the data set from the data view has geo location data
@@ -160,8 +189,68 @@ class DataView(models.Model):
         """Return elements of type decimal"""
         return self._get_known_type('decimal')
 
+    def get_xform_ids(self):
+        """Return the ids of the forms whose submissions the dataview filters
+        """
+        # pylint: disable=E1101
+        if self.xform.is_merged_dataset:
+            return list(
+                self.xform.mergedxform.xforms.values_list('pk', flat=True))
+
+        return [self.xform_id]
+
+    def _get_sql_where(self):
+        where, where_params = self._get_where_clause(self,
+                                                     self.get_known_integers(),
+                                                     self.get_known_dates(),
+                                                     self.get_known_decimals())
+        sql_where = u"".join([u" AND " + w for w in where])
+
+        return sql_where, [text(i) for i in where_params]
+
+    def update_membership(self, instance):
+        """
+        Add or remove the submission from the members of a materialized
+        dataview depending on whether it matches the dataview query.
+        """
+        sql_where, where_params = self._get_sql_where()
+        cursor = connection.cursor()
+        cursor.execute(
+            u"SELECT EXISTS (SELECT id FROM logger_instance WHERE id = %s"
+            u" AND deleted_at IS NULL" + sql_where + u")",
+            [instance.id] + where_params)
+
+        if cursor.fetchone()[0]:
+            DataViewInstance.objects.get_or_create(
+                data_view=self, instance_id=instance.id)
+        else:
+            DataViewInstance.objects.filter(
+                data_view=self, instance_id=instance.id).delete()
+
+    def rebuild_membership(self):
+        """
+        Recompute the members of a materialized dataview from the
+        submissions of its form(s).
+        """
+        sql_where, where_params = self._get_sql_where()
+        with transaction.atomic():
+            DataViewInstance.objects.filter(data_view=self).delete()
+            if self.materialized:
+                cursor = connection.cursor()
+                cursor.execute(
+                    u"INSERT INTO logger_dataviewinstance"
+                    u" (data_view_id, instance_id) SELECT %s, id"
+                    u" FROM logger_instance WHERE xform_id IN %s"
+                    u" AND deleted_at IS NULL" + sql_where,
+                    [self.pk, tuple(self.get_xform_ids())] + where_params)
+
     def has_instance(self, instance):
         """Return True if instance in set of dataview data"""
+        if self.materialized:
+            return self.memberships.filter(
+                instance_id=instance.id,
+                instance__deleted_at__isnull=True).exists()
+
         cursor = connection.cursor()
         sql = u"SELECT count(json) FROM logger_instance"
 
@@ -244,12 +333,16 @@ class DataView(models.Model):
         return where, where_params
 
     @classmethod
-    def query_iterator(cls, sql, fields=None, params=[], count=False):
-        cursor = connection.cursor()
+    def execute_query(cls, sql, params=[], count=False):
+        """
+        Executes the query, the rows of queries other than counts are fetched
+        in chunks through a server side cursor.
+        """
         sql_params = tuple(
             i if isinstance(i, tuple) else text(i) for i in params)
 
         if count:
+            cursor = connection.cursor()
             from_pos = sql.upper().find(' FROM')
             if from_pos != -1:
                 sql = u"SELECT COUNT(*) " + sql[from_pos:]
@@ -257,26 +350,49 @@ class DataView(models.Model):
             order_pos = sql.upper().find('ORDER BY')
             if order_pos != -1:
                 sql = sql[:order_pos]
+        else:
+            cursor = connection.chunked_cursor()
 
+        cursor.execute(sql, sql_params)
+
+        return cursor
+
+    @classmethod
+    def iterate_rows(cls, cursor, fields=None, count=False, rows=None):
+        """
+        Yields the records of an executed query, starting with rows if they
+        were fetched already.
+        """
+        if count:
             fields = [u'count']
+        if rows is None:
+            rows = cursor.fetchmany(QUERY_CHUNK_SIZE)
 
-        cursor.execute(sql, sql_params)
+        try:
+            while rows:
+                for row in rows:
+                    if fields is None:
+                        yield row[0]
+                    elif count:
+                        yield dict(zip(fields, row))
+                    else:
+                        yield dict(
+                            zip(fields, [row[0].get(f) for f in fields]))
+                rows = cursor.fetchmany(QUERY_CHUNK_SIZE)
+        finally:
+            cursor.close()
 
-        if fields is None:
-            for row in cursor.fetchall():
-                yield row[0]
-        else:
-            if count:
-                for row in cursor.fetchall():
-                    yield dict(zip(fields, row))
-            else:
-                for row in cursor.fetchall():
-                    yield dict(zip(fields, [row[0].get(f) for f in fields]))
+    @classmethod
+    def query_iterator(cls, sql, fields=None, params=[], count=False):
+        cursor = cls.execute_query(sql, params, count)
+
+        for record in cls.iterate_rows(cursor, fields, count):
+            yield record
 
     @classmethod
     def generate_query_string(cls, data_view, start_index, limit,
                               last_submission_time, all_data, sort,
-                              filter_query=None):
+                              filter_query=None, count=False):
         additional_columns = [GEOLOCATION] \
             if data_view.instances_with_geopoints else []
 
@@ -284,6 +400,7 @@ class DataView(models.Model):
             additional_columns += [ATTACHMENTS]
 
         sql = u"SELECT json FROM logger_instance"
+        projection_params = []
         if all_data or data_view.matches_parent:
             columns = None
         elif last_submission_time:
@@ -292,15 +409,23 @@ class DataView(models.Model):
             # get the columns needed
             columns = data_view.columns + DEFAULT_COLUMNS + additional_columns
 
-            # field_list = [u"json->%s" for i in columns]
-
-            # sql = u"SELECT %s FROM logger_instance" % u",".join(field_list)
-
-        where, where_params = cls._get_where_clause(
-            data_view,
-            data_view.get_known_integers(),
-            data_view.get_known_dates(),
-            data_view.get_known_decimals())
+        if columns and not count:
+            # only the columns of the dataview leave the database
+            sql = get_json_projection_sql(columns)
+            projection_params = list(columns)
+
+        if data_view.materialized:
+            # the submissions matching the query are kept up to date in the
+            # membership table
+            where = [u"id IN (SELECT instance_id FROM logger_dataviewinstance"
+                     u" WHERE data_view_id = %s)"]
+            where_params = [data_view.pk]
+        else:
+            where, where_params = cls._get_where_clause(
+                data_view,
+                data_view.get_known_integers(),
+                data_view.get_known_dates(),
+                data_view.get_known_decimals())
 
         if filter_query:
             add_where, add_where_params = \
@@ -318,13 +443,13 @@ class DataView(models.Model):
         if data_view.xform.is_merged_dataset:
             sql += u" WHERE xform_id IN %s " + sql_where \
                     + u" AND deleted_at IS NULL"
-            params = [tuple(list(
+            params = projection_params + [tuple(list(
                 data_view.xform.mergedxform.xforms.values_list('pk', flat=True)
             ))] + where_params
         else:
             sql += u" WHERE xform_id = %s " + sql_where \
                     + u" AND deleted_at IS NULL"
-            params = [data_view.xform.pk] + where_params
+            params = projection_params + [data_view.xform.pk] + where_params
 
         if sort is not None:
             sort = ['id'] if sort is None\
@@ -353,39 +478,75 @@ class DataView(models.Model):
                    last_submission_time=False, all_data=False, sort=None,
                    filter_query=None):
 
+        """
+        Returns an iterator over the records of the dataview, a dict with
+        the error if the query fails.
+        """
         (sql, columns, params) = cls.generate_query_string(
             data_view, start_index, limit, last_submission_time,
-            all_data, sort, filter_query)
+            all_data, sort, filter_query, count)
 
         try:
-            records = [record for record in DataView.query_iterator(sql,
-                                                                    columns,
-                                                                    params,
-                                                                    count)]
+            cursor = cls.execute_query(sql, params, count)
+            # fetch the first rows to report query errors right away
+            rows = cursor.fetchmany(QUERY_CHUNK_SIZE)
         except Exception as e:
             return {"error": _(text(e))}
 
-        return records
+        return cls.iterate_rows(cursor, columns, count, rows)
+
+
+class DataViewInstance(models.Model):
+    """
+    A submission that matches the query of a materialized DataView
+    """
+
+    data_view = models.ForeignKey(DataView, related_name='memberships',
+                                  on_delete=models.CASCADE)
+    instance = models.ForeignKey('logger.Instance',
+                                 related_name='dataview_memberships',
+                                 on_delete=models.CASCADE)
+
+    class Meta:
+        app_label = 'logger'
+        unique_together = ('data_view', 'instance')
 
 
 def clear_cache(sender, instance, **kwargs):
     """ Post delete handler for clearing the dataview cache.
     """
-    safe_delete('{}{}'.format(XFORM_LINKED_DATAVIEWS, instance.xform.pk))
+    bump_namespace(XFORM_NAMESPACE, instance.xform_id)
+    bump_namespace(PROJECT_NAMESPACE, instance.project_id)
 
 
 def clear_dataview_cache(sender, instance, **kwargs):
     """ Post Save handler for clearing dataview cache on serialized fields.
     """
-    safe_delete('{}{}'.format(PROJ_OWNER_CACHE, instance.project.pk))
-    safe_delete('{}{}'.format(DATAVIEW_COUNT, instance.xform.pk))
-    safe_delete(
-        '{}{}'.format(DATAVIEW_LAST_SUBMISSION_TIME, instance.xform.pk))
-    safe_delete('{}{}'.format(XFORM_LINKED_DATAVIEWS, instance.xform.pk))
+    bump_namespace(PROJECT_NAMESPACE, instance.project_id)
+    bump_namespace(XFORM_NAMESPACE, instance.xform_id)
+
+
+def rebuild_dataview_membership(sender, instance, created=False,
+                                update_fields=None, **kwargs):
+    """ Post Save handler for rebuilding the members of a dataview when it
+    is materialized or its query changes.
+    """
+    if update_fields is not None and \
+            not {'query', 'materialized', 'xform'} & set(update_fields):
+        return
+
+    membership_state = instance.get_membership_state()
+    if created or membership_state != instance.saved_membership_state:
+        if instance.materialized or instance.memberships.exists():
+            instance.rebuild_membership()
+        instance.saved_membership_state = membership_state
 
 
 post_save.connect(clear_dataview_cache, sender=DataView,
                   dispatch_uid='clear_cache')
 
+post_save.connect(rebuild_dataview_membership, sender=DataView,
+                  dispatch_uid='rebuild_dataview_membership')
+
 post_delete.connect(clear_cache, sender=DataView,
                     dispatch_uid='clear_xform_cache')
@@ -21,6 +21,9 @@ from future.utils import python_2_unicode_compatible
 from past.builtins import basestring  # pylint: disable=W0622
 from taggit.managers import TaggableManager
 
+from onadata.apps.logger.models.daily_submission_count import (
+    get_submission_date, update_daily_submission_count)
+from onadata.apps.logger.models.data_view import DataView
 from onadata.apps.logger.models.submission_review import SubmissionReview
 from onadata.apps.logger.models.survey_type import SurveyType
 from onadata.apps.logger.models.xform import XFORM_TITLE_LENGTH, XForm
@@ -29,12 +32,11 @@ from onadata.apps.logger.xform_instance_parser import (XFormInstanceParser,
                                                        get_uuid_from_xml)
 from onadata.apps.messaging.constants import XFORM, \
     SUBMISSION_EDITED, SUBMISSION_CREATED
+from onadata.apps.messaging.coalescer import queue_message
 from onadata.apps.messaging.serializers import send_message
 from onadata.libs.data.query import get_numeric_fields
-from onadata.libs.utils.cache_tools import (DATAVIEW_COUNT, IS_ORG,
-                                            PROJ_NUM_DATASET_CACHE,
-                                            PROJ_SUB_DATE_CACHE, XFORM_COUNT,
-                                            XFORM_DATA_VERSIONS, safe_delete)
+from onadata.libs.utils.cache_tools import (PROJECT_NAMESPACE,
+                                            XFORM_NAMESPACE, bump_namespace)
 from onadata.libs.utils.common_tags import (ATTACHMENTS, BAMBOO_DATASET_ID,
                                             DELETEDAT, DURATION, EDITED, END,
                                             GEOLOCATION, ID, LAST_EDITED,
@@ -52,6 +54,28 @@ from onadata.libs.utils.timing import calculate_duration
 ASYNC_POST_SUBMISSION_PROCESSING_ENABLED = \
     getattr(settings, 'ASYNC_POST_SUBMISSION_PROCESSING_ENABLED', False)
 
+# first key of the postgres advisory lock on the submissions of a form
+SUBMISSIONS_LOCK_ID = 1
+
+
+def lock_xform_submissions(xform_id, shared=False, timeout=None):
+    """
+    Takes the submissions lock of the form until the end of the transaction.
+
+    New submissions to the form are saved with the lock shared. With the
+    lock held exclusively no submission is being saved, a submission with a
+    lower id than the submissions read then can not commit later. Raises an
+    OperationalError after waiting timeout seconds for the lock.
+    """
+    cursor = connection.cursor()
+    if timeout is not None:
+        cursor.execute('SET LOCAL lock_timeout = %s',
+                       ['{}ms'.format(int(timeout * 1000))])
+    cursor.execute(
+        'SELECT pg_advisory_xact_lock{}(%s, %s)'.format(
+            '_shared' if shared else ''),
+        [SUBMISSIONS_LOCK_ID, xform_id])
+
 
 def get_attachment_url(attachment, suffix=None):
     kwargs = {'pk': attachment.pk}
@@ -174,13 +198,17 @@ def update_xform_submission_count(instance_id, created):
                 'WHERE user_id = %s'
             )
             cursor.execute(sql, [instance.xform.user_id])
+            update_daily_submission_count(
+                instance.xform_id,
+                get_submission_date(instance.date_created))
 
-            safe_delete('{}{}'.format(XFORM_DATA_VERSIONS, instance.xform_id))
-            safe_delete('{}{}'.format(DATAVIEW_COUNT, instance.xform_id))
-            safe_delete('{}{}'.format(XFORM_COUNT, instance.xform_id))
+            bump_namespace(XFORM_NAMESPACE, instance.xform_id)
 
 
 def update_xform_submission_count_delete(sender, instance, **kwargs):
+    if instance.counted_date is not None:
+        update_daily_submission_count(
+            instance.xform_id, instance.counted_date, -1)
     try:
         xform = XForm.objects.select_for_update().get(pk=instance.xform.pk)
     except XForm.DoesNotExist:
@@ -202,13 +230,8 @@ def update_xform_submission_count_delete(sender, instance, **kwargs):
                 profile.num_of_submissions = 0
             profile.save()
 
-        for a in [PROJ_NUM_DATASET_CACHE, PROJ_SUB_DATE_CACHE]:
-            safe_delete('{}{}'.format(a, xform.project.pk))
-
-        safe_delete('{}{}'.format(IS_ORG, xform.pk))
-        safe_delete('{}{}'.format(XFORM_DATA_VERSIONS, xform.pk))
-        safe_delete('{}{}'.format(DATAVIEW_COUNT, xform.pk))
-        safe_delete('{}{}'.format(XFORM_COUNT, xform.pk))
+        bump_namespace(PROJECT_NAMESPACE, xform.project_id)
+        bump_namespace(XFORM_NAMESPACE, xform.pk)
 
         if xform.instances.exclude(geom=None).count() < 1:
             xform.instances_with_geopoints = False
@@ -228,6 +251,23 @@ def save_full_json(instance_id, created):
             instance.save(update_fields=['json'])
 
 
+@task
+def update_dataview_membership(instance_id):
+    """Add or remove the submission from the materialized dataviews of its
+    form"""
+    try:
+        instance = Instance.objects.only('xform_id').get(pk=instance_id)
+    except Instance.DoesNotExist:
+        pass
+    else:
+        data_views = DataView.objects.filter(
+            Q(xform_id=instance.xform_id) |
+            Q(xform__mergedxform__xforms=instance.xform_id),
+            materialized=True, deleted_at__isnull=True).distinct()
+        for data_view in data_views:
+            data_view.update_membership(instance)
+
+
 @task
 def update_project_date_modified(instance_id, created):
     # update the date modified field of the project which will change
@@ -489,6 +529,18 @@ class Instance(models.Model, InstanceBaseClass):
         app_label = 'logger'
         unique_together = ('xform', 'uuid')
 
+    # the day the submission is counted on in the daily submission counts
+    counted_date = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(Instance, cls).from_db(db, field_names, values)
+        if 'date_created' in field_names and \
+                instance.date_created is not None:
+            instance.counted_date = get_submission_date(instance.date_created)
+
+        return instance
+
     @classmethod
     def set_deleted_at(cls, instance_id, deleted_at=timezone.now(), user=None):
         try:
@@ -572,7 +624,12 @@ class Instance(models.Model, InstanceBaseClass):
         # pylint: disable=no-member
         self.version = self.json.get(VERSION, self.xform.version)
 
-        super(Instance, self).save(*args, **kwargs)
+        if self.pk is None:
+            with transaction.atomic():
+                lock_xform_submissions(self.xform_id, shared=True)
+                super(Instance, self).save(*args, **kwargs)
+        else:
+            super(Instance, self).save(*args, **kwargs)
 
     # pylint: disable=no-member
     def set_deleted(self, deleted_at=timezone.now(), user=None):
@@ -596,20 +653,46 @@ class Instance(models.Model, InstanceBaseClass):
         queryset.update(**kwargs)
 
 
+def update_counted_date(instance, created):
+    """
+    Moves the submission to its day in the daily submission counts when its
+    date_created changes.
+    """
+    submission_date = get_submission_date(instance.date_created)
+    if created:
+        if not ASYNC_POST_SUBMISSION_PROCESSING_ENABLED:
+            instance.counted_date = submission_date
+    elif instance.counted_date is not None and \
+            instance.counted_date != submission_date:
+        update_daily_submission_count(
+            instance.xform_id, instance.counted_date, -1)
+        update_daily_submission_count(instance.xform_id, submission_date)
+        instance.counted_date = submission_date
+
+
 def post_save_submission(sender, instance=None, created=False, **kwargs):
     message_verb = SUBMISSION_CREATED if created else SUBMISSION_EDITED
+    update_counted_date(instance, created)
     if ASYNC_POST_SUBMISSION_PROCESSING_ENABLED:
         update_xform_submission_count.apply_async(args=[instance.pk, created])
         save_full_json.apply_async(args=[instance.pk, created])
         update_project_date_modified.apply_async(args=[instance.pk, created])
-        send_message.apply_async(args=[
-            instance.id, instance.xform.id, XFORM,
-            instance.user, message_verb])
-
+        update_dataview_membership.apply_async(args=[instance.pk])
     else:
         update_xform_submission_count(instance.pk, created)
         save_full_json(instance.pk, created)
         update_project_date_modified(instance.pk, created)
+        update_dataview_membership(instance.pk)
+
+    if getattr(settings, 'NOTIFICATION_BATCH_WINDOW', 0):
+        queue_message(
+            instance.id, instance.xform_id, XFORM, instance.user,
+            message_verb)
+    elif ASYNC_POST_SUBMISSION_PROCESSING_ENABLED:
+        send_message.apply_async(args=[
+            instance.id, instance.xform.id, XFORM,
+            instance.user, message_verb])
+    else:
         send_message(
             instance_id=instance.id, target_id=instance.xform.id,
             target_type=XFORM, user=instance.user,
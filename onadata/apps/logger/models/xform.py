@@ -6,14 +6,14 @@ from datetime import datetime
 from hashlib import md5
 from xml.dom import Node
 
-import pytz
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.fields import GenericRelation
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models, transaction
 from django.db.models import Sum
-from django.db.models.signals import post_delete, post_save, pre_save
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.encoding import python_2_unicode_compatible
@@ -30,17 +30,17 @@ from pyxform.section import RepeatingSection
 from pyxform.xform2json import create_survey_element_from_xml
 from taggit.managers import TaggableManager
 
+from onadata.apps.logger.models.daily_submission_count import \
+    get_submission_date
 from onadata.apps.logger.xform_instance_parser import (XLSFormError,
                                                        clean_and_parse_xml)
 from onadata.apps.messaging.constants import FORM_UPDATED
 from onadata.apps.messaging.constants import XFORM
 from onadata.apps.messaging.serializers import send_message
 from onadata.libs.models.base_model import BaseModel
-from onadata.libs.utils.cache_tools import (IS_ORG, PROJ_BASE_FORMS_CACHE,
-                                            PROJ_FORMS_CACHE,
-                                            PROJ_NUM_DATASET_CACHE,
-                                            PROJ_SUB_DATE_CACHE, XFORM_COUNT,
-                                            PROJ_OWNER_CACHE, safe_delete)
+from onadata.libs.utils.cache_tools import (FORMLIST_NAMESPACE,
+                                            PROJECT_NAMESPACE,
+                                            XFORM_NAMESPACE, bump_namespace)
 from onadata.libs.utils.common_tags import (DURATION, ID, KNOWN_MEDIA_TYPES,
                                             MEDIA_ALL_RECEIVED, MEDIA_COUNT,
                                             NOTES, SUBMISSION_TIME,
@@ -949,8 +949,7 @@ class XForm(XFormMixin, BaseModel):
                 self.save(update_fields=['num_of_submissions'])
 
                 # clear cache
-                key = '{}{}'.format(XFORM_COUNT, self.pk)
-                safe_delete(key)
+                bump_namespace(XFORM_NAMESPACE, self.pk)
 
         return self.num_of_submissions
 
@@ -958,14 +957,10 @@ class XForm(XFormMixin, BaseModel):
 
     @property
     def submission_count_for_today(self):
-        current_timzone_name = timezone.get_current_timezone_name()
-        current_timezone = pytz.timezone(current_timzone_name)
-        today = datetime.today()
-        current_date = current_timezone.localize(
-            datetime(today.year, today.month, today.day))
-        count = self.instances.filter(
-            deleted_at__isnull=True, date_created=current_date).count()
-        return count
+        counts = self.daily_submission_counts.filter(
+            date=get_submission_date(timezone.now()))
+
+        return sum(counts.values_list('count', flat=True))
 
     def geocoded_submission_count(self):
         """Number of geocoded submissions."""
@@ -1025,9 +1020,7 @@ post_delete.connect(
 
 def set_object_permissions(sender, instance=None, created=False, **kwargs):
     # clear cache
-    safe_delete('{}{}'.format(PROJ_FORMS_CACHE, instance.project.pk))
-    safe_delete('{}{}'.format(PROJ_BASE_FORMS_CACHE, instance.project.pk))
-    safe_delete('{}{}'.format(IS_ORG, instance.pk))
+    bump_namespace(PROJECT_NAMESPACE, instance.project_id)
 
     if created:
         from onadata.libs.permissions import OwnerRole
@@ -1068,11 +1061,9 @@ pre_save.connect(save_project, sender=XForm, dispatch_uid='save_project_xform')
 
 def xform_post_delete_callback(sender, instance, **kwargs):
     if instance.project_id:
-        safe_delete('{}{}'.format(PROJ_OWNER_CACHE, instance.project_id))
-        safe_delete('{}{}'.format(PROJ_FORMS_CACHE, instance.project_id))
-        safe_delete('{}{}'.format(PROJ_BASE_FORMS_CACHE, instance.project.pk))
-        safe_delete('{}{}'.format(PROJ_SUB_DATE_CACHE, instance.project_id))
-        safe_delete('{}{}'.format(PROJ_NUM_DATASET_CACHE, instance.project_id))
+        bump_namespace(PROJECT_NAMESPACE, instance.project_id)
+        bump_namespace(XFORM_NAMESPACE, instance.pk)
+    bump_namespace(FORMLIST_NAMESPACE, instance.user_id)
 
 
 post_delete.connect(
@@ -1093,6 +1084,83 @@ class XFormGroupObjectPermission(GroupObjectPermissionBase):
     content_object = models.ForeignKey(XForm, on_delete=models.CASCADE)
 
 
+# XForm fields that show in the formList or change the forms listed
+FORMLIST_FIELDS = ('id_string', 'title', 'version', 'hash', 'description',
+                   'downloadable', 'deleted_at', 'shared', 'user',
+                   'is_merged_dataset', 'project')
+
+
+def clear_formlist_cache(sender, instance, **kwargs):
+    """
+    Invalidates the cached formList and manifests of the owner of the form
+    and of the users with permissions on the form.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields and not set(FORMLIST_FIELDS).intersection(update_fields):
+        return
+
+    user_ids = set(XFormUserObjectPermission.objects.filter(
+        content_object=instance).values_list('user_id', flat=True))
+    user_ids.update(User.objects.filter(
+        groups__xformgroupobjectpermission__content_object=instance
+    ).values_list('pk', flat=True))
+    user_ids.add(instance.user_id)
+    for user_id in user_ids:
+        bump_namespace(FORMLIST_NAMESPACE, user_id)
+
+
+post_save.connect(
+    clear_formlist_cache, sender=XForm, dispatch_uid='clear_formlist_cache')
+
+
+def clear_user_formlist_cache(sender, instance, **kwargs):
+    """
+    Invalidates the cached formList of the users whose form permissions
+    changed.
+    """
+    if isinstance(instance, XFormUserObjectPermission):
+        user_ids = [instance.user_id]
+    else:
+        user_ids = instance.group.user_set.values_list('pk', flat=True)
+    for user_id in user_ids:
+        bump_namespace(FORMLIST_NAMESPACE, user_id)
+
+
+for permission_model in (XFormUserObjectPermission,
+                         XFormGroupObjectPermission):
+    post_save.connect(
+        clear_user_formlist_cache, sender=permission_model,
+        dispatch_uid='clear_user_formlist_cache_%s' %
+        permission_model.__name__)
+    post_delete.connect(
+        clear_user_formlist_cache, sender=permission_model,
+        dispatch_uid='clear_user_formlist_cache_delete_%s' %
+        permission_model.__name__)
+
+
+def clear_group_formlist_cache(sender, instance, action, reverse, pk_set,
+                               **kwargs):
+    """
+    Invalidates the cached formList of users that join or leave a group.
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        user_ids = [instance.pk]
+    elif action == 'pre_clear':
+        user_ids = instance.user_set.values_list('pk', flat=True)
+    else:
+        user_ids = pk_set or []
+    for user_id in user_ids:
+        bump_namespace(FORMLIST_NAMESPACE, user_id)
+
+
+m2m_changed.connect(
+    clear_group_formlist_cache, sender=User.groups.through,
+    dispatch_uid='clear_group_formlist_cache')
+
+
 def check_xform_uuid(new_uuid):
     """
     Checks if a new_uuid has already been used, if it has it raises the
@@ -4,8 +4,10 @@ from builtins import open
 from django.core.files.base import File
 from django.core.files.storage import default_storage
 from django.core.management import call_command
+from django.db import transaction
 from django.db.utils import DataError
 from django.utils import timezone
+from mock import patch
 
 from onadata.apps.main.tests.test_base import TestBase
 from onadata.apps.logger.models import Attachment, Instance
@@ -31,6 +33,25 @@ class TestAttachment(TestBase):
     def test_mimetype(self):
         self.assertEqual(self.attachment.mimetype, 'image/jpeg')
 
+    @patch('onadata.apps.logger.models.attachment.'
+           'ASYNC_POST_SUBMISSION_PROCESSING_ENABLED', True)
+    @patch('onadata.apps.logger.models.attachment.'
+           'generate_attachment_thumbnails.apply_async')
+    def test_thumbnails_generated_after_commit(self, mock_apply_async):
+        """
+        Test the thumbnails task of an image attachment is queued once the
+        attachment is committed
+        """
+        media_file = os.path.join(
+            self.this_directory, 'fixtures',
+            'transportation', 'instances', self.surveys[0], self.media_file)
+        with transaction.atomic():
+            attachment = Attachment.objects.create(
+                instance=self.instance,
+                media_file=File(open(media_file, 'rb'), media_file))
+            self.assertFalse(mock_apply_async.called)
+        mock_apply_async.assert_called_once_with(args=[attachment.pk])
+
     def test_create_attachment_with_mimetype_more_than_50(self):
         media_file = os.path.join(
             self.this_directory, 'fixtures',
@@ -72,6 +93,15 @@ class TestAttachment(TestBase):
             thumbnail = '%s-small.jpg' % filename
             self.assertNotEqual(
                 url.find(thumbnail), -1)
+            # the thumbnails are recorded, no storage lookups are needed
+            attachment.refresh_from_db()
+            self.assertEqual(attachment.thumbnails,
+                             ['large', 'medium', 'small'])
+            with patch('django.core.files.storage.FileSystemStorage.exists'
+                       ) as exists_mock:
+                self.assertEqual(image_url(attachment, 'medium'),
+                                 url.replace('-small.jpg', '-medium.jpg'))
+                self.assertFalse(exists_mock.called)
             for size in ['small', 'medium', 'large']:
                 thumbnail = '%s-%s.jpg' % (filename, size)
                 self.assertTrue(
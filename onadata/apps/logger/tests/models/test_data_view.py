@@ -2,12 +2,14 @@ import os
 from builtins import str
 from django.conf import settings
 from django.db import connection
+from mock import patch
 
 from onadata.apps.main.tests.test_base import TestBase
 from onadata.apps.api.tests.viewsets.test_abstract_viewset import\
     TestAbstractViewSet
 from onadata.apps.logger.models.data_view import (
     append_where_list,
+    get_json_projection_sql,
     DataView)
 
 
@@ -77,8 +79,7 @@ class TestIntegratedDataView(TestAbstractViewSet):
         self._create_dataview()
 
     def test_generate_query_string_for_data_without_filter(self):
-        expected_sql = "SELECT json FROM "\
-                       "logger_instance WHERE xform_id = %s  AND "\
+        expected_sql = " WHERE xform_id = %s  AND "\
                        "CAST(json->>%s AS INT) > %s AND "\
                        "CAST(json->>%s AS INT) < %s AND deleted_at IS NULL"\
                        " ORDER BY id"
@@ -91,18 +92,24 @@ class TestIntegratedDataView(TestAbstractViewSet):
             self.all_data,
             self.sort)
 
-        self.assertEquals(sql, expected_sql)
+        self.assertEquals(sql, get_json_projection_sql(columns) + expected_sql)
         self.assertEqual(len(columns), 8)
 
         self.cursor.execute(sql, [str(i) for i in (params)])
         results = self.cursor.fetchall()
 
         self.assertEquals(len(results), 3)
+        # only the dataview columns are selected
+        self.assertTrue(set(results[0][0]).issubset(columns))
+        self.assertNotIn('pizza_type', results[0][0])
+
+        records = DataView.query_data(self.data_view)
+        self.assertFalse(isinstance(records, list))
+        self.assertEqual(len(list(records)), 3)
 
     def test_generate_query_string_for_data_with_limit_filter(self):
         limit_filter = 1
-        expected_sql = "SELECT json FROM logger_instance"\
-                       " WHERE xform_id = %s  AND CAST(json->>%s AS INT) > %s"\
+        expected_sql = " WHERE xform_id = %s  AND CAST(json->>%s AS INT) > %s"\
                        " AND CAST(json->>%s AS INT) < %s AND deleted_at "\
                        "IS NULL ORDER BY id LIMIT %s"
 
@@ -114,7 +121,7 @@ class TestIntegratedDataView(TestAbstractViewSet):
             self.all_data,
             self.sort)
 
-        self.assertEquals(sql, expected_sql)
+        self.assertEquals(sql, get_json_projection_sql(columns) + expected_sql)
 
         records = [record for record in DataView.query_iterator(sql,
                                                                 columns,
@@ -125,8 +132,8 @@ class TestIntegratedDataView(TestAbstractViewSet):
 
     def test_generate_query_string_for_data_with_start_index_filter(self):
         start_index = 2
-        expected_sql = "SELECT json FROM logger_instance WHERE"\
-                       " xform_id = %s  AND CAST(json->>%s AS INT) > %s AND"\
+        expected_sql = " WHERE xform_id = %s  AND"\
+                       " CAST(json->>%s AS INT) > %s AND"\
                        " CAST(json->>%s AS INT) < %s AND deleted_at IS NULL "\
                        "ORDER BY id OFFSET %s"
 
@@ -138,7 +145,7 @@ class TestIntegratedDataView(TestAbstractViewSet):
             self.all_data,
             self.sort)
 
-        self.assertEquals(sql, expected_sql)
+        self.assertEquals(sql, get_json_projection_sql(columns) + expected_sql)
 
         records = [record for record in DataView.query_iterator(sql,
                                                                 columns,
@@ -152,8 +159,8 @@ class TestIntegratedDataView(TestAbstractViewSet):
 
     def test_generate_query_string_for_data_with_sort_column_asc(self):
         sort = '{"age":1}'
-        expected_sql = "SELECT json FROM logger_instance WHERE"\
-                       " xform_id = %s  AND CAST(json->>%s AS INT) > %s AND"\
+        expected_sql = " WHERE xform_id = %s  AND"\
+                       " CAST(json->>%s AS INT) > %s AND"\
                        " CAST(json->>%s AS INT) < %s AND deleted_at IS NULL"\
                        " ORDER BY  json->>%s ASC"
 
@@ -165,7 +172,7 @@ class TestIntegratedDataView(TestAbstractViewSet):
             self.all_data,
             sort)
 
-        self.assertEquals(sql, expected_sql)
+        self.assertEquals(sql, get_json_projection_sql(columns) + expected_sql)
 
         records = [record for record in DataView.query_iterator(sql,
                                                                 columns,
@@ -176,8 +183,8 @@ class TestIntegratedDataView(TestAbstractViewSet):
 
     def test_generate_query_string_for_data_with_sort_column_desc(self):
         sort = '{"age": -1}'
-        expected_sql = "SELECT json FROM logger_instance WHERE"\
-                       " xform_id = %s  AND CAST(json->>%s AS INT) > %s AND"\
+        expected_sql = " WHERE xform_id = %s  AND"\
+                       " CAST(json->>%s AS INT) > %s AND"\
                        " CAST(json->>%s AS INT) < %s AND deleted_at IS NULL"\
                        " ORDER BY  json->>%s DESC"
 
@@ -189,7 +196,7 @@ class TestIntegratedDataView(TestAbstractViewSet):
             self.all_data,
             sort)
 
-        self.assertEquals(sql, expected_sql)
+        self.assertEquals(sql, get_json_projection_sql(columns) + expected_sql)
 
         records = [record for record in DataView.query_iterator(sql,
                                                                 columns,
@@ -197,3 +204,47 @@ class TestIntegratedDataView(TestAbstractViewSet):
                                                                 self.count)]
 
         self.assertTrue(self.is_sorted_desc([r.get("age") for r in records]))
+
+    def test_materialized_dataview(self):
+        self.data_view.materialized = True
+        self.data_view.save()
+        self.assertEqual(self.data_view.memberships.count(), 3)
+
+        (sql, columns, params) = DataView.generate_query_string(
+            self.data_view,
+            self.start_index,
+            self.limit,
+            self.last_submission_time,
+            self.all_data,
+            self.sort)
+        expected_sql = " WHERE xform_id = %s  AND id IN (SELECT instance_id"\
+                       " FROM logger_dataviewinstance WHERE data_view_id ="\
+                       " %s) AND deleted_at IS NULL ORDER BY id"
+        self.assertEquals(sql, get_json_projection_sql(columns) + expected_sql)
+        self.assertEqual(len(list(DataView.query_data(self.data_view))), 3)
+
+        # deleted submissions leave the dataview
+        membership = self.data_view.memberships.first()
+        instance = membership.instance
+        self.assertTrue(self.data_view.has_instance(instance))
+        instance.set_deleted()
+        self.assertFalse(self.data_view.has_instance(instance))
+        self.assertEqual(self.data_view.memberships.count(), 2)
+        self.assertEqual(len(list(DataView.query_data(self.data_view))), 2)
+
+        # saving other fields keeps the members
+        with patch.object(DataView, 'rebuild_membership') as mock_rebuild:
+            self.data_view.name = 'renamed'
+            self.data_view.save()
+            DataView.objects.get(pk=self.data_view.pk).save()
+            self.assertFalse(mock_rebuild.called)
+
+        # changing the query rebuilds the members
+        self.data_view.query = [
+            {"column": "age", "filter": ">", "value": "0"}]
+        self.data_view.save()
+        self.assertEqual(self.data_view.memberships.count(), 7)
+
+        self.data_view.materialized = False
+        self.data_view.save()
+        self.assertEqual(self.data_view.memberships.count(), 0)
@@ -1,13 +1,18 @@
 import os
+from datetime import date
 from datetime import datetime
 from datetime import timedelta
 
 from django.http.request import HttpRequest
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.utils.timezone import utc
 from django_digest.test import DigestAuth
 from mock import patch
 
 from onadata.apps.logger.models import XForm, Instance, SubmissionReview
+from onadata.apps.logger.models.daily_submission_count import (
+    DailySubmissionCount, get_submission_date)
 from onadata.apps.logger.models.instance import (
     get_id_string_from_xml_str, numeric_checker)
 from onadata.apps.main.tests.test_base import TestBase
@@ -295,3 +300,45 @@ class TestInstance(TestBase):
         string_value = "Hello World"
         result = numeric_checker(string_value)
         self.assertEqual(result, "Hello World")
+
+    def test_daily_submission_counts(self):
+        """
+        Test submissions are counted per form and day
+        """
+        self._publish_transportation_form()
+        self._make_submissions()
+        count = self.xform.instances.count()
+        today = get_submission_date(timezone.now())
+        self.assertEqual(
+            list(self.xform.daily_submission_counts.values_list(
+                'date', 'count')), [(today, count)])
+        self.assertEqual(self.xform.submission_count_for_today(), count)
+
+        # the submission moves to the day it was received on
+        instance = self.xform.instances.first()
+        instance.date_created = parse_datetime('2013-02-18 15:54:01Z')
+        instance.save()
+        self.assertEqual(
+            sorted(self.xform.daily_submission_counts.values_list(
+                'date', 'count')),
+            [(date(2013, 2, 18), 1), (today, count - 1)])
+
+        instance.delete()
+        self.assertEqual(
+            self.xform.daily_submission_counts.get(
+                date=date(2013, 2, 18)).count, 0)
+
+    def test_delete_user_with_daily_submission_counts(self):
+        """
+        Test a user whose form has submissions counted per day can be
+        deleted, the cascade does not create the daily counts again
+        """
+        self._publish_transportation_form()
+        self._make_submissions()
+        self.assertTrue(self.xform.daily_submission_counts.exists())
+
+        self.user.delete()
+        self.assertFalse(XForm.objects.filter(pk=self.xform.pk).exists())
+        self.assertFalse(
+            DailySubmissionCount.objects.filter(
+                xform_id=self.xform.pk).exists())
@@ -12,6 +12,7 @@ from django.urls import reverse
 from django_digest.test import Client as DigestClient
 from future.moves.urllib.parse import urljoin
 from httmock import HTTMock, urlmatch
+from mock import patch
 
 from onadata.apps.logger.models import Instance, XForm
 from onadata.apps.logger.views import download_xform, formList, xformsManifest
@@ -134,6 +135,58 @@ class TestBriefcaseClient(TestBase):
             instance_folder_path, 'uuid%s' % instance.uuid, media_file)
         self.assertTrue(storage.exists(media_path))
 
+    def test_download_instances_resumes(self):
+        """
+        Test download_instances resumes from the saved cursor of the form
+        """
+        with HTTMock(form_list_xml):
+            self.bc.download_xforms()
+        with HTTMock(instances_xml):
+            self.bc.download_instances(self.xform.id_string)
+        instance = Instance.objects.all()[0]
+        self.assertEqual(
+            self.bc.get_resumption_cursor(self.xform.id_string),
+            '%s' % instance.pk)
+        instance_path = os.path.join(
+            'deno', 'briefcase', 'forms', self.xform.id_string, 'instances',
+            'uuid%s' % instance.uuid, 'submission.xml')
+        storage.delete(instance_path)
+
+        # submissions before the cursor are not downloaded again
+        with HTTMock(instances_xml):
+            self.bc.download_instances(self.xform.id_string)
+        self.assertFalse(storage.exists(instance_path))
+
+        with HTTMock(instances_xml):
+            self.bc.download_instances(self.xform.id_string, cursor=0)
+        self.assertTrue(storage.exists(instance_path))
+
+    def test_download_instances_failure_resumes(self):
+        """
+        Test the cursor is not saved past a submission that failed to
+        download and a resumed pull downloads it
+        """
+        with HTTMock(form_list_xml):
+            self.bc.download_xforms()
+        with patch.object(BriefcaseClient, '_download_instance',
+                          side_effect=IOError('connection reset')):
+            with HTTMock(instances_xml):
+                self.bc.download_instances(self.xform.id_string)
+        self.assertEqual(
+            self.bc.get_resumption_cursor(self.xform.id_string), 0)
+        instance = Instance.objects.all()[0]
+        instance_path = os.path.join(
+            'deno', 'briefcase', 'forms', self.xform.id_string, 'instances',
+            'uuid%s' % instance.uuid, 'submission.xml')
+        self.assertFalse(storage.exists(instance_path))
+
+        with HTTMock(instances_xml):
+            self.bc.download_instances(self.xform.id_string)
+        self.assertTrue(storage.exists(instance_path))
+        self.assertEqual(
+            self.bc.get_resumption_cursor(self.xform.id_string),
+            '%s' % instance.pk)
+
     def test_push(self):
         with HTTMock(form_list_xml):
             self.bc.download_xforms()
@@ -1,5 +1,12 @@
 from django.contrib.auth.models import User
 from django.contrib.auth.backends import ModelBackend as DjangoModelBackend
+from guardian.backends import ObjectPermissionBackend as \
+    GuardianObjectPermissionBackend
+from guardian.backends import check_support
+from guardian.ctypes import get_content_type
+from guardian.exceptions import WrongAppError
+
+from onadata.libs.utils.permission_cache import get_permission_checker
 
 
 class ModelBackend(DjangoModelBackend):
@@ -11,3 +18,32 @@ class ModelBackend(DjangoModelBackend):
                 return user
         except User.DoesNotExist:
             return None
+
+
+class ObjectPermissionBackend(GuardianObjectPermissionBackend):
+    """
+    Object permission backend that answers checks from the permission cache
+    of the request, the permissions of a user on an object are fetched once.
+    """
+
+    def has_perm(self, user_obj, perm, obj=None):
+        support, user_obj = check_support(user_obj, obj)
+        if not support:
+            return False
+
+        if '.' in perm:
+            app_label, _perm = perm.split('.', 1)
+            if app_label != obj._meta.app_label and \
+                    app_label != get_content_type(obj).app_label:
+                raise WrongAppError(
+                    "Passed perm has app label of '%s' while given obj has "
+                    "app label '%s'" % (app_label, obj._meta.app_label))
+
+        return get_permission_checker(user_obj).has_perm(perm, obj)
+
+    def get_all_permissions(self, user_obj, obj=None):
+        support, user_obj = check_support(user_obj, obj)
+        if not support:
+            return set()
+
+        return set(get_permission_checker(user_obj).get_perms(obj))
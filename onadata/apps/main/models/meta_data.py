@@ -18,7 +18,9 @@ from django.db import IntegrityError, models
 from django.db.models.signals import post_delete, post_save
 from past.builtins import basestring
 
-from onadata.libs.utils.cache_tools import XFORM_METADATA_CACHE, safe_delete
+from onadata.libs.utils.cache_tools import (FORMLIST_NAMESPACE,
+                                            XFORM_METADATA_CACHE,
+                                            bump_namespace, safe_delete)
 from onadata.libs.utils.common_tags import (GOOGLE_SHEET_DATA_TYPE, TEXTIT,
                                             XFORM_META_PERMS)
 
@@ -179,7 +181,10 @@ class MetaData(models.Model):
                            'content_type')
 
     def save(self, *args, **kwargs):
-        self._set_hash()
+        # only hash new files, hashing reads the whole file
+        if not self.file_hash or \
+                not getattr(self.data_file, '_committed', True):
+            self._set_hash()
         super(MetaData, self).save(*args, **kwargs)
 
     @property
@@ -434,6 +439,11 @@ def clear_cached_metadata_instance_object(
         sender, instance=None, created=False, **kwargs):
     safe_delete('{}{}'.format(
         XFORM_METADATA_CACHE, instance.object_id))
+    if instance.data_type == 'media':
+        # the manifest of the form changed
+        content_object = instance.content_object
+        if content_object is not None and hasattr(content_object, 'user_id'):
+            bump_namespace(FORMLIST_NAMESPACE, content_object.user_id)
 
 
 def update_attached_object(sender, instance=None, created=False, **kwargs):
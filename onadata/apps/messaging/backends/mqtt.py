@@ -4,9 +4,15 @@ Messaging notification backend for MQTT
 """
 from __future__ import unicode_literals
 
+import atexit
 import json
+import os
 import ssl
+import threading
+import time
+from collections import deque
 
+import paho.mqtt.client as mqtt
 import paho.mqtt.publish as publish
 from django.conf import settings
 
@@ -69,6 +75,209 @@ def get_payload(instance):
     return json.dumps(payload)
 
 
+class MQTTClient(object):
+    """
+    Long lived MQTT client connection.
+
+    The paho network loop runs in a background thread that reconnects with
+    an exponential backoff whenever the connection drops. Messages published
+    while disconnected are held in an outbound queue, of at most
+    max_queued_messages messages, and published in one batch once the
+    connection is up again.
+
+    The client needs threads, it is only used by celery workers. uWSGI web
+    workers do not run threads unless enable-threads is set.
+    """
+
+    def __init__(self, host, port=None, cert_info=None, keepalive=60,
+                 max_queued_messages=1000, reconnect_delay=(1, 120)):
+        self.host = host
+        self.port = port or 1883
+        self.max_queued_messages = max_queued_messages
+        self.connected = False
+        # the lock guards the outbound queue and publishing, metrics have
+        # their own lock since paho calls on_publish with its locks held
+        self.lock = threading.RLock()
+        self.metrics_lock = threading.Lock()
+        self.queue = deque()
+        self.metrics = {
+            'connects': 0,
+            'disconnects': 0,
+            'published': 0,
+            'acknowledged': 0,
+            'queued': 0,
+            'pending': 0,
+            'dropped': 0,
+            'failed': 0,
+        }
+
+        self.client = mqtt.Client()
+        if cert_info:
+            self.client.tls_set(**cert_info)
+        self.client.reconnect_delay_set(*reconnect_delay)
+        self.client.on_connect = self.on_connect
+        self.client.on_disconnect = self.on_disconnect
+        self.client.on_publish = self.on_publish
+        self.client.connect_async(self.host, self.port, keepalive)
+        self.client.loop_start()
+
+    def on_connect(self, client, userdata, flags, rc):
+        # pylint: disable=unused-argument,invalid-name
+        """
+        Publishes the queued messages once connected.
+        """
+        if rc == mqtt.CONNACK_ACCEPTED:
+            self.connected = True
+            self.count('connects')
+            self.flush()
+
+    def on_disconnect(self, client, userdata, rc):
+        # pylint: disable=unused-argument,invalid-name
+        """
+        Queues messages until the network loop reconnects.
+        """
+        self.connected = False
+        self.count('disconnects')
+
+    def on_publish(self, client, userdata, mid):
+        # pylint: disable=unused-argument
+        """
+        Counts messages delivered to the broker, for QoS 1 and 2 messages
+        this is when the broker acknowledges the message.
+        """
+        self.count('acknowledged')
+
+    def count(self, metric, value=1):
+        """
+        Increments a metric.
+        """
+        with self.metrics_lock:
+            self.metrics[metric] += value
+
+    def _enqueue(self, message):
+        if len(self.queue) >= self.max_queued_messages:
+            self.queue.popleft()
+            self.count('queued', -1)
+            self.count('dropped')
+        self.queue.append(message)
+        self.count('queued')
+
+    def _publish(self, message):
+        topic, payload, qos, retain = message
+        info = self.client.publish(topic, payload, qos=qos, retain=retain)
+        if info.rc == mqtt.MQTT_ERR_SUCCESS:
+            self.count('published')
+        elif info.rc == mqtt.MQTT_ERR_NO_CONN:
+            # queue until the network loop reconnects
+            self.connected = False
+            if qos == 0:
+                self._enqueue(message)
+            else:
+                # QoS 1 and 2 messages are kept and resent by paho
+                self.count('pending')
+        else:
+            self.count('failed')
+
+        return info
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        """
+        Publishes a message, or queues it while disconnected.
+        """
+        message = (topic, payload, qos, retain)
+        with self.lock:
+            if self.connected:
+                self._publish(message)
+            else:
+                self._enqueue(message)
+
+    def flush(self):
+        """
+        Publishes the queued messages.
+        """
+        with self.lock:
+            while self.queue and self.connected:
+                self.count('queued', -1)
+                self._publish(self.queue.popleft())
+
+    def close(self, timeout=5):
+        """
+        Publishes the queued messages, disconnects and stops the network
+        loop, waiting at most timeout seconds for the connection to publish
+        the messages. Messages still queued then are dropped.
+        """
+        deadline = time.monotonic() + timeout
+        # the queue is published once the network loop connects
+        while self.queue and time.monotonic() < deadline:
+            time.sleep(0.05)
+        with self.lock:
+            self.count('queued', -len(self.queue))
+            self.count('dropped', len(self.queue))
+            self.queue.clear()
+
+        # the network loop sends the published messages before the
+        # disconnect packet and calls on_disconnect once it is sent
+        self.client.disconnect()
+        while self.connected and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.client.loop_stop()
+
+
+MQTT_CLIENTS = {}
+MQTT_CLIENTS_LOCK = threading.Lock()
+MQTT_CLIENTS_PID = None
+
+
+def get_mqtt_client(host, port=None, cert_info=None, **kwargs):
+    """
+    Returns the MQTTClient of this process for the broker at host:port.
+
+    Clients are created on first use and reused for the lifetime of the
+    worker process. Forked processes, e.g. celery workers, create their own
+    clients since the network loop thread does not survive a fork.
+    """
+    global MQTT_CLIENTS_PID  # pylint: disable=global-statement
+
+    key = (host, port, json.dumps(cert_info, sort_keys=True))
+    with MQTT_CLIENTS_LOCK:
+        if MQTT_CLIENTS_PID != os.getpid():
+            MQTT_CLIENTS.clear()
+            MQTT_CLIENTS_PID = os.getpid()
+        client = MQTT_CLIENTS.get(key)
+        if client is None:
+            client = MQTTClient(host, port, cert_info, **kwargs)
+            MQTT_CLIENTS[key] = client
+
+    return client
+
+
+def get_mqtt_metrics():
+    """
+    Returns the metrics of the MQTT clients of this process by broker.
+    """
+    with MQTT_CLIENTS_LOCK:
+        clients = list(MQTT_CLIENTS.values()) \
+            if MQTT_CLIENTS_PID == os.getpid() else []
+
+    metrics = {}
+    for client in clients:
+        with client.metrics_lock:
+            broker = '{}:{}'.format(client.host, client.port)
+            metrics[broker] = dict(client.metrics, connected=client.connected)
+
+    return metrics
+
+
+@atexit.register
+def close_mqtt_clients():
+    """
+    Disconnects the MQTT clients of this process.
+    """
+    if MQTT_CLIENTS_PID == os.getpid():
+        for client in list(MQTT_CLIENTS.values()):
+            client.close()
+
+
 class MQTTBackend(BaseBackend):
     """
     Notification backend for MQTT
@@ -99,6 +308,17 @@ class MQTTBackend(BaseBackend):
         self.qos = options.get('QOS', 0)
         self.retain = options.get('RETAIN', False)
         self.topic_base = options.get('TOPIC_BASE', 'onadata')
+        self.client_options = {
+            'keepalive': options.get('KEEPALIVE', 60),
+            'max_queued_messages': options.get('MAX_QUEUED_MESSAGES', 1000),
+        }
+
+    def get_client(self):
+        """
+        Returns the persistent MQTT client for the configured broker.
+        """
+        return get_mqtt_client(
+            self.host, self.port, self.cert_info, **self.client_options)
 
     def get_topic(self, instance):
         """
@@ -127,11 +347,21 @@ class MQTTBackend(BaseBackend):
     def send(self, instance):
         """
         Sends the message to appropriate MQTT topic(s)
+
+        With MESSAGING_ASYNC_NOTIFICATION messages are sent by celery
+        workers over the persistent MQTT connection of the worker. Otherwise
+        they are sent by the web process, which may not run the network loop
+        thread of the persistent connection, over a connection opened for
+        the message and closed once the message is sent.
         """
         topic = self.get_topic(instance)
         payload = get_payload(instance)
-        # send it
-
-        return publish.single(topic, payload=payload, hostname=self.host,
-                              port=self.port, tls=self.cert_info, qos=self.qos,
-                              retain=self.retain)
+        if getattr(settings, 'MESSAGING_ASYNC_NOTIFICATION', False):
+            self.get_client().publish(
+                topic, payload, qos=self.qos, retain=self.retain)
+        else:
+            publish.single(
+                topic, payload=payload, qos=self.qos, retain=self.retain,
+                hostname=self.host, port=self.port or 1883,
+                keepalive=self.client_options['keepalive'],
+                tls=self.cert_info)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Messaging notification coalescer.
+
+Aggregates the messages of a target, e.g. the submission_created messages of
+a form, over a short window and sends one message with the list of instance
+ids instead of one message per instance.
+
+The instance ids of a batch are kept in the django cache and the batch is
+sent by a celery task scheduled when the batch starts, a batch does not
+depend on the web process that started it.
+"""
+from __future__ import unicode_literals
+
+import uuid
+
+from celery import task
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from onadata.apps.messaging.serializers import send_message
+from onadata.libs.utils.cache_tools import MESSAGE_BATCH
+
+# seconds a batch is sent after it closes, lets pending writes to it finish
+FLUSH_DELAY = 1
+
+
+def dispatch_message(instance_id, target_id, target_type, user,
+                     message_verb):
+    """
+    Sends the message, as a celery task when
+    ASYNC_POST_SUBMISSION_PROCESSING_ENABLED is set.
+    """
+    if getattr(settings, 'ASYNC_POST_SUBMISSION_PROCESSING_ENABLED', False):
+        send_message.apply_async(args=[
+            instance_id, target_id, target_type, user, message_verb])
+    else:
+        send_message(
+            instance_id=instance_id, target_id=target_id,
+            target_type=target_type, user=user, message_verb=message_verb)
+
+
+def _get_batch_ttl():
+    return getattr(settings, 'NOTIFICATION_BATCH_WINDOW', 0) * 2 + 60
+
+
+def _get_batch_key(target_id, target_type, user_id, message_verb):
+    return '{}{}-{}-{}-{}'.format(
+        MESSAGE_BATCH, target_type, target_id, user_id, message_verb)
+
+
+def _get_batch_item_key(batch_id, item):
+    return '{}{}-{}'.format(MESSAGE_BATCH, batch_id, item)
+
+
+def _get_open_batch(batch_key, window):
+    """
+    Returns the id of the open batch of batch_key and whether it was opened
+    by this call, a batch is open for window seconds.
+    """
+    batch_id = cache.get(batch_key)
+    while batch_id is None:
+        new_batch_id = uuid.uuid4().hex
+        if cache.add(batch_key, new_batch_id, window):
+            return new_batch_id, True
+        batch_id = cache.get(batch_key)
+
+    return batch_id, False
+
+
+def add_to_batch(instance_id, target_id, target_type, user, message_verb):
+    """
+    Adds a message to the open batch of its target, user and verb. A batch
+    that reaches NOTIFICATION_BATCH_MAX_SIZE instance ids is closed and sent
+    right away.
+    """
+    window = getattr(settings, 'NOTIFICATION_BATCH_WINDOW', 0)
+    max_batch_size = getattr(settings, 'NOTIFICATION_BATCH_MAX_SIZE', 1000)
+    user_id = getattr(user, 'pk', None)
+    batch_args = [target_id, target_type, user_id, message_verb]
+    batch_key = _get_batch_key(*batch_args)
+    batch_id, opened = _get_open_batch(batch_key, window)
+
+    ttl = _get_batch_ttl()
+    count_key = _get_batch_item_key(batch_id, 'count')
+    cache.add(count_key, 0, ttl)
+    index = cache.incr(count_key)
+    instance_ids = instance_id \
+        if isinstance(instance_id, list) else [instance_id]
+    cache.set(_get_batch_item_key(batch_id, index), instance_ids, ttl)
+
+    if index == max_batch_size:
+        # later messages open a new batch
+        if cache.get(batch_key) == batch_id:
+            cache.delete(batch_key)
+        flush_message_batch.apply_async(
+            args=[batch_id] + batch_args, countdown=FLUSH_DELAY)
+    elif opened:
+        # sent once the batch closes
+        flush_message_batch.apply_async(
+            args=[batch_id] + batch_args, countdown=window + FLUSH_DELAY)
+
+
+@task(ignore_result=True)
+def flush_message_batch(batch_id, target_id, target_type, user_id,
+                        message_verb):
+    """
+    Sends the instance ids of a batch as one message, a batch is sent once.
+    """
+    ttl = _get_batch_ttl()
+    if not cache.add(_get_batch_item_key(batch_id, 'sent'), True, ttl):
+        return
+
+    # the batch has closed, unless the cache kept it longer than the window
+    batch_key = _get_batch_key(target_id, target_type, user_id, message_verb)
+    if cache.get(batch_key) == batch_id:
+        cache.delete(batch_key)
+
+    count_key = _get_batch_item_key(batch_id, 'count')
+    item_keys = [_get_batch_item_key(batch_id, index)
+                 for index in range(1, (cache.get(count_key) or 0) + 1)]
+    items = cache.get_many(item_keys)
+    cache.delete_many(item_keys + [count_key])
+    instance_ids = []
+    for key in item_keys:
+        instance_ids.extend(items.get(key, []))
+
+    if instance_ids:
+        user = User.objects.filter(pk=user_id).first() \
+            if user_id is not None else None
+        send_message(
+            instance_id=instance_ids
+            if len(instance_ids) > 1 else instance_ids[0],
+            target_id=target_id, target_type=target_type, user=user,
+            message_verb=message_verb)
+
+
+def queue_message(instance_id, target_id, target_type, user, message_verb):
+    """
+    Sends the message batched with the other messages of the same target,
+    user and verb when NOTIFICATION_BATCH_WINDOW is set, otherwise sends it
+    right away.
+    """
+    if getattr(settings, 'NOTIFICATION_BATCH_WINDOW', 0):
+        add_to_batch(instance_id, target_id, target_type, user, message_verb)
+    else:
+        dispatch_message(
+            instance_id, target_id, target_type, user, message_verb)
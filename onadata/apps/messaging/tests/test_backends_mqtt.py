@@ -8,10 +8,13 @@ import json
 import ssl
 
 from django.test import TestCase
+from django.test.utils import override_settings
 
 from mock import MagicMock, patch
 
-from onadata.apps.messaging.backends.mqtt import (MQTTBackend, get_payload,
+from onadata.apps.messaging.backends.mqtt import (MQTTBackend, MQTTClient,
+                                                  get_mqtt_metrics,
+                                                  get_payload,
                                                   get_target_metadata)
 from onadata.apps.messaging.constants import PROJECT, XFORM
 from onadata.apps.messaging.tests.test_base import (_create_message,
@@ -101,6 +104,26 @@ class TestMQTTBackend(TestCase):
         self.assertEqual(json.dumps(payload), get_payload(instance))
 
     @patch('onadata.apps.messaging.backends.mqtt.publish.single')
+    @patch('onadata.apps.messaging.backends.mqtt.mqtt.Client')
+    def test_mqtt_send_from_web_process(self, mocked, mocked_single):
+        """
+        Test MQTT Backend send method publishes over a connection for the
+        message without MESSAGING_ASYNC_NOTIFICATION
+        """
+        from_user = _create_user('Bob')
+        to_user = _create_user('Alice')
+        instance = _create_message(from_user, to_user, 'I love oov')
+        mqtt = MQTTBackend(options={'HOST': 'localhost'})
+        mqtt.send(instance=instance)
+        self.assertFalse(mocked.called)
+        mocked_single.assert_called_once_with(
+            mqtt.get_topic(instance), payload=get_payload(instance), qos=0,
+            retain=False, hostname='localhost', port=1883, keepalive=60,
+            tls=None)
+
+    @override_settings(MESSAGING_ASYNC_NOTIFICATION=True)
+    @patch.dict('onadata.apps.messaging.backends.mqtt.MQTT_CLIENTS', {})
+    @patch('onadata.apps.messaging.backends.mqtt.mqtt.Client')
     def test_mqtt_send(self, mocked):
         """
         Test MQTT Backend send method
@@ -116,19 +139,96 @@ class TestMQTTBackend(TestCase):
             'CERT_FILE': 'emq.pem',
             'KEY_FILE': 'emq.key'
         })
+        client = mqtt.get_client()
+        client.on_connect(client.client, None, {}, 0)
+        mocked.return_value.publish.return_value.rc = 0
         mqtt.send(instance=instance)
-        self.assertTrue(mocked.called)
-        args, kwargs = mocked.call_args_list[0]
+        self.assertTrue(mocked.return_value.publish.called)
+        args, kwargs = mocked.return_value.publish.call_args_list[0]
         self.assertEquals(mqtt.get_topic(instance), args[0])
-        self.assertEquals(get_payload(instance), kwargs['payload'])
-        self.assertEquals('localhost', kwargs['hostname'])
-        self.assertEquals(8883, kwargs['port'])
+        self.assertEquals(get_payload(instance), args[1])
         self.assertEquals(0, kwargs['qos'])
         self.assertEquals(False, kwargs['retain'])
-        self.assertDictEqual(
-            dict(ca_certs='cacert.pem',
-                 certfile='emq.pem',
-                 keyfile='emq.key',
-                 tls_version=ssl.PROTOCOL_TLSv1_2,
-                 cert_reqs=ssl.CERT_NONE),
-            kwargs['tls'])
+        mocked.return_value.connect_async.assert_called_with(
+            'localhost', 8883, 60)
+        mocked.return_value.tls_set.assert_called_with(
+            ca_certs='cacert.pem',
+            certfile='emq.pem',
+            keyfile='emq.key',
+            tls_version=ssl.PROTOCOL_TLSv1_2,
+            cert_reqs=ssl.CERT_NONE)
+
+        # the connection is reused
+        mqtt.send(instance=instance)
+        self.assertEqual(mocked.call_count, 1)
+        self.assertEqual(mocked.return_value.publish.call_count, 2)
+        metrics = get_mqtt_metrics()['localhost:8883']
+        self.assertEqual(metrics['published'], 2)
+        self.assertTrue(metrics['connected'])
+
+    @patch('onadata.apps.messaging.backends.mqtt.mqtt.Client')
+    def test_mqtt_client_queue(self, mocked):
+        """
+        Test MQTTClient queues messages while disconnected
+        """
+        mocked.return_value.publish.return_value.rc = 0
+        client = MQTTClient('localhost', max_queued_messages=2)
+        client.publish('/onadata/a', 'a')
+        client.publish('/onadata/b', 'b')
+        client.publish('/onadata/c', 'c')
+        self.assertFalse(mocked.return_value.publish.called)
+        self.assertEqual(client.metrics['queued'], 2)
+        self.assertEqual(client.metrics['dropped'], 1)
+
+        client.on_connect(client.client, None, {}, 0)
+        self.assertEqual(
+            [call[0][0] for call in
+             mocked.return_value.publish.call_args_list],
+            ['/onadata/b', '/onadata/c'])
+        self.assertEqual(client.metrics['queued'], 0)
+        self.assertEqual(client.metrics['published'], 2)
+
+        # QoS 0 messages are queued again when the connection drops
+        mocked.return_value.publish.return_value.rc = 4
+        client.publish('/onadata/d', 'd')
+        self.assertEqual(client.metrics['queued'], 1)
+        self.assertFalse(client.connected)
+        client.on_disconnect(client.client, None, 1)
+        client.publish('/onadata/e', 'e', qos=1)
+        self.assertEqual(client.metrics['queued'], 2)
+        self.assertEqual(mocked.return_value.publish.call_count, 3)
+
+        mocked.return_value.publish.return_value.rc = 0
+        client.on_connect(client.client, None, {}, 0)
+        self.assertEqual(client.metrics['queued'], 0)
+        self.assertEqual(client.metrics['published'], 4)
+
+        # QoS 1 and 2 messages paho could not send are pending, not
+        # published
+        mocked.return_value.publish.return_value.rc = 4
+        client.publish('/onadata/f', 'f', qos=1)
+        self.assertEqual(client.metrics['queued'], 0)
+        self.assertEqual(client.metrics['pending'], 1)
+        self.assertEqual(client.metrics['published'], 4)
+
+    @patch('onadata.apps.messaging.backends.mqtt.mqtt.Client')
+    def test_mqtt_client_close(self, mocked):
+        """
+        Test MQTTClient publishes the queued messages before disconnecting
+        """
+        mocked.return_value.publish.return_value.rc = 0
+        client = MQTTClient('localhost')
+        client.publish('/onadata/a', 'a')
+        client.on_connect(client.client, None, {}, 0)
+        client.publish('/onadata/b', 'b')
+        client.on_disconnect(client.client, None, 1)
+        client.publish('/onadata/c', 'c')
+        client.close(timeout=0.1)
+        self.assertEqual(
+            [call[0][0] for call in
+             mocked.return_value.publish.call_args_list],
+            ['/onadata/a', '/onadata/b'])
+        self.assertEqual(client.metrics['queued'], 0)
+        self.assertEqual(client.metrics['dropped'], 1)
+        self.assertTrue(mocked.return_value.disconnect.called)
+        self.assertTrue(mocked.return_value.loop_stop.called)
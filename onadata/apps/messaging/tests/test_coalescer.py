@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Tests Messaging app notification coalescer.
+"""
+from __future__ import unicode_literals
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from mock import patch
+
+from onadata.apps.messaging.coalescer import (flush_message_batch,
+                                              queue_message)
+from onadata.apps.messaging.constants import (SUBMISSION_CREATED,
+                                              SUBMISSION_EDITED, XFORM)
+from onadata.apps.messaging.tests.test_base import _create_user
+
+
+@override_settings(NOTIFICATION_BATCH_WINDOW=60,
+                   NOTIFICATION_BATCH_MAX_SIZE=1000)
+class TestMessageCoalescer(TestCase):
+    """
+    Test the messaging notification coalescer
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = _create_user('Bob')
+
+    def _flush_batches(self, apply_async_mock):
+        for call in apply_async_mock.call_args_list:
+            flush_message_batch(*call[1]['args'])
+
+    @patch('onadata.apps.messaging.coalescer.send_message')
+    @patch('onadata.apps.messaging.coalescer.flush_message_batch.apply_async')
+    def test_coalesce_messages(self, apply_async_mock, send_message_mock):
+        """
+        Test messages are sent in one batch per target, user and verb.
+        """
+        for instance_id in range(1, 4):
+            queue_message(instance_id, 1, XFORM, self.user,
+                          SUBMISSION_CREATED)
+        queue_message(4, 1, XFORM, self.user, SUBMISSION_EDITED)
+        queue_message(5, 2, XFORM, self.user, SUBMISSION_CREATED)
+        self.assertFalse(send_message_mock.called)
+        # a batch is sent once its window is over
+        self.assertEqual(apply_async_mock.call_count, 3)
+        self.assertEqual(
+            set(call[1]['countdown']
+                for call in apply_async_mock.call_args_list), {61})
+
+        self._flush_batches(apply_async_mock)
+        self.assertEqual(send_message_mock.call_count, 3)
+        sent = sorted(
+            [call[1] for call in send_message_mock.call_args_list],
+            key=lambda kwargs: (kwargs['target_id'], kwargs['message_verb']))
+        self.assertEqual(sent[0]['instance_id'], [1, 2, 3])
+        self.assertEqual(sent[0]['message_verb'], SUBMISSION_CREATED)
+        self.assertEqual(sent[0]['user'], self.user)
+        self.assertEqual(sent[1]['instance_id'], 4)
+        self.assertEqual(sent[1]['message_verb'], SUBMISSION_EDITED)
+        self.assertEqual(sent[2]['instance_id'], 5)
+        self.assertEqual(sent[2]['target_id'], 2)
+
+        # a batch is sent once
+        self._flush_batches(apply_async_mock)
+        self.assertEqual(send_message_mock.call_count, 3)
+
+        # later messages open a new batch
+        queue_message(6, 1, XFORM, self.user, SUBMISSION_CREATED)
+        self.assertEqual(apply_async_mock.call_count, 4)
+
+    @override_settings(NOTIFICATION_BATCH_MAX_SIZE=2)
+    @patch('onadata.apps.messaging.coalescer.send_message')
+    @patch('onadata.apps.messaging.coalescer.flush_message_batch.apply_async')
+    def test_coalesce_max_batch_size(self, apply_async_mock,
+                                     send_message_mock):
+        """
+        Test a batch is sent once it reaches the max batch size.
+        """
+        queue_message(1, 1, XFORM, self.user, SUBMISSION_CREATED)
+        self.assertEqual(apply_async_mock.call_count, 1)
+        queue_message(2, 1, XFORM, self.user, SUBMISSION_CREATED)
+        self.assertEqual(apply_async_mock.call_count, 2)
+        self.assertEqual(apply_async_mock.call_args[1]['countdown'], 1)
+        flush_message_batch(*apply_async_mock.call_args[1]['args'])
+        send_message_mock.assert_called_once_with(
+            instance_id=[1, 2], target_id=1, target_type=XFORM,
+            user=self.user, message_verb=SUBMISSION_CREATED)
+
+        # the full batch is closed
+        queue_message(3, 1, XFORM, self.user, SUBMISSION_CREATED)
+        self.assertEqual(apply_async_mock.call_count, 3)
+        self.assertNotEqual(apply_async_mock.call_args_list[0][1]['args'][0],
+                            apply_async_mock.call_args[1]['args'][0])
+
+    @override_settings(NOTIFICATION_BATCH_WINDOW=0)
+    @patch('onadata.apps.messaging.coalescer.send_message')
+    def test_queue_message(self, send_message_mock):
+        """
+        Test queue_message sends messages right away without a window.
+        """
+        queue_message(1, 1, XFORM, self.user, SUBMISSION_CREATED)
+        send_message_mock.assert_called_once_with(
+            instance_id=1, target_id=1, target_type=XFORM, user=self.user,
+            message_verb=SUBMISSION_CREATED)
@@ -1,3 +1,9 @@
 class RestServiceInterface(object):
+    # whether the service can receive a JSON array of submissions
+    supports_batches = False
+
     def send(self, url, data=None):
         raise NotImplementedError
+
+    def send_batch(self, url, submission_instances):
+        raise NotImplementedError
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.10 on 2026-10-19 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logger', '0060_auto_20200305_0357'),
+        ('restservice', '0005_auto_20190125_0517'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeadLetter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('status_code', models.PositiveIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('date_modified', models.DateTimeField(auto_now=True)),
+                ('instance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='logger.Instance')),
+                ('rest_service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dead_letters', to='restservice.RestService')),
+            ],
+        ),
+    ]
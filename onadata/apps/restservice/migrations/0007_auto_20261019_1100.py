@@ -0,0 +1,28 @@
+# Generated by Django 2.2.10 on 2026-10-19 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restservice', '0006_deadletter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restservice',
+            name='batch_cursor',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='restservice',
+            name='batch_delay',
+            field=models.PositiveIntegerField(default=60, verbose_name='Batch delay'),
+        ),
+        migrations.AddField(
+            model_name='restservice',
+            name='batch_size',
+            field=models.PositiveIntegerField(default=0, verbose_name='Batch size'),
+        ),
+    ]
@@ -36,10 +36,26 @@ class RestService(models.Model):
                                  blank=False, null=False)
     inactive_reason = models.TextField(ugettext_lazy("Inactive reason"),
                                        blank=True, default="")
+    # batch mode, submissions are sent in batches of up to batch_size
+    # submissions at most batch_delay seconds after they are received
+    batch_size = models.PositiveIntegerField(
+        ugettext_lazy("Batch size"), default=0)
+    batch_delay = models.PositiveIntegerField(
+        ugettext_lazy("Batch delay"), default=60)
+    # the id of the last submission sent in batch mode
+    batch_cursor = models.PositiveIntegerField(null=True, blank=True)
 
     def __str__(self):
         return u"%s:%s - %s" % (self.xform, self.long_name, self.service_url)
 
+    def save(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        if self.is_batched and self.batch_cursor is None:
+            # only submissions received once batch mode is on are sent
+            last_instance = self.xform.instances.only('pk').last()
+            self.batch_cursor = last_instance.pk if last_instance else 0
+
+        super(RestService, self).save(*args, **kwargs)
+
     def get_service_definition(self):
         """
         Returns ServiceDefinition class
@@ -60,6 +76,47 @@ class RestService(models.Model):
 
         return service_definition.verbose_name
 
+    @property
+    def is_batched(self):
+        """
+        Returns True if submissions are sent to the service in batches.
+        """
+        return self.batch_size > 1 and getattr(
+            self.get_service_definition(), 'supports_batches', False)
+
+
+@python_2_unicode_compatible
+class DeadLetter(models.Model):
+    """
+    A submission that could not be delivered to a RestService after all
+    delivery attempts.
+    """
+
+    class Meta:
+        app_label = 'restservice'
+
+    rest_service = models.ForeignKey(
+        RestService, related_name='dead_letters', on_delete=models.CASCADE)
+    instance = models.ForeignKey('logger.Instance', on_delete=models.CASCADE)
+    attempts = models.PositiveIntegerField(default=0)
+    status_code = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return u"%s - %s" % (self.rest_service, self.instance_id)
+
+    def redeliver(self):
+        """
+        Queues the submission for delivery to the RestService again.
+        """
+        from onadata.apps.restservice.tasks import call_service_delivery_async
+
+        call_service_delivery_async.apply_async(
+            args=[self.rest_service_id, self.instance_id])
+        self.delete()
+
 
 def delete_metadata(sender, instance, **kwargs):  # pylint: disable=W0613
     """
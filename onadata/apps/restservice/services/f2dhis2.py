@@ -1,6 +1,5 @@
-import requests
-
 from onadata.apps.restservice.RestServiceInterface import RestServiceInterface
+from onadata.apps.restservice.utils import deliver
 
 
 class ServiceDefinition(RestServiceInterface):
@@ -13,4 +12,4 @@ class ServiceDefinition(RestServiceInterface):
             "uuid": submission_instance.uuid
         }
         valid_url = url % info
-        requests.get(valid_url)
+        deliver(valid_url, method='GET')
@@ -1,15 +1,21 @@
 import json
 
-import requests
-
 from onadata.apps.restservice.RestServiceInterface import RestServiceInterface
+from onadata.apps.restservice.utils import deliver
 
 
 class ServiceDefinition(RestServiceInterface):
     id = u'json'
     verbose_name = u'JSON POST'
+    supports_batches = True
 
     def send(self, url, submission_instance):
         post_data = json.dumps(submission_instance.json)
         headers = {"Content-Type": "application/json"}
-        requests.post(url, headers=headers, data=post_data)
+        deliver(url, headers=headers, data=post_data)
+
+    def send_batch(self, url, submission_instances):
+        post_data = json.dumps(
+            [instance.json for instance in submission_instances])
+        headers = {"Content-Type": "application/json"}
+        deliver(url, headers=headers, data=post_data)
@@ -1,6 +1,5 @@
-import requests
-
 from onadata.apps.restservice.RestServiceInterface import RestServiceInterface
+from onadata.apps.restservice.utils import deliver
 
 
 class ServiceDefinition(RestServiceInterface):
@@ -9,4 +8,4 @@ class ServiceDefinition(RestServiceInterface):
 
     def send(self, url, submission_instance):
         headers = {"Content-Type": "application/xml"}
-        requests.post(url, data=submission_instance.xml, headers=headers)
+        deliver(url, data=submission_instance.xml, headers=headers)
@@ -1,6 +1,8 @@
 from celery import task
 
-from onadata.apps.restservice.utils import call_service
+from onadata.apps.restservice.utils import (call_service,
+                                            send_batch_to_service,
+                                            send_to_service)
 
 
 @task()
@@ -16,3 +18,38 @@ def call_service_async(instance_pk):
         pass
     else:
         call_service(instance)
+
+
+@task(ignore_result=True)
+def call_service_delivery_async(rest_service_pk, instance_pk, attempt=0,
+                                slot_waits=0):
+    """
+    Delivers a submission to a single rest service, used to retry failed
+    deliveries.
+    """
+    from onadata.apps.logger.models.instance import Instance
+    from onadata.apps.restservice.models import RestService
+
+    try:
+        instance = Instance.objects.get(pk=instance_pk)
+        rest_service = RestService.objects.get(pk=rest_service_pk)
+    except (Instance.DoesNotExist, RestService.DoesNotExist):
+        # the submission or the service has been removed since
+        pass
+    else:
+        send_to_service(rest_service, instance, attempt, slot_waits)
+
+
+@task(ignore_result=True)
+def call_service_batch_async(rest_service_pk, attempt=0):
+    """
+    Delivers the pending submissions of a rest service in batch mode.
+    """
+    from onadata.apps.restservice.models import RestService
+
+    try:
+        rest_service = RestService.objects.get(pk=rest_service_pk)
+    except RestService.DoesNotExist:
+        pass
+    else:
+        send_batch_to_service(rest_service, attempt)
@@ -1,17 +1,26 @@
+import json
 import os
+import threading
 import time
 
+import requests
+from django.core.cache import cache
+from django.db import connection, transaction
 from django.test.utils import override_settings
 from django.urls import reverse
 from mock import patch
 
+from onadata.apps.logger.models.instance import lock_xform_submissions
 from onadata.apps.logger.models.xform import XForm
 from onadata.apps.main.models import MetaData
 from onadata.apps.main.tests.test_base import TestBase
 from onadata.apps.main.views import show
 from onadata.apps.restservice.RestServiceInterface import RestServiceInterface
-from onadata.apps.restservice.models import RestService
+from onadata.apps.restservice.models import DeadLetter, RestService
 from onadata.apps.restservice.services.textit import ServiceDefinition
+from onadata.apps.restservice.utils import (deliver, get_session,
+                                            send_batch_to_service,
+                                            send_to_service)
 from onadata.apps.restservice.views import add_service, delete_service
 
 
@@ -110,7 +119,7 @@ class RestServiceTest(TestBase):
         self.assertEqual(response.status_code, 404)
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_textit_service(self, mock_http):
         service_url = "https://textit.io/api/v1/runs.json"
         service_name = "textit"
@@ -137,7 +146,7 @@ class RestServiceTest(TestBase):
         self.assertEquals(mock_http.call_count, 1)
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_rest_service_not_set(self, mock_http):
         xml_submission = os.path.join(self.this_directory,
                                       u'fixtures',
@@ -148,6 +157,291 @@ class RestServiceTest(TestBase):
         self.assertFalse(mock_http.called)
         self.assertEquals(mock_http.call_count, 0)
 
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True,
+                       RESTSERVICE_MAX_RETRIES=2,
+                       RESTSERVICE_RETRY_BACKOFF=0)
+    @patch('requests.Session.request')
+    def test_delivery_retries(self, mock_http):
+        mock_http.side_effect = requests.ConnectionError()
+        RestService.objects.create(
+            service_url='http://example.com/post', xform=self.xform,
+            name='generic_json')
+        xml_submission = os.path.join(self.this_directory,
+                                      u'fixtures',
+                                      u'dhisform_submission1.xml')
+        self._make_submission(xml_submission)
+
+        # the first attempt and 2 retries
+        self.assertEqual(mock_http.call_count, 3)
+        args, kwargs = mock_http.call_args
+        self.assertEqual(args, ('POST', 'http://example.com/post'))
+        self.assertEqual(kwargs['timeout'], (5, 30))
+        dead_letter = DeadLetter.objects.get(
+            instance=self.xform.instances.first())
+        self.assertEqual(dead_letter.attempts, 3)
+        self.assertIsNone(dead_letter.status_code)
+
+        # redelivering sends the submission again
+        mock_http.side_effect = None
+        dead_letter.redeliver()
+        self.assertEqual(mock_http.call_count, 4)
+        self.assertFalse(DeadLetter.objects.exists())
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    @patch('requests.Session.request')
+    def test_delivery_client_error_not_retried(self, mock_http):
+        response = requests.Response()
+        response.status_code = 400
+        mock_http.return_value = response
+        RestService.objects.create(
+            service_url='http://example.com/post', xform=self.xform,
+            name='generic_xml')
+        xml_submission = os.path.join(self.this_directory,
+                                      u'fixtures',
+                                      u'dhisform_submission1.xml')
+        self._make_submission(xml_submission)
+
+        self.assertEqual(mock_http.call_count, 1)
+        dead_letter = DeadLetter.objects.get()
+        self.assertEqual(dead_letter.attempts, 1)
+        self.assertEqual(dead_letter.status_code, 400)
+
+    @override_settings(RESTSERVICE_MAX_CONCURRENCY=1,
+                       RESTSERVICE_MAX_SLOT_WAITS=2)
+    @patch('onadata.apps.restservice.utils.schedule_delivery')
+    @patch('requests.Session.request')
+    def test_delivery_concurrency_limit(self, mock_http, mock_schedule):
+        self._create_rest_service()
+        xml_submission = os.path.join(self.this_directory,
+                                      u'fixtures',
+                                      u'dhisform_submission1.xml')
+        self._make_submission(xml_submission)
+        mock_http.reset_mock()
+        instance = self.xform.instances.first()
+
+        slot_key = 'restservice-concurrency-{}-0'.format(self.restservice.pk)
+        cache.set(slot_key, True)
+        send_to_service(self.restservice, instance, attempt=1)
+        self.assertFalse(mock_http.called)
+        mock_schedule.assert_called_once_with(
+            self.restservice, instance, 1, 10, 1)
+
+        # a delivery that waited too often for a slot is a dead letter
+        mock_schedule.reset_mock()
+        send_to_service(self.restservice, instance, attempt=1, slot_waits=2)
+        self.assertFalse(mock_http.called)
+        self.assertFalse(mock_schedule.called)
+        dead_letter = DeadLetter.objects.get(instance=instance)
+        self.assertEqual(dead_letter.attempts, 2)
+        self.assertIsNone(dead_letter.status_code)
+
+        cache.delete(slot_key)
+        send_to_service(self.restservice, instance)
+        self.assertEqual(mock_http.call_count, 1)
+        self.assertIsNone(cache.get(slot_key))
+
+    @patch('requests.Session.request')
+    def test_deliver_reuses_sessions(self, mock_http):
+        self.assertIs(get_session('http://example.com/a'),
+                      get_session('http://example.com/b?c=d'))
+        self.assertIsNot(get_session('http://example.com/a'),
+                         get_session('https://example.com/a'))
+
+        deliver('http://example.com/a', method='GET', timeout=1)
+        mock_http.assert_called_once_with(
+            'GET', 'http://example.com/a', timeout=1)
+
+    @patch('onadata.apps.restservice.utils.schedule_batch_delivery')
+    @patch('requests.Session.request')
+    def test_batch_delivery(self, mock_http, mock_schedule):
+        xml_submission = os.path.join(self.this_directory,
+                                      u'fixtures',
+                                      u'dhisform_submission1.xml')
+        self._make_submission(xml_submission)
+        rest_service = RestService.objects.create(
+            service_url='http://example.com/post', xform=self.xform,
+            name='generic_json', batch_size=2, batch_delay=30)
+        # submissions received before batch mode are not sent
+        self.assertEqual(rest_service.batch_cursor,
+                         self.xform.instances.last().pk)
+
+        for i in range(2, 4):
+            xml_submission = os.path.join(
+                self.this_directory, u'fixtures',
+                u'dhisform_submission{}.xml'.format(i))
+            self._make_submission(xml_submission)
+        self.assertFalse(mock_http.called)
+        # one delivery is scheduled per batch delay
+        mock_schedule.assert_called_once_with(rest_service, 0, 30)
+
+        send_batch_to_service(rest_service)
+        self.assertEqual(mock_http.call_count, 1)
+        instances = self.xform.instances.order_by('pk')
+        payload = json.loads(mock_http.call_args[1]['data'])
+        self.assertEqual([i['_id'] for i in payload],
+                         [i.pk for i in instances[1:]])
+        rest_service.refresh_from_db()
+        self.assertEqual(rest_service.batch_cursor, instances.last().pk)
+
+        # nothing is sent twice
+        send_batch_to_service(rest_service)
+        self.assertEqual(mock_http.call_count, 1)
+
+    @patch('onadata.apps.restservice.utils.schedule_batch_delivery')
+    @patch('requests.Session.request')
+    def test_batch_delivery_failure(self, mock_http, mock_schedule):
+        rest_service = RestService.objects.create(
+            service_url='http://example.com/post', xform=self.xform,
+            name='generic_json', batch_size=10)
+        for i in range(1, 3):
+            xml_submission = os.path.join(
+                self.this_directory, u'fixtures',
+                u'dhisform_submission{}.xml'.format(i))
+            self._make_submission(xml_submission)
+        mock_schedule.reset_mock()
+
+        # server errors are retried without moving the cursor
+        mock_http.side_effect = requests.ConnectionError()
+        send_batch_to_service(rest_service)
+        mock_schedule.assert_called_once_with(rest_service, 1, 10)
+        self.assertEqual(rest_service.batch_cursor, 0)
+
+        # the submissions of a batch that can not be delivered are stored as
+        # dead letters
+        response = requests.Response()
+        response.status_code = 400
+        mock_http.side_effect = None
+        mock_http.return_value = response
+        send_batch_to_service(rest_service, attempt=1)
+        self.assertEqual(
+            DeadLetter.objects.filter(rest_service=rest_service).count(), 2)
+        rest_service.refresh_from_db()
+        self.assertEqual(rest_service.batch_cursor,
+                         self.xform.instances.last().pk)
+
+    @patch('onadata.apps.restservice.utils.schedule_batch_delivery')
+    @patch('requests.Session.request')
+    def test_concurrent_batch_deliveries(self, mock_http, mock_schedule):
+        rest_service = RestService.objects.create(
+            service_url='http://example.com/post', xform=self.xform,
+            name='generic_json', batch_size=1)
+        for i in range(1, 3):
+            xml_submission = os.path.join(
+                self.this_directory, u'fixtures',
+                u'dhisform_submission{}.xml'.format(i))
+            self._make_submission(xml_submission)
+        lock_key = 'restservice-batch_lock-{}'.format(rest_service.pk)
+        response = requests.Response()
+        response.status_code = 200
+        last_pk = self.xform.instances.last().pk
+
+        def move_cursor():
+            try:
+                RestService.objects.filter(pk=rest_service.pk).update(
+                    service_url='http://example.com/other',
+                    batch_cursor=last_pk)
+            finally:
+                connection.close()
+
+        blocked = []
+
+        def request(*args, **kwargs):
+            # another run delivers the submissions while the batch is in
+            # flight, the service row is not locked meanwhile
+            concurrent_run = threading.Thread(target=move_cursor)
+            concurrent_run.start()
+            concurrent_run.join(5)
+            blocked.append(concurrent_run.is_alive())
+            return response
+
+        mock_http.side_effect = request
+        send_batch_to_service(rest_service)
+        self.assertEqual(blocked, [False])
+        # the run stops once the cursor moved under it
+        self.assertEqual(mock_http.call_count, 1)
+        rest_service.refresh_from_db()
+        self.assertEqual(rest_service.batch_cursor, last_pk)
+
+        # the lock of another run is not released
+        def request_with_lock_taken(*args, **kwargs):
+            cache.set(lock_key, 'another-run')
+            return response
+
+        self._make_submission(os.path.join(
+            self.this_directory, u'fixtures', u'dhisform_submission3.xml'))
+        cache.delete(lock_key)
+        mock_http.side_effect = request_with_lock_taken
+        send_batch_to_service(rest_service)
+        self.assertEqual(mock_http.call_count, 2)
+        self.assertEqual(cache.get(lock_key), 'another-run')
+        cache.delete(lock_key)
+
+    @override_settings(RESTSERVICE_BATCH_LOCK_TIMEOUT=0.1)
+    @patch('onadata.apps.restservice.utils.schedule_batch_delivery')
+    @patch('requests.Session.request')
+    def test_batch_delivery_waits_for_submissions(self, mock_http,
+                                                  mock_schedule):
+        rest_service = RestService.objects.create(
+            service_url='http://example.com/post', xform=self.xform,
+            name='generic_json', batch_size=10)
+        xml_submission = os.path.join(
+            self.this_directory, u'fixtures', u'dhisform_submission1.xml')
+        self._make_submission(xml_submission)
+        mock_schedule.reset_mock()
+        response = requests.Response()
+        response.status_code = 200
+        mock_http.return_value = response
+        saving = threading.Event()
+        saved = threading.Event()
+
+        def save_submission():
+            # a submission to the form is being saved
+            try:
+                with transaction.atomic():
+                    lock_xform_submissions(self.xform.pk, shared=True)
+                    saving.set()
+                    saved.wait(5)
+            finally:
+                connection.close()
+
+        submission = threading.Thread(target=save_submission)
+        submission.start()
+        saving.wait(5)
+        send_batch_to_service(rest_service)
+        saved.set()
+        submission.join()
+        # the batch is read once the submission is saved
+        self.assertFalse(mock_http.called)
+        mock_schedule.assert_called_once_with(rest_service, 0, 10)
+        rest_service.refresh_from_db()
+        self.assertEqual(rest_service.batch_cursor, 0)
+
+        send_batch_to_service(rest_service)
+        self.assertEqual(mock_http.call_count, 1)
+        rest_service.refresh_from_db()
+        self.assertEqual(rest_service.batch_cursor,
+                         self.xform.instances.last().pk)
+
+    @patch('onadata.apps.restservice.utils.monotonic')
+    @patch('onadata.apps.restservice.utils.schedule_batch_delivery')
+    @patch('requests.Session.request')
+    def test_batch_delivery_stops_before_lock_expires(self, mock_http,
+                                                      mock_schedule,
+                                                      mock_monotonic):
+        # the run started longer ago than a batch may take
+        mock_monotonic.side_effect = [0, 35]
+        rest_service = RestService.objects.create(
+            service_url='http://example.com/post', xform=self.xform,
+            name='generic_json', batch_size=1)
+        xml_submission = os.path.join(
+            self.this_directory, u'fixtures', u'dhisform_submission1.xml')
+        self._make_submission(xml_submission)
+        mock_schedule.reset_mock()
+
+        send_batch_to_service(rest_service)
+        self.assertFalse(mock_http.called)
+        mock_schedule.assert_called_once_with(rest_service, 0, 0)
+
     def test_clean_keys_of_slashes(self):
         service = ServiceDefinition()
 
@@ -207,7 +207,9 @@ class TestRestServicesViewSet(TestAbstractViewSet):
             'name': u'testservice',
             'service_url': u'http://serviec.io',
             'active': True,
-            'inactive_reason': ''
+            'inactive_reason': '',
+            'batch_size': 0,
+            'batch_delay': 60
         }
         response.data.pop('date_modified')
         response.data.pop('date_created')
@@ -243,7 +245,7 @@ class TestRestServicesViewSet(TestAbstractViewSet):
         self.assertEquals(response.status_code, 400)
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_textit_flow(self, mock_http):
         rest = RestService(name="textit",
                            service_url="https://server.io",
@@ -262,7 +264,7 @@ class TestRestServicesViewSet(TestAbstractViewSet):
         self.assertEquals(mock_http.call_count, 4)
 
     @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_textit_flow_without_parsed_instances(self, mock_http):
         rest = RestService(name="textit",
                            service_url="https://server.io",
@@ -1,10 +1,325 @@
 import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from time import monotonic
 
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, transaction
+from django.utils.six.moves.urllib.parse import urlparse
 from django.utils.translation import ugettext as _
+from requests.adapters import HTTPAdapter
 
-from onadata.apps.restservice.models import RestService
+from onadata.apps.restservice.models import DeadLetter, RestService
+from onadata.libs.utils.cache_tools import (RESTSERVICE_BATCH,
+                                            RESTSERVICE_BATCH_LOCK,
+                                            RESTSERVICE_CONCURRENCY)
 from onadata.libs.utils.common_tags import GOOGLE_SHEET
 
+# HTTP errors that are worth retrying, other 4xx errors are not
+RETRY_STATUS_CODES = (408, 429)
+
+SESSIONS = {}
+SESSIONS_LOCK = threading.Lock()
+SESSIONS_PID = None
+
+
+def get_session(url):
+    """
+    Returns the requests Session of this process for the host of url. The
+    session keeps up to RESTSERVICE_POOL_SIZE connections to the host alive.
+    """
+    global SESSIONS_PID  # pylint: disable=global-statement
+
+    parsed_url = urlparse(url)
+    host = u'%s://%s' % (parsed_url.scheme, parsed_url.netloc)
+    with SESSIONS_LOCK:
+        if SESSIONS_PID != os.getpid():
+            SESSIONS.clear()
+            SESSIONS_PID = os.getpid()
+        session = SESSIONS.get(host)
+        if session is None:
+            pool_size = getattr(settings, 'RESTSERVICE_POOL_SIZE', 10)
+            session = requests.Session()
+            session.mount(host, HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_size))
+            SESSIONS[host] = session
+
+    return session
+
+
+def deliver(url, method='POST', **kwargs):
+    """
+    Sends a request to url over the pooled session of its host, raises a
+    requests.RequestException when the request fails or the response is an
+    HTTP error.
+    """
+    kwargs.setdefault(
+        'timeout', getattr(settings, 'RESTSERVICE_TIMEOUT', (5, 30)))
+    response = get_session(url).request(method, url, **kwargs)
+    response.raise_for_status()
+
+    return response
+
+
+def is_retryable(error):
+    """
+    Returns True if the delivery may succeed when retried, i.e. connection
+    errors, timeouts, server errors and rate limits.
+    """
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status_code = error.response.status_code
+
+        return status_code >= 500 or status_code in RETRY_STATUS_CODES
+
+    return isinstance(error, requests.RequestException)
+
+
+@contextmanager
+def service_slot(rest_service):
+    """
+    Acquires one of the RESTSERVICE_MAX_CONCURRENCY delivery slots of a
+    rest service, yields False if all the slots are taken.
+    """
+    max_concurrency = getattr(settings, 'RESTSERVICE_MAX_CONCURRENCY', 4)
+    timeout = getattr(settings, 'RESTSERVICE_TIMEOUT', (5, 30))
+    slot_timeout = sum(timeout) if isinstance(timeout, tuple) else timeout
+    slot_key = None
+    for slot in range(max_concurrency):
+        key = u'{}{}-{}'.format(RESTSERVICE_CONCURRENCY, rest_service.pk, slot)
+        if cache.add(key, True, slot_timeout + 1):
+            slot_key = key
+            break
+    try:
+        yield slot_key is not None
+    finally:
+        if slot_key is not None:
+            cache.delete(slot_key)
+
+
+def schedule_delivery(rest_service, submission_instance, attempt, countdown,
+                      slot_waits=0):
+    """
+    Queues the delivery of the submission to the rest service.
+    """
+    from onadata.apps.restservice.tasks import call_service_delivery_async
+
+    call_service_delivery_async.apply_async(
+        args=[rest_service.pk, submission_instance.pk, attempt, slot_waits],
+        countdown=countdown)
+
+
+def send_to_service(rest_service, submission_instance, attempt=0,
+                    slot_waits=0):
+    """
+    Sends the submission to the rest service. Failed deliveries are retried
+    RESTSERVICE_MAX_RETRIES times with an exponential backoff, submissions
+    that still fail are stored as a DeadLetter.
+
+    A delivery that finds all the slots of the service taken waits for one
+    up to RESTSERVICE_MAX_SLOT_WAITS times, slot_waits counts the waits.
+    """
+    backoff = getattr(settings, 'RESTSERVICE_RETRY_BACKOFF', 10)
+    error = None
+    with service_slot(rest_service) as acquired:
+        if acquired:
+            try:
+                service = rest_service.get_service_definition()()
+                service.send(rest_service.service_url, submission_instance)
+            except Exception as e:  # pylint: disable=broad-except
+                error = e
+
+    # retries are scheduled once the slot is released
+    if not acquired:
+        max_slot_waits = getattr(settings, 'RESTSERVICE_MAX_SLOT_WAITS', 30)
+        if slot_waits < max_slot_waits:
+            # the service is busy, try again without using up an attempt
+            schedule_delivery(rest_service, submission_instance, attempt,
+                              backoff, slot_waits + 1)
+        else:
+            store_dead_letter(rest_service, submission_instance, attempt,
+                              _(u'Service busy, no delivery slot available'))
+    elif error is not None:
+        max_retries = getattr(settings, 'RESTSERVICE_MAX_RETRIES', 5)
+        if is_retryable(error) and attempt < max_retries:
+            schedule_delivery(rest_service, submission_instance,
+                              attempt + 1, backoff * 2 ** attempt)
+        else:
+            response = getattr(error, 'response', None)
+            store_dead_letter(rest_service, submission_instance, attempt,
+                              str(error),
+                              getattr(response, 'status_code', None))
+
+
+def store_dead_letter(rest_service, submission_instance, attempt, error,
+                      status_code=None):
+    """
+    Stores a submission that could not be delivered as a DeadLetter.
+    """
+    DeadLetter.objects.create(
+        rest_service=rest_service, instance=submission_instance,
+        attempts=attempt + 1, error=error, status_code=status_code)
+    logging.error(_(u'Service threw exception: %s' % error))
+
+
+def get_batch_queryset(rest_service):
+    """
+    Returns the submissions after the batch cursor of the rest service.
+    """
+    from onadata.apps.logger.models.instance import Instance
+
+    return Instance.objects.filter(
+        xform_id=rest_service.xform_id, pk__gt=rest_service.batch_cursor or 0,
+        deleted_at__isnull=True).order_by('pk')
+
+
+def schedule_batch_delivery(rest_service, attempt, countdown):
+    """
+    Queues the delivery of the pending submissions of the rest service.
+    """
+    from onadata.apps.restservice.tasks import call_service_batch_async
+
+    call_service_batch_async.apply_async(
+        args=[rest_service.pk, attempt], countdown=countdown)
+
+
+def queue_batch(rest_service):
+    """
+    Schedules the delivery of the pending submissions of the rest service in
+    batch_delay seconds unless a delivery is already scheduled.
+    """
+    key = u'{}{}'.format(RESTSERVICE_BATCH, rest_service.pk)
+    # expires in case the scheduled delivery is lost
+    if cache.add(key, True, rest_service.batch_delay * 2 + 60):
+        schedule_batch_delivery(rest_service, 0, rest_service.batch_delay)
+
+
+def get_next_batch(rest_service):
+    """
+    Returns the batch cursor of the rest service and the submissions after
+    it, up to batch_size submissions.
+
+    The submissions are read with the submissions lock of the form held, a
+    submission that is being saved can not be left behind the cursor. Raises
+    an OperationalError when the lock is not free within
+    RESTSERVICE_BATCH_LOCK_TIMEOUT seconds.
+    """
+    from onadata.apps.logger.models.instance import lock_xform_submissions
+
+    with transaction.atomic():
+        lock_xform_submissions(
+            rest_service.xform_id,
+            timeout=getattr(settings, 'RESTSERVICE_BATCH_LOCK_TIMEOUT', 1))
+        rest_service.batch_cursor = RestService.objects.filter(
+            pk=rest_service.pk).values_list('batch_cursor', flat=True).get()
+        batch = list(
+            get_batch_queryset(rest_service)[:rest_service.batch_size])
+
+    return rest_service.batch_cursor, batch
+
+
+def send_batch_to_service(rest_service, attempt=0):
+    """
+    Sends the submissions after the batch cursor to the rest service as JSON
+    arrays of up to batch_size submissions, moving the cursor after every
+    delivered batch so that no submission is sent twice or skipped.
+
+    A run stops before its lock expires and schedules the next one. The
+    cursor only moves from the value a batch was read after, a run stops
+    when another run moved it.
+    """
+    lock_key = u'{}{}'.format(RESTSERVICE_BATCH_LOCK, rest_service.pk)
+    timeout = getattr(settings, 'RESTSERVICE_TIMEOUT', (5, 30))
+    lock_timeout = sum(timeout) if isinstance(timeout, tuple) else timeout
+    lock_token = uuid.uuid4().hex
+    if not cache.add(lock_key, lock_token, lock_timeout * 2):
+        # a delivery is running, it picks up the pending submissions
+        return
+
+    # submissions received from now on are sent with the next batch
+    cache.delete(u'{}{}'.format(RESTSERVICE_BATCH, rest_service.pk))
+    max_retries = getattr(settings, 'RESTSERVICE_MAX_RETRIES', 5)
+    started = monotonic()
+    error = None
+    pending = False
+    locked = False
+    try:
+        rest_service.refresh_from_db()
+        service = rest_service.get_service_definition()()
+        while True:
+            # a batch may take lock_timeout seconds, stop while it is held
+            if monotonic() - started >= lock_timeout:
+                pending = True
+                break
+            try:
+                batch_cursor, batch = get_next_batch(rest_service)
+            except OperationalError:
+                # submissions to the form are being saved
+                locked = True
+                break
+            if not batch:
+                break
+            try:
+                service.send_batch(rest_service.service_url, batch)
+            except Exception as e:  # pylint: disable=broad-except
+                error = e
+                if not is_retryable(e) or attempt >= max_retries:
+                    store_dead_letters(
+                        rest_service, batch, e, attempt, batch_cursor)
+                break
+            if not update_batch_cursor(
+                    rest_service, batch_cursor, batch[-1].pk):
+                # another run moved the cursor, it sends the next batches
+                break
+            attempt = 0
+    finally:
+        # the lock may have expired and been taken by another run
+        if cache.get(lock_key) == lock_token:
+            cache.delete(lock_key)
+
+    backoff = getattr(settings, 'RESTSERVICE_RETRY_BACKOFF', 10)
+    if error is not None and is_retryable(error) and attempt < max_retries:
+        schedule_batch_delivery(
+            rest_service, attempt + 1, backoff * 2 ** attempt)
+    elif error is not None:
+        logging.error(_(u'Service threw exception: %s' % str(error)))
+        schedule_batch_delivery(rest_service, 0, 0)
+    elif locked:
+        schedule_batch_delivery(rest_service, attempt, backoff)
+    elif pending:
+        schedule_batch_delivery(rest_service, 0, 0)
+
+
+def store_dead_letters(rest_service, batch, error, attempt, batch_cursor):
+    """
+    Stores the submissions of a batch that could not be delivered as dead
+    letters and moves the batch cursor past them.
+    """
+    response = getattr(error, 'response', None)
+    DeadLetter.objects.bulk_create([
+        DeadLetter(rest_service=rest_service, instance=instance,
+                   attempts=attempt + 1, error=str(error),
+                   status_code=getattr(response, 'status_code', None))
+        for instance in batch])
+    update_batch_cursor(rest_service, batch_cursor, batch[-1].pk)
+
+
+def update_batch_cursor(rest_service, old_cursor, batch_cursor):
+    """
+    Moves the batch cursor of the rest service from old_cursor to
+    batch_cursor, returns False if the cursor is no longer at old_cursor.
+    """
+    updated = RestService.objects.filter(
+        pk=rest_service.pk, batch_cursor=old_cursor).update(
+            batch_cursor=batch_cursor)
+    if updated:
+        rest_service.batch_cursor = batch_cursor
+
+    return bool(updated)
+
 
 def call_service(submission_instance):
     # lookup service which is not google sheet service
@@ -12,10 +327,7 @@ def call_service(submission_instance):
         xform_id=submission_instance.xform_id).exclude(name=GOOGLE_SHEET)
     # call service send with url and data parameters
     for sv in services:
-        # TODO: Queue service
-        try:
-            service = sv.get_service_definition()()
-            service.send(sv.service_url, submission_instance)
-        except Exception as e:
-            # TODO: Handle gracefully | requeue/resend
-            logging.exception(_(u'Service threw exception: %s' % str(e)))
+        if sv.is_batched:
+            queue_batch(sv)
+        else:
+            send_to_service(sv, submission_instance)
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.10 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('viewer', '0008_auto_20190125_0517'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='export',
+            name='export_type',
+            field=models.CharField(choices=[('xls', 'Excel'), ('csv', 'CSV'), ('zip', 'ZIP'), ('kml', 'kml'), ('csv_zip', 'CSV ZIP'), ('sav_zip', 'SAV ZIP'), ('sav', 'SAV'), ('external', 'Excel'), ('osm', 'osm'), ('gsheets', 'Google Sheets'), ('parquet', 'Parquet ZIP')], default='xls', max_length=10),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.10 on 2026-10-19 10:00
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('viewer', '0009_auto_20261019_0900'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='export',
+            name='metrics',
+            field=django.contrib.postgres.fields.jsonb.JSONField(default=dict),
+        ),
+    ]
@@ -22,8 +22,8 @@ from pyxform.xls2json import parse_file_to_json
 from onadata.apps.logger.models.xform import (XForm, check_version_set,
                                               check_xform_uuid)
 from onadata.apps.logger.xform_instance_parser import XLSFormError
-from onadata.libs.utils.cache_tools import (PROJ_BASE_FORMS_CACHE,
-                                            PROJ_FORMS_CACHE, safe_delete)
+from onadata.libs.utils.cache_tools import (PROJECT_NAMESPACE,
+                                            bump_namespace)
 from onadata.libs.utils.model_tools import get_columns_with_hxl, set_uuid
 
 
@@ -221,8 +221,7 @@ def set_object_permissions(sender, instance=None, created=False, **kwargs):
     """
     if instance.project:
         # clear cache
-        safe_delete('{}{}'.format(PROJ_FORMS_CACHE, instance.project.pk))
-        safe_delete('{}{}'.format(PROJ_BASE_FORMS_CACHE, instance.project.pk))
+        bump_namespace(PROJECT_NAMESPACE, instance.project_id)
 
     # seems the super is not called, have to get xform from here
     xform = XForm.objects.get(pk=instance.pk)
@@ -77,6 +77,7 @@ class Export(models.Model):
     EXTERNAL_EXPORT = 'external'
     OSM_EXPORT = OSM
     GOOGLE_SHEETS_EXPORT = 'gsheets'
+    PARQUET_EXPORT = 'parquet'
 
     EXPORT_MIMES = {
         'xls': 'vnd.ms-excel',
@@ -85,6 +86,7 @@ class Export(models.Model):
         'zip': 'zip',
         'csv_zip': 'zip',
         'sav_zip': 'zip',
+        'parquet': 'zip',
         'sav': 'sav',
         'kml': 'vnd.google-earth.kml+xml',
         OSM: OSM
@@ -101,6 +103,7 @@ class Export(models.Model):
         (EXTERNAL_EXPORT, 'Excel'),
         (OSM, OSM),
         (GOOGLE_SHEETS_EXPORT, 'Google Sheets'),
+        (PARQUET_EXPORT, 'Parquet ZIP'),
     ]
 
     EXPORT_OPTION_FIELDS = [
@@ -153,6 +156,8 @@ class Export(models.Model):
 
     options = JSONField(default=dict, null=False)
     error_message = models.CharField(max_length=255, null=True, blank=True)
+    # performance of the export run i.e. records, duration, bytes
+    metrics = JSONField(default=dict, null=False)
 
     class Meta:
         app_label = "viewer"
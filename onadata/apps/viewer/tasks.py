@@ -8,10 +8,13 @@ from datetime import timedelta
 from future.utils import iteritems
 
 from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
 from celery import task
+from celery.result import AsyncResult
+from celery.utils import uuid
 from kombu.exceptions import OperationalError
 from requests import ConnectionError
 
@@ -22,9 +25,15 @@ from onadata.libs.utils.export_tools import (generate_attachments_zip_export,
                                              generate_export,
                                              generate_external_export,
                                              generate_kml_export,
-                                             generate_osm_export)
+                                             generate_osm_export,
+                                             get_export_single_flight_key)
 
 EXPORT_QUERY_KEY = 'query'
+# exports that are specific to the requesting user and are never shared
+NON_SHARED_EXPORT_TYPES = [Export.EXTERNAL_EXPORT,
+                           Export.GOOGLE_SHEETS_EXPORT]
+# apply_async options that can be set on an EXPORT_TASK_QUEUES tier
+EXPORT_ROUTING_OPTIONS = ('queue', 'priority', 'time_limit', 'soft_time_limit')
 
 
 def _get_export_object(export_id):
@@ -49,29 +58,87 @@ def _get_export_details(username, id_string, export_id):
     return details
 
 
+def _get_in_flight_export(single_flight_key):
+    """
+    Returns the export registered under single_flight_key by a concurrent
+    request, None if there is none or it has failed.
+    """
+    export_id = cache.get(single_flight_key)
+    if export_id is None:
+        return None
+
+    export = Export.objects.filter(pk=export_id).first()
+    if export is None or export.task_id is None or \
+            export.status == Export.FAILED:
+        return None
+
+    return export
+
+
+def get_export_task_routing(xform):
+    """
+    Returns the apply_async options for an export of xform, i.e. the queue,
+    priority and time limits of the first EXPORT_TASK_QUEUES tier whose
+    max_submissions is not exceeded by the form's number of submissions.
+
+    Exports run on the default queue when EXPORT_TASK_QUEUES is not set.
+    """
+    for tier in getattr(settings, 'EXPORT_TASK_QUEUES', []):
+        max_submissions = tier.get('max_submissions')
+        if max_submissions is None or \
+                xform.num_of_submissions <= max_submissions:
+            return {
+                key: tier[key] for key in EXPORT_ROUTING_OPTIONS
+                if tier.get(key) is not None
+            }
+
+    return {}
+
+
 def create_async_export(xform, export_type, query, force_xlsx, options=None):
     """
     Starts asynchronous export tasks and returns an export object.
 
+    Identical export requests, same xform, export type, options and file
+    format at the same data version, are single-flighted: a request made
+    while another one is in flight attaches to its export and task instead
+    of starting a new task. The task id of an export is set before its task
+    is started, a request attaches to a pending export right away.
+
     Throws Export.ExportTypeError if export_type is not in EXPORT_TYPES.
     Throws Export.ExportConnectionError if rabbitmq broker is down.
     """
     username = xform.user.username
     id_string = xform.id_string
 
-    def _create_export(xform, export_type, options):
-        export_options = {
-            key: get_boolean_value(value, default=True)
-            for (key, value) in iteritems(options)
-            if key in Export.EXPORT_OPTION_FIELDS
-        }
-        if query and 'query' not in export_options:
-            export_options['query'] = query
-
-        return Export.objects.create(
-            xform=xform, export_type=export_type, options=export_options)
-
-    export = _create_export(xform, export_type, options)
+    export_options = {
+        key: get_boolean_value(value, default=True)
+        for (key, value) in iteritems(options)
+        if key in Export.EXPORT_OPTION_FIELDS
+    }
+    if query and 'query' not in export_options:
+        export_options['query'] = query
+
+    single_flight_key = None
+    timeout = getattr(settings, 'EXPORT_SINGLE_FLIGHT_TIMEOUT', 3600)
+    if export_type not in NON_SHARED_EXPORT_TYPES:
+        single_flight_key = get_export_single_flight_key(
+            xform, export_type, export_options, force_xlsx)
+        export = _get_in_flight_export(single_flight_key)
+        if export is not None:
+            return export, AsyncResult(export.task_id)
+
+    export = Export.objects.create(
+        xform=xform, export_type=export_type, options=export_options,
+        task_id=uuid())
+    if single_flight_key and \
+            not cache.add(single_flight_key, export.id, timeout):
+        # a concurrent request registered its export first
+        in_flight_export = _get_in_flight_export(single_flight_key)
+        if in_flight_export is not None:
+            export.delete()
+            return in_flight_export, AsyncResult(in_flight_export.task_id)
+        cache.set(single_flight_key, export.id, timeout)
     result = None
 
     export_id = export.id
@@ -90,6 +157,7 @@ def create_async_export(xform, export_type, query, force_xlsx, options=None):
         Export.CSV_EXPORT: create_csv_export,
         Export.CSV_ZIP_EXPORT: create_csv_zip_export,
         Export.SAV_ZIP_EXPORT: create_sav_zip_export,
+        Export.PARQUET_EXPORT: create_parquet_export,
         Export.ZIP_EXPORT: create_zip_export,
         Export.KML_EXPORT: create_kml_export,
         Export.OSM_EXPORT: create_osm_export,
@@ -99,14 +167,20 @@ def create_async_export(xform, export_type, query, force_xlsx, options=None):
     # start async export
     if export_type in export_types:
         try:
-            result = export_types[export_type].apply_async((), kwargs=options)
+            result = export_types[export_type].apply_async(
+                (), kwargs=options, task_id=export.task_id,
+                **get_export_task_routing(xform))
         except OperationalError as e:
             export.internal_status = Export.FAILED
             export.error_message = "Error connecting to broker."
             export.save()
+            if single_flight_key:
+                cache.delete(single_flight_key)
             report_exception(export.error_message, e, sys.exc_info())
             raise Export.ExportConnectionError
     else:
+        if single_flight_key:
+            cache.delete(single_flight_key)
         raise ExportTypeError
 
     if result:
@@ -115,8 +189,9 @@ def create_async_export(xform, export_type, query, force_xlsx, options=None):
         # save
         if getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
             export = get_object_or_404(Export, id=export.id)
-        export.task_id = result.task_id
-        export.save()
+        if export.task_id != result.task_id:
+            export.task_id = result.task_id
+            export.save(update_fields=['task_id'])
         return export, result
     return None
 
@@ -346,6 +421,33 @@ def create_sav_zip_export(username, id_string, export_id, **options):
         return gen_export.id
 
 
+@task(track_started=True)
+def create_parquet_export(username, id_string, export_id, **options):
+    """
+    Parquet zip export task.
+    """
+    export = _get_export_object(export_id)
+    options["extension"] = Export.ZIP_EXPORT
+    try:
+        # though export is not available when for has 0 submissions, we
+        # catch this since it potentially stops celery
+        gen_export = generate_export(Export.PARQUET_EXPORT, export.xform,
+                                     export_id, options)
+    except (Exception, NoRecordsFoundError) as e:
+        export.internal_status = Export.FAILED
+        export.error_message = str(e)
+        export.save()
+        # mail admins
+        details = _get_export_details(username, id_string, export_id)
+        report_exception(
+            "Parquet Export Exception: Export ID - "
+            "%(export_id)s, /%(username)s/%(id_string)s" % details, e,
+            sys.exc_info())
+        raise
+    else:
+        return gen_export.id
+
+
 @task(track_started=True)
 def create_external_export(username, id_string, export_id, **options):
     """
@@ -2,11 +2,15 @@ from datetime import timedelta
 
 from celery import current_app
 from django.conf import settings
+from django.test.utils import override_settings
 from django.utils import timezone
+from mock import patch
 
 from onadata.apps.main.tests.test_base import TestBase
 from onadata.apps.viewer.models.export import Export
 from onadata.apps.viewer.tasks import create_async_export
+from onadata.apps.viewer.tasks import create_csv_export
+from onadata.apps.viewer.tasks import get_export_task_routing
 from onadata.apps.viewer.tasks import mark_expired_pending_exports_as_failed
 from onadata.apps.viewer.tasks import delete_expired_failed_exports
 
@@ -43,6 +47,95 @@ class TestExportTasks(TestBase):
             self.assertIn("username", options)
             self.assertEquals(options.get("id_string"), self.xform.id_string)
 
+    def test_create_async_single_flight(self):
+        """
+        Identical export requests share one export until the data changes.
+        """
+        self._publish_transportation_form_and_submit_instance()
+        options = {"group_delimiter": "/",
+                   "remove_group_name": False,
+                   "split_select_multiples": True}
+        export, result = create_async_export(
+            self.xform, Export.CSV_EXPORT, None, False, dict(options))
+        count = Export.objects.filter(xform=self.xform).count()
+
+        other_export, other_result = create_async_export(
+            self.xform, Export.CSV_EXPORT, None, False, dict(options))
+        self.assertEqual(other_export.pk, export.pk)
+        self.assertEqual(other_result.task_id, result.task_id)
+        self.assertEqual(
+            Export.objects.filter(xform=self.xform).count(), count)
+
+        # different options are not shared
+        other_export, _result = create_async_export(
+            self.xform, Export.CSV_EXPORT, None, False,
+            dict(options, remove_group_name=True))
+        self.assertNotEqual(other_export.pk, export.pk)
+
+        # different file formats are not shared
+        xls_export, _result = create_async_export(
+            self.xform, Export.XLS_EXPORT, None, False, dict(options))
+        xlsx_export, _result = create_async_export(
+            self.xform, Export.XLS_EXPORT, None, True, dict(options))
+        self.assertNotEqual(xls_export.pk, xlsx_export.pk)
+
+        # a request attaches to the export a concurrent request registered
+        # while it created its own
+        with patch('onadata.apps.viewer.tasks._get_in_flight_export',
+                   side_effect=[None, export]):
+            count = Export.objects.filter(xform=self.xform).count()
+            other_export, other_result = create_async_export(
+                self.xform, Export.CSV_EXPORT, None, False, dict(options))
+        self.assertEqual(other_export.pk, export.pk)
+        self.assertEqual(other_result.task_id, export.task_id)
+        self.assertEqual(
+            Export.objects.filter(xform=self.xform).count(), count)
+
+        # a new submission changes the data version
+        self._submit_transport_instance(survey_at=1)
+        self.xform.refresh_from_db()
+        other_export, _result = create_async_export(
+            self.xform, Export.CSV_EXPORT, None, False, dict(options))
+        self.assertNotEqual(other_export.pk, export.pk)
+
+    @override_settings(EXPORT_TASK_QUEUES=[
+        {'queue': 'exports_small', 'max_submissions': 1, 'priority': 9,
+         'time_limit': 60},
+        {'queue': 'exports_large', 'max_submissions': None, 'priority': 1,
+         'soft_time_limit': 3600, 'time_limit': None},
+    ])
+    def test_get_export_task_routing(self):
+        """
+        Exports are routed to the first tier that fits the form's size.
+        """
+        self._publish_transportation_form_and_submit_instance()
+        self.xform.refresh_from_db()
+        self.assertEqual(
+            get_export_task_routing(self.xform),
+            {'queue': 'exports_small', 'priority': 9, 'time_limit': 60})
+
+        self._submit_transport_instance(survey_at=1)
+        self.xform.refresh_from_db()
+        self.assertEqual(
+            get_export_task_routing(self.xform),
+            {'queue': 'exports_large', 'priority': 1,
+             'soft_time_limit': 3600})
+
+        with patch.object(create_csv_export, 'apply_async') as mock_async:
+            mock_async.return_value.task_id = 'some-task-id'
+            create_async_export(
+                self.xform, Export.CSV_EXPORT, None, False, {})
+            self.assertEqual(mock_async.call_args[1]['queue'],
+                             'exports_large')
+            self.assertEqual(mock_async.call_args[1]['priority'], 1)
+
+    def test_get_export_task_routing_without_tiers(self):
+        """
+        Exports use the default queue when no tiers are configured.
+        """
+        self._publish_transportation_form_and_submit_instance()
+        self.assertEqual(get_export_task_routing(self.xform), {})
+
     def test_mark_expired_pending_exports_as_failed(self):
         self._publish_transportation_form_and_submit_instance()
         over_threshold = settings.EXPORT_TASK_LIFESPAN + 2
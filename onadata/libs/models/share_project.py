@@ -5,7 +5,7 @@ from onadata.libs.permissions import ROLES
 from onadata.libs.permissions import EditorRole, EditorMinorRole,\
     DataEntryRole, DataEntryMinorRole, DataEntryOnlyRole
 from onadata.libs.utils.cache_tools import (
-    PROJ_PERM_CACHE, PROJ_OWNER_CACHE, safe_delete)
+    PROJECT_NAMESPACE, bump_namespace)
 
 
 def remove_xform_permissions(project, user, role):
@@ -64,8 +64,7 @@ class ShareProject(object):
                         role.add(self.user, dataview.xform)
 
         # clear cache
-        safe_delete('{}{}'.format(PROJ_OWNER_CACHE, self.project.pk))
-        safe_delete('{}{}'.format(PROJ_PERM_CACHE, self.project.pk))
+        bump_namespace(PROJECT_NAMESPACE, self.project.pk)
 
     @transaction.atomic()
     def __remove_user(self):
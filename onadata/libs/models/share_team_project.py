@@ -1,6 +1,7 @@
 from onadata.libs.permissions import DataEntryRole, DataEntryMinorRole, \
     DataEntryOnlyRole, EditorMinorRole, EditorRole, ROLES
-from onadata.libs.utils.cache_tools import PROJ_PERM_CACHE, safe_delete
+from onadata.libs.utils.cache_tools import (PROJECT_NAMESPACE,
+                                            bump_namespace)
 from onadata.libs.utils.common_tags import XFORM_META_PERMS
 
 
@@ -41,7 +42,7 @@ class ShareTeamProject(object):
                     role.add(self.user, dataview.xform)
 
         # clear cache
-        safe_delete('{}{}'.format(PROJ_PERM_CACHE, self.project.pk))
+        bump_namespace(PROJECT_NAMESPACE, self.project.pk)
 
     def remove_team(self):
         role = ROLES.get(self.role)
@@ -20,6 +20,7 @@ from onadata.apps.main.models.user_profile import UserProfile
 from onadata.apps.viewer.models import DataDictionary
 from onadata.libs.exceptions import NoRecordsPermission
 from onadata.libs.utils.common_tags import XFORM_META_PERMS
+from onadata.libs.utils.permission_cache import invalidate_permission_cache
 
 # Userprofile Permissions
 CAN_ADD_USERPROFILE = 'add_userprofile'
@@ -83,6 +84,7 @@ class Role(object):
     def _remove_obj_permissions(cls, user, obj):
         for perm in get_perms(user, obj):
             remove_perm(perm, user, obj)
+        invalidate_permission_cache()
 
     @classmethod
     def remove_obj_permissions(cls, user, obj):
@@ -99,6 +101,7 @@ class Role(object):
         cls._remove_obj_permissions(user, obj)
         for codename in cls.class_to_permissions.get(obj.__class__, []):
             assign_perm(codename, user, obj)
+        invalidate_permission_cache()
 
     @classmethod
     def has_role(cls, permissions, obj):
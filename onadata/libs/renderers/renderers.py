@@ -152,6 +152,22 @@ class SAVZIPRenderer(BaseRenderer):  # pylint: disable=too-few-public-methods
         return data
 
 
+class ParquetZIPRenderer(BaseRenderer):  # pylint: disable=R0903
+    """
+    ParquetZIPRenderer - renders a ZIP file that contains Parquet files.
+    """
+    media_type = 'application/octet-stream'
+    format = 'parquet'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, six.text_type):
+            return data.encode('utf-8')
+        elif isinstance(data, dict):
+            return json.dumps(data)
+        return data
+
+
 class SurveyRenderer(BaseRenderer):  # pylint: disable=too-few-public-methods
     """
     SurveyRenderer - renders XML data.
@@ -324,6 +340,23 @@ class GeoJsonRenderer(BaseRenderer):  # pylint: disable=R0903
         return json.dumps(data)
 
 
+class MVTRenderer(BaseRenderer):  # pylint: disable=R0903
+    """
+    MVTRenderer - render Mapbox vector tiles.
+    """
+    media_type = 'application/vnd.mapbox-vector-tile'
+    format = 'mvt'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, six.text_type):
+            return data.encode('utf-8')
+        elif isinstance(data, dict):
+            return json.dumps(data)
+        return data
+
+
 class OSMRenderer(BaseRenderer):  # pylint: disable=R0903
     """
     OSMRenderer - render .osm data as XML.
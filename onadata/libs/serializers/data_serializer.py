@@ -2,14 +2,17 @@
 """
 Submission data serializers module.
 """
+from builtins import str as text
 from io import BytesIO
+from xml.parsers.expat import ExpatError
 
 from django.shortcuts import get_object_or_404
 from django.utils.translation import ugettext as _
 from rest_framework import exceptions, serializers
 from rest_framework.reverse import reverse
 
-from onadata.apps.logger.models.instance import Instance, InstanceHistory
+from onadata.apps.logger.models.instance import (Instance, InstanceHistory,
+                                                  get_id_string_from_xml_str)
 from onadata.apps.logger.models.xform import XForm
 from onadata.libs.serializers.fields.json_field import JsonField
 from onadata.libs.utils.logger_tools import remove_metadata_fields
@@ -17,6 +20,8 @@ from onadata.libs.utils.dict_tools import (dict_lists2strings, dict_paths2dict,
                                            query_list_to_dict,
                                            floip_response_headers_dict)
 from onadata.libs.utils.logger_tools import dict2xform, safe_create_instance
+from onadata.libs.utils.presigned_uploads import (
+    get_uploaded_media_files, release_uploaded_media_files)
 
 
 NUM_FLOIP_COLUMNS = 6
@@ -193,6 +198,23 @@ class SubmissionSerializer(SubmissionSuccessMixin, serializers.Serializer):
         if not request.FILES or 'xml_submission_file' not in request.FILES:
             raise serializers.ValidationError(_("No XML submission file."))
 
+        tokens = request.data.getlist('uploaded_media')
+        if tokens:
+            # the upload tokens have to be issued for the submitted form
+            xml_file = request.FILES['xml_submission_file']
+            try:
+                id_string = get_id_string_from_xml_str(xml_file.read())
+            except (ExpatError, ValueError):
+                # an unreadable submission is rejected on create
+                id_string = None
+            xml_file.seek(0)
+            try:
+                self.uploaded_media_files = get_uploaded_media_files(
+                    tokens, request.user,
+                    self.context['view'].kwargs.get('xform_pk'), id_string)
+            except ValueError as e:
+                raise serializers.ValidationError(text(e))
+
         return super(SubmissionSerializer, self).validate(attrs)
 
     def create(self, validated_data):
@@ -203,11 +225,14 @@ class SubmissionSerializer(SubmissionSuccessMixin, serializers.Serializer):
 
         xml_file_list = request.FILES.pop('xml_submission_file', [])
         xml_file = xml_file_list[0] if xml_file_list else None
-        media_files = request.FILES.values()
+        media_files = list(request.FILES.values()) + \
+            getattr(self, 'uploaded_media_files', [])
 
         error, instance = safe_create_instance(username, xml_file, media_files,
                                                None, request)
         if error:
+            release_uploaded_media_files(
+                getattr(self, 'uploaded_media_files', []))
             exc = exceptions.APIException(detail=error)
             exc.response = error
             exc.status_code = error.status_code
@@ -1,7 +1,6 @@
 import datetime
 
 from django.utils.translation import ugettext as _
-from django.core.cache import cache
 
 from rest_framework import serializers
 from rest_framework.exceptions import ParseError
@@ -13,7 +12,9 @@ from onadata.apps.logger.models.xform import XForm
 from onadata.apps.logger.models.project import Project
 from onadata.libs.utils.cache_tools import (
     DATAVIEW_COUNT,
-    DATAVIEW_LAST_SUBMISSION_TIME)
+    DATAVIEW_LAST_SUBMISSION_TIME,
+    cache_get,
+    cache_set)
 from onadata.libs.utils.common_tags import MONGO_STRFTIME, DATE_FORMAT
 from onadata.libs.utils.model_tools import get_columns_with_hxl
 from onadata.libs.utils.api_export_tools import include_hxl_row
@@ -99,7 +100,8 @@ class DataViewSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
         model = DataView
         fields = ('dataviewid', 'name', 'xform', 'project', 'columns', 'query',
-                  'matches_parent', 'count', 'instances_with_geopoints',
+                  'matches_parent', 'materialized', 'count',
+                  'instances_with_geopoints',
                   'last_submission_time', 'has_hxl_support', 'url',
                   'date_created', 'deleted_at', 'deleted_by')
         validators = [
@@ -176,7 +178,7 @@ class DataViewSerializer(serializers.HyperlinkedModelSerializer):
 
     def get_count(self, obj):
         if obj:
-            count_dict = cache.get('{}{}'.format(DATAVIEW_COUNT, obj.xform.pk))
+            count_dict = cache_get(DATAVIEW_COUNT, obj.xform.pk)
 
             if count_dict:
                 if obj.pk in count_dict:
@@ -185,15 +187,14 @@ class DataViewSerializer(serializers.HyperlinkedModelSerializer):
                 count_dict = {}
 
             count_rows = DataView.query_data(obj, count=True)
-            if 'error' in count_rows:
+            if isinstance(count_rows, dict):
                 raise ParseError(count_rows.get('error'))
 
-            count_row = count_rows[0]
+            count_row = next(count_rows, {})
             if 'count' in count_row:
                 count = count_row.get('count')
                 count_dict.setdefault(obj.pk, count)
-                cache.set('{}{}'.format(DATAVIEW_COUNT, obj.xform.pk),
-                          count_dict)
+                cache_set(DATAVIEW_COUNT, obj.xform.pk, count_dict)
 
                 return count
 
@@ -201,28 +202,25 @@ class DataViewSerializer(serializers.HyperlinkedModelSerializer):
 
     def get_last_submission_time(self, obj):
         if obj:
-            last_submission_time = cache.get('{}{}'.format(
-                DATAVIEW_LAST_SUBMISSION_TIME, obj.xform.pk))
+            last_submission_time = cache_get(
+                DATAVIEW_LAST_SUBMISSION_TIME, obj.xform.pk)
 
             if last_submission_time:
                 return last_submission_time
 
             last_submission_rows = DataView.query_data(
-                obj, last_submission_time=True)  # data is returned as list
+                obj, last_submission_time=True)
 
-            if 'error' in last_submission_rows:
+            if isinstance(last_submission_rows, dict):
                 raise ParseError(last_submission_rows.get('error'))
 
-            if len(last_submission_rows):
-                last_submission_row = last_submission_rows[0]
-
+            last_submission_row = next(last_submission_rows, None)
+            if last_submission_row is not None:
                 if LAST_SUBMISSION_TIME in last_submission_row:
                     last_submission_time = last_submission_row.get(
                         LAST_SUBMISSION_TIME)
-                    cache.set(
-                        '{}{}'.format(
-                            DATAVIEW_LAST_SUBMISSION_TIME, obj.xform.pk),
-                        last_submission_time)
+                    cache_set(DATAVIEW_LAST_SUBMISSION_TIME, obj.xform.pk,
+                              last_submission_time)
 
                 return last_submission_time
 
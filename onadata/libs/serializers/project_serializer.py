@@ -6,7 +6,6 @@ from future.utils import listvalues
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.cache import cache
 from django.db.utils import IntegrityError
 from django.utils.translation import ugettext as _
 
@@ -25,10 +24,18 @@ from onadata.libs.serializers.tag_list_serializer import TagListSerializer
 from onadata.libs.utils.cache_tools import (
     PROJ_BASE_FORMS_CACHE, PROJ_FORMS_CACHE, PROJ_NUM_DATASET_CACHE,
     PROJ_PERM_CACHE, PROJ_SUB_DATE_CACHE, PROJ_TEAM_USERS_CACHE,
-    PROJECT_LINKED_DATAVIEWS, PROJ_OWNER_CACHE, safe_delete)
+    PROJECT_LINKED_DATAVIEWS, PROJECT_NAMESPACE, PROJ_OWNER_CACHE,
+    bump_namespace, cache_get, cache_set)
 from onadata.libs.utils.decorators import check_obj
 
 
+def is_prefetched(obj, related_name):
+    """
+    Returns True if the related_name objects of obj have been prefetched.
+    """
+    return related_name in getattr(obj, '_prefetched_objects_cache', {})
+
+
 def get_project_xforms(project):
     """
     Returns an XForm queryset from project. The prefetched
@@ -45,8 +52,7 @@ def get_last_submission_date(project):
 
     :param project: The project to find the last submission date for.
     """
-    last_submission_date = cache.get(
-        '{}{}'.format(PROJ_SUB_DATE_CACHE, project.pk))
+    last_submission_date = cache_get(PROJ_SUB_DATE_CACHE, project.pk)
     if last_submission_date:
         return last_submission_date
     xforms = get_project_xforms(project)
@@ -57,8 +63,7 @@ def get_last_submission_date(project):
     dates.sort(reverse=True)
     last_submission_date = dates[0] if dates else None
 
-    cache.set('{}{}'.format(PROJ_SUB_DATE_CACHE, project.pk),
-              last_submission_date)
+    cache_set(PROJ_SUB_DATE_CACHE, project.pk, last_submission_date)
 
     return last_submission_date
 
@@ -69,12 +74,12 @@ def get_num_datasets(project):
 
     :param project: The project to find datasets for.
     """
-    count = cache.get('{}{}'.format(PROJ_NUM_DATASET_CACHE, project.pk))
+    count = cache_get(PROJ_NUM_DATASET_CACHE, project.pk)
     if count:
         return count
 
     count = len(get_project_xforms(project))
-    cache.set('{}{}'.format(PROJ_NUM_DATASET_CACHE, project.pk), count)
+    cache_set(PROJ_NUM_DATASET_CACHE, project.pk, count)
     return count
 
 
@@ -82,16 +87,23 @@ def is_starred(project, request):
     """
     Return True if the request.user has starred this project.
     """
-    return project.user_stars.filter(pk=request.user.pk).count() == 1
+    if is_prefetched(project, 'user_stars'):
+        return any(
+            user.pk == request.user.pk for user in project.user_stars.all())
 
+    return project.user_stars.filter(pk=request.user.pk).exists()
 
-def get_team_permissions(team, project):
+
+def get_project_group_permissions(project):
     """
-    Return team permissions.
+    Return the group object permissions of the project with their groups and
+    permissions.
     """
-    return project.projectgroupobjectpermission_set.filter(
-        group__pk=team.pk).values_list(
-            'permission__codename', flat=True)
+    perms = project.projectgroupobjectpermission_set.all()
+    if not is_prefetched(project, 'projectgroupobjectpermission_set'):
+        perms = perms.select_related('group', 'permission')
+
+    return perms
 
 
 @check_obj
@@ -99,17 +111,21 @@ def get_teams(project):
     """
     Return the teams with access to the project.
     """
-    teams_users = cache.get('{}{}'.format(PROJ_TEAM_USERS_CACHE, project.pk))
+    teams_users = cache_get(PROJ_TEAM_USERS_CACHE, project.pk)
     if teams_users:
         return teams_users
 
     teams_users = []
     teams = project.organization.team_set.all()
+    group_perms = get_project_group_permissions(project)
 
     for team in teams:
         # to take advantage of prefetch iterate over user set
         users = [user.username for user in team.user_set.all()]
-        perms = get_team_permissions(team, project)
+        perms = [
+            perm.permission.codename for perm in group_perms
+            if perm.group_id == team.pk
+        ]
 
         teams_users.append({
             "name": team.name,
@@ -117,7 +133,7 @@ def get_teams(project):
             "users": users
         })
 
-    cache.set('{}{}'.format(PROJ_TEAM_USERS_CACHE, project.pk), teams_users)
+    cache_set(PROJ_TEAM_USERS_CACHE, project.pk, teams_users)
     return teams_users
 
 
@@ -127,12 +143,16 @@ def get_users(project, context, all_perms=True):
     Return a list of users and organizations that have access to the project.
     """
     if all_perms:
-        users = cache.get('{}{}'.format(PROJ_PERM_CACHE, project.pk))
+        users = cache_get(PROJ_PERM_CACHE, project.pk)
         if users:
             return users
 
     data = {}
-    for perm in project.projectuserobjectpermission_set.all():
+    perms = project.projectuserobjectpermission_set.all()
+    if not is_prefetched(project, 'projectuserobjectpermission_set'):
+        perms = perms.select_related(
+            'user__profile__organizationprofile', 'permission')
+    for perm in perms:
         if perm.user_id not in data:
             user = perm.user
 
@@ -158,7 +178,7 @@ def get_users(project, context, all_perms=True):
     results = listvalues(data)
 
     if all_perms:
-        cache.set('{}{}'.format(PROJ_PERM_CACHE, project.pk), results)
+        cache_set(PROJ_PERM_CACHE, project.pk, results)
 
     return results
 
@@ -201,10 +221,12 @@ class ProjectXFormSerializer(serializers.HyperlinkedModelSerializer):
         """
         Returns true if the form was published by formbuilder.
         """
-        metadata = obj.metadata_set.filter(
-            data_type='published_by_formbuilder').first()
-        return (metadata and hasattr(metadata, 'data_value')
-                and metadata.data_value)
+        # iterate over metadata_set to take advantage of prefetch
+        for metadata in obj.metadata_set.all():
+            if metadata.data_type == 'published_by_formbuilder':
+                return metadata.data_value
+
+        return None
 
 
 class BaseProjectSerializer(serializers.HyperlinkedModelSerializer):
@@ -261,7 +283,7 @@ class BaseProjectSerializer(serializers.HyperlinkedModelSerializer):
         """
         Return list of xforms in the project.
         """
-        forms = cache.get('{}{}'.format(PROJ_BASE_FORMS_CACHE, obj.pk))
+        forms = cache_get(PROJ_BASE_FORMS_CACHE, obj.pk)
         if forms:
             return forms
 
@@ -270,7 +292,7 @@ class BaseProjectSerializer(serializers.HyperlinkedModelSerializer):
         serializer = BaseProjectXFormSerializer(
             xforms, context={'request': request}, many=True)
         forms = list(serializer.data)
-        cache.set('{}{}'.format(PROJ_BASE_FORMS_CACHE, obj.pk), forms)
+        cache_set(PROJ_BASE_FORMS_CACHE, obj.pk, forms)
 
         return forms
 
@@ -417,7 +439,7 @@ class ProjectSerializer(serializers.HyperlinkedModelSerializer):
                 ReadOnlyRole.add(members_team, instance)
 
             # clear cache
-            safe_delete('{}{}'.format(PROJ_PERM_CACHE, instance.pk))
+            bump_namespace(PROJECT_NAMESPACE, instance.pk)
 
         project = super(ProjectSerializer, self)\
             .update(instance, validated_data)
@@ -450,7 +472,7 @@ class ProjectSerializer(serializers.HyperlinkedModelSerializer):
             serializer = ProjectSerializer(
                 project, context={'request': request})
             response = serializer.data
-            cache.set(f'{PROJ_OWNER_CACHE}{project.pk}', response)
+            cache_set(PROJ_OWNER_CACHE, project.pk, response)
             return project
 
     def get_users(self, obj):  # pylint: disable=no-self-use
@@ -465,7 +487,7 @@ class ProjectSerializer(serializers.HyperlinkedModelSerializer):
         """
         Return list of xforms in the project.
         """
-        forms = cache.get('{}{}'.format(PROJ_FORMS_CACHE, obj.pk))
+        forms = cache_get(PROJ_FORMS_CACHE, obj.pk)
         if forms:
             return forms
         xforms = get_project_xforms(obj)
@@ -473,7 +495,7 @@ class ProjectSerializer(serializers.HyperlinkedModelSerializer):
         serializer = ProjectXFormSerializer(
             xforms, context={'request': request}, many=True)
         forms = list(serializer.data)
-        cache.set('{}{}'.format(PROJ_FORMS_CACHE, obj.pk), forms)
+        cache_set(PROJ_FORMS_CACHE, obj.pk, forms)
 
         return forms
 
@@ -506,7 +528,7 @@ class ProjectSerializer(serializers.HyperlinkedModelSerializer):
         """
         Return a list of filtered datasets.
         """
-        data_views = cache.get('{}{}'.format(PROJECT_LINKED_DATAVIEWS, obj.pk))
+        data_views = cache_get(PROJECT_LINKED_DATAVIEWS, obj.pk)
         if data_views:
             return data_views
 
@@ -518,6 +540,6 @@ class ProjectSerializer(serializers.HyperlinkedModelSerializer):
             data_views_obj, many=True, context=self.context)
         data_views = list(serializer.data)
 
-        cache.set('{}{}'.format(PROJECT_LINKED_DATAVIEWS, obj.pk), data_views)
+        cache_set(PROJECT_LINKED_DATAVIEWS, obj.pk, data_views)
 
         return data_views
@@ -1,3 +1,4 @@
+from django.utils.translation import ugettext as _
 from rest_framework import serializers
 
 from onadata.apps.logger.models import XForm
@@ -15,4 +16,21 @@ class RestServiceSerializer(serializers.ModelSerializer):
     class Meta:
         model = RestService
         fields = ('id', 'xform', 'name', 'service_url', 'date_created',
-                  'date_modified', 'active', 'inactive_reason')
+                  'date_modified', 'active', 'inactive_reason', 'batch_size',
+                  'batch_delay')
+
+    def validate(self, attrs):
+        batch_size = attrs.get(
+            'batch_size', getattr(self.instance, 'batch_size', 0))
+        name = attrs.get('name', getattr(self.instance, 'name', None))
+        try:
+            is_batched = RestService(
+                name=name, batch_size=batch_size).is_batched
+        except ImportError:
+            is_batched = False
+        if batch_size > 1 and not is_batched:
+            raise serializers.ValidationError({
+                'batch_size': _(u"%(name)s does not support batches." %
+                                {'name': name})})
+
+        return attrs
@@ -10,7 +10,6 @@ from past.builtins import basestring  # pylint: disable=redefined-builtin
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
-from django.core.cache import cache
 from django.db import IntegrityError, transaction
 from django.utils.translation import ugettext as _
 from django.utils import timezone
@@ -28,10 +27,12 @@ from onadata.apps.main.models import UserProfile
 from onadata.libs.authentication import expired
 from onadata.libs.permissions import CAN_VIEW_PROFILE, is_organization
 from onadata.libs.serializers.fields.json_field import JsonField
-from onadata.libs.utils.cache_tools import IS_ORG, USER_PROFILE_PREFIX
+from onadata.libs.utils.cache_tools import (IS_ORG, USER_PROFILE_PREFIX,
+                                            cache_get, cache_set)
 from onadata.libs.utils.email import (
     get_verification_url, get_verification_email_data
 )
+from onadata.libs.utils.permission_cache import prefetch_perms
 
 RESERVED_NAMES = RegistrationFormUserProfile.RESERVED_USERNAMES
 LEGAL_USERNAMES_REGEX = RegistrationFormUserProfile.legal_usernames_re
@@ -107,6 +108,20 @@ def _send_verification_email(redirect_url, user, request):
     send_verification_email.delay(**email_data)
 
 
+class UserProfileListSerializer(serializers.ListSerializer):
+    """
+    Fetches the permissions of the request user on all the profiles at once.
+    """
+
+    def to_representation(self, data):
+        request = self.context.get('request')
+        if request is not None:
+            data = list(data.all() if hasattr(data, 'all') else data)
+            prefetch_perms(request.user, data)
+
+        return super(UserProfileListSerializer, self).to_representation(data)
+
+
 class UserProfileSerializer(serializers.HyperlinkedModelSerializer):
     """
     UserProfile serializer.
@@ -143,6 +158,7 @@ class UserProfileSerializer(serializers.HyperlinkedModelSerializer):
                   'website', 'twitter', 'gravatar', 'require_auth', 'user',
                   'metadata', 'joined_on', 'name')
         owner_only_fields = ('metadata', )
+        list_serializer_class = UserProfileListSerializer
 
     def __init__(self, *args, **kwargs):
         super(UserProfileSerializer, self).__init__(*args, **kwargs)
@@ -160,12 +176,12 @@ class UserProfileSerializer(serializers.HyperlinkedModelSerializer):
         Returns True if it is an organization profile.
         """
         if obj:
-            is_org = cache.get('{}{}'.format(IS_ORG, obj.pk))
+            is_org = cache_get(IS_ORG, obj.pk)
             if is_org:
                 return is_org
 
         is_org = is_organization(obj)
-        cache.set('{}{}'.format(IS_ORG, obj.pk), is_org)
+        cache_set(IS_ORG, obj.pk, is_org)
         return is_org
 
     def to_representation(self, instance):
@@ -275,7 +291,7 @@ class UserProfileSerializer(serializers.HyperlinkedModelSerializer):
         profile.save()
 
         # cache user profile object
-        cache.set(f'{USER_PROFILE_PREFIX}{new_user.username}', profile)
+        cache_set(USER_PROFILE_PREFIX, new_user.username, profile)
 
         return profile
 
@@ -6,7 +6,6 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.serialization import load_pem_public_key
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
 from django.db.models import Count
@@ -28,7 +27,7 @@ from onadata.libs.serializers.tag_list_serializer import TagListSerializer
 from onadata.libs.utils.cache_tools import (
     ENKETO_PREVIEW_URL_CACHE, ENKETO_URL_CACHE, XFORM_DATA_VERSIONS,
     XFORM_LINKED_DATAVIEWS, XFORM_METADATA_CACHE, XFORM_PERMISSIONS_CACHE,
-    XFORM_COUNT)
+    XFORM_COUNT, cache_get, cache_set)
 from onadata.libs.utils.common_tags import (GROUP_DELIMETER_TAG,
                                             REPEAT_INDEX_TAGS)
 from onadata.libs.utils.decorators import check_obj
@@ -69,7 +68,7 @@ def _set_cache(cache_key, cache_data, obj):
     :param obj:
     :return: Data that has been cached
     """
-    cache.set('{}{}'.format(cache_key, obj.pk), cache_data)
+    cache_set(cache_key, obj.pk, cache_data)
     return cache_data
 
 
@@ -99,15 +98,18 @@ class XFormMixin(object):
     def get_users(self, obj):
         xform_perms = []
         if obj:
-            xform_perms = cache.get(
-                '{}{}'.format(XFORM_PERMISSIONS_CACHE, obj.pk))
+            xform_perms = cache_get(XFORM_PERMISSIONS_CACHE, obj.pk)
             if xform_perms:
                 return xform_perms
 
-            cache.set('{}{}'.format(XFORM_PERMISSIONS_CACHE, obj.pk),
-                      xform_perms)
+            cache_set(XFORM_PERMISSIONS_CACHE, obj.pk, xform_perms)
         data = {}
-        for perm in obj.xformuserobjectpermission_set.all():
+        perms = obj.xformuserobjectpermission_set.all()
+        if 'xformuserobjectpermission_set' not in getattr(
+                obj, '_prefetched_objects_cache', {}):
+            perms = perms.select_related(
+                'user__profile__organizationprofile', 'permission')
+        for perm in perms:
             if perm.user_id not in data:
                 user = perm.user
 
@@ -130,13 +132,13 @@ class XFormMixin(object):
 
         xform_perms = listvalues(data)
 
-        cache.set('{}{}'.format(XFORM_PERMISSIONS_CACHE, obj.pk), xform_perms)
+        cache_set(XFORM_PERMISSIONS_CACHE, obj.pk, xform_perms)
 
         return xform_perms
 
     def get_enketo_url(self, obj):
         if obj:
-            _enketo_url = cache.get('{}{}'.format(ENKETO_URL_CACHE, obj.pk))
+            _enketo_url = cache_get(ENKETO_URL_CACHE, obj.pk)
             if _enketo_url:
                 return _enketo_url
 
@@ -150,8 +152,7 @@ class XFormMixin(object):
 
     def get_enketo_preview_url(self, obj):
         if obj:
-            _enketo_preview_url = cache.get(
-                '{}{}'.format(ENKETO_PREVIEW_URL_CACHE, obj.pk))
+            _enketo_preview_url = cache_get(ENKETO_PREVIEW_URL_CACHE, obj.pk)
             if _enketo_preview_url:
                 return _enketo_preview_url
 
@@ -172,31 +173,31 @@ class XFormMixin(object):
 
     def get_data_views(self, obj):
         if obj:
-            key = '{}{}'.format(XFORM_LINKED_DATAVIEWS, obj.pk)
-            data_views = cache.get(key)
+            data_views = cache_get(XFORM_LINKED_DATAVIEWS, obj.pk)
             if data_views:
                 return data_views
 
+            # filter dataview_set in python to take advantage of prefetch
             data_views = DataViewMinimalSerializer(
-                obj.dataview_set.filter(deleted_at__isnull=True),
+                [data_view for data_view in obj.dataview_set.all()
+                 if data_view.deleted_at is None],
                 many=True, context=self.context).data
 
-            cache.set(key, list(data_views))
+            cache_set(XFORM_LINKED_DATAVIEWS, obj.pk, list(data_views))
 
             return data_views
         return []
 
     def get_num_of_submissions(self, obj):
         if obj:
-            key = '{}{}'.format(XFORM_COUNT, obj.pk)
-            count = cache.get(key)
-            if count:
+            count = cache_get(XFORM_COUNT, obj.pk)
+            if count is not None:
                 return count
 
             force_update = True if obj.is_merged_dataset else False
             count = obj.submission_count(force_update)
 
-            cache.set(key, count)
+            cache_set(XFORM_COUNT, obj.pk, count)
             return count
 
     def get_last_submission_time(self, obj):
@@ -221,6 +222,30 @@ class XFormMixin(object):
             if obj.last_submission_time else None
 
 
+class XFormBaseListSerializer(serializers.ListSerializer):
+    """
+    Counts the submissions of all forms without a submission count at once.
+    """
+
+    def to_representation(self, data):
+        data = list(data.all() if hasattr(data, 'all') else data)
+        xform_ids = [
+            xform.pk for xform in data
+            if not xform.num_of_submissions and not xform.is_merged_dataset
+            and cache_get(XFORM_COUNT, xform.pk) is None
+        ]
+        if xform_ids:
+            counts = dict(
+                Instance.objects.filter(
+                    xform_id__in=xform_ids, deleted_at__isnull=True)
+                .values_list('xform_id').annotate(count=Count('id')))
+            for xform in data:
+                if xform.pk in xform_ids and not counts.get(xform.pk):
+                    cache_set(XFORM_COUNT, xform.pk, 0)
+
+        return super(XFormBaseListSerializer, self).to_representation(data)
+
+
 class XFormBaseSerializer(XFormMixin, serializers.HyperlinkedModelSerializer):
     formid = serializers.ReadOnlyField(source='id')
     owner = serializers.HyperlinkedRelatedField(
@@ -256,6 +281,7 @@ class XFormBaseSerializer(XFormMixin, serializers.HyperlinkedModelSerializer):
                             'last_submission_time', 'is_merged_dataset')
         exclude = ('json', 'xml', 'xls', 'user', 'has_start_time', 'shared',
                    'shared_data', 'deleted_at', 'deleted_by')
+        list_serializer_class = XFormBaseListSerializer
 
 
 class XFormSerializer(XFormMixin, serializers.HyperlinkedModelSerializer):
@@ -296,12 +322,12 @@ class XFormSerializer(XFormMixin, serializers.HyperlinkedModelSerializer):
                             'last_submission_time', 'is_merged_dataset')
         exclude = ('json', 'xml', 'xls', 'user', 'has_start_time', 'shared',
                    'shared_data', 'deleted_at', 'deleted_by')
+        list_serializer_class = XFormBaseListSerializer
 
     def get_metadata(self, obj):
         xform_metadata = []
         if obj:
-            xform_metadata = cache.get(
-                '{}{}'.format(XFORM_METADATA_CACHE, obj.pk))
+            xform_metadata = cache_get(XFORM_METADATA_CACHE, obj.pk)
             if xform_metadata:
                 return xform_metadata
 
@@ -309,8 +335,7 @@ class XFormSerializer(XFormMixin, serializers.HyperlinkedModelSerializer):
                 MetaDataSerializer(
                     obj.metadata_set.all(), many=True, context=self.context)
                 .data)
-            cache.set('{}{}'.format(XFORM_METADATA_CACHE, obj.pk),
-                      xform_metadata)
+            cache_set(XFORM_METADATA_CACHE, obj.pk, xform_metadata)
 
         return xform_metadata
 
@@ -353,7 +378,7 @@ class XFormSerializer(XFormMixin, serializers.HyperlinkedModelSerializer):
     def get_form_versions(self, obj):
         versions = []
         if obj:
-            versions = cache.get('{}{}'.format(XFORM_DATA_VERSIONS, obj.pk))
+            versions = cache_get(XFORM_DATA_VERSIONS, obj.pk)
 
             if versions:
                 return versions
@@ -363,8 +388,7 @@ class XFormSerializer(XFormMixin, serializers.HyperlinkedModelSerializer):
                 .values('version').annotate(total=Count('version')))
 
             if versions:
-                cache.set('{}{}'.format(XFORM_DATA_VERSIONS, obj.pk),
-                          list(versions))
+                cache_set(XFORM_DATA_VERSIONS, obj.pk, list(versions))
 
         return versions
 
@@ -34,7 +34,8 @@ class TestExportSerializer(TestAbstractViewSet):
         self.assertEqual(list(serializer.data), ['id', 'job_status', 'type',
                                                  'task_id', 'xform',
                                                  'date_created', 'filename',
-                                                 'options', 'export_url'])
+                                                 'options', 'export_url',
+                                                 'metrics'])
         self.assertEqual(
             serializer.data.get('export_url'),
             'http://testserver/api/v1/export/%s.csv' % export[0].id
@@ -2,8 +2,9 @@ from mock import MagicMock
 from rest_framework import serializers
 from rest_framework.test import APIRequestFactory
 
-from django.core.cache import cache
-from onadata.libs.utils.cache_tools import PROJ_OWNER_CACHE, safe_key
+from onadata.libs.utils.cache_tools import (PROJ_OWNER_CACHE,
+                                            PROJECT_NAMESPACE,
+                                            bump_namespace, cache_get)
 from onadata.apps.api.tests.viewsets.test_abstract_viewset import \
     TestAbstractViewSet
 from onadata.apps.logger.models import Project
@@ -133,8 +134,8 @@ class TestProjectSerializer(TestAbstractViewSet):
                 'public': False
             }
         # clear cache
-        cache.delete(safe_key(f'{PROJ_OWNER_CACHE}1'))
-        self.assertIsNone(cache.get(safe_key(f'{PROJ_OWNER_CACHE}1')))
+        bump_namespace(PROJECT_NAMESPACE, 1)
+        self.assertIsNone(cache_get(PROJ_OWNER_CACHE, 1))
 
         # Create the project
         self._project_create(data)
@@ -146,7 +147,7 @@ class TestProjectSerializer(TestAbstractViewSet):
         serializer = ProjectSerializer(
             self.project, context={'request': request}).data
         self.assertEqual(
-             cache.get(f'{PROJ_OWNER_CACHE}{self.project.pk}'), serializer)
+             cache_get(PROJ_OWNER_CACHE, self.project.pk), serializer)
 
         # clear cache
-        cache.delete(safe_key(f'{PROJ_OWNER_CACHE}{self.project.pk}'))
+        bump_namespace(PROJECT_NAMESPACE, self.project.pk)
@@ -205,3 +205,26 @@ class TestApiExportTools(TestBase):
 
         result = get_async_response('job_uuid', request, self.xform)
         self.assertEqual(result, {'job_status': 'PENDING', 'progress': '1'})
+
+    @mock.patch('onadata.libs.utils.api_export_tools.AsyncResult')
+    def test_get_async_response_export_progress(self, AsyncResult):
+        """
+        Test get_async_response returns the export progress metrics.
+        """
+        meta = {'progress': 1000, 'total': 4000, 'rows_per_second': 500.0,
+                'eta': 6, 'section': 'children', 'bytes_written': 20480}
+
+        class MockAsyncResult(object):  # pylint: disable=R0903
+            """Mock AsyncResult"""
+            state = 'PROGRESS'
+            result = meta
+
+        AsyncResult.return_value = MockAsyncResult()
+        self._publish_transportation_form_and_submit_instance()
+        request = self.factory.post('/')
+        request.user = self.user
+
+        result = get_async_response('job_uuid', request, self.xform)
+        expected = {'job_status': 'PROGRESS'}
+        expected.update(meta)
+        self.assertEqual(result, expected)
@@ -1,9 +1,17 @@
 import os
+import tempfile
+import zipfile
+
+from django.db import transaction
+from mock import patch
 
 from onadata.apps.main.tests.test_base import TestBase
 from onadata.libs.utils.backup_tools import (
+    create_zip_backup,
     restore_backup_from_xml_file,
-    restore_backup_from_path)
+    restore_backup_from_path,
+    restore_backup_from_zip)
+from onadata.libs.utils.logger_tools import create_instance
 from onadata.apps.logger.models import Instance
 
 
@@ -43,3 +51,60 @@ class TestBackupRestore(TestBase):
         self.assertEqual(num_instances, 1)
         self.assertEqual(num_restored, 1)
         self.assertEqual(count_qs.count(), count + 1)
+
+    def test_create_and_restore_zip_backup(self):
+        self._make_submissions()
+        count_qs = Instance.objects.filter(xform=self.xform)
+        count = count_qs.count()
+        xmls = sorted(count_qs.values_list('xml', flat=True))
+        zip_file = tempfile.NamedTemporaryFile(suffix='.zip')
+        self.addCleanup(zip_file.close)
+
+        create_zip_backup(zip_file.name, self.user, self.xform, chunk_size=3)
+        with zipfile.ZipFile(zip_file.name) as zf:
+            names = zf.namelist()
+            self.assertEqual(len(names), count)
+            self.assertEqual(len(set(names)), count)
+            self.assertTrue(all(
+                name.startswith('instances/') for name in names))
+            self.assertEqual(
+                sorted(zf.read(name).decode('utf-8') for name in names),
+                xmls)
+
+        count_qs.delete()
+        num_instances, num_restored = restore_backup_from_zip(
+            zip_file.name, self.user.username, batch_size=3)
+        self.assertEqual(num_instances, count)
+        self.assertEqual(num_restored, count)
+        self.assertEqual(count_qs.count(), count)
+
+    def test_restore_zip_backup_commits_each_submission(self):
+        """
+        Test every restored submission is committed before the next one is
+        restored
+        """
+        self._make_submissions()
+        count_qs = Instance.objects.filter(xform=self.xform)
+        count = count_qs.count()
+        zip_file = tempfile.NamedTemporaryFile(suffix='.zip')
+        self.addCleanup(zip_file.close)
+        create_zip_backup(zip_file.name, self.user, self.xform)
+        count_qs.delete()
+
+        restored = []
+        committed = []
+
+        def _create_instance(*args, **kwargs):
+            self.assertEqual(committed, restored)
+            instance = create_instance(*args, **kwargs)
+            restored.append(instance.pk)
+            transaction.on_commit(lambda: committed.append(instance.pk))
+            return instance
+
+        with patch('onadata.libs.utils.backup_tools.create_instance',
+                   side_effect=_create_instance):
+            num_instances, num_restored = restore_backup_from_zip(
+                zip_file.name, self.user.username, batch_size=count)
+        self.assertEqual(num_instances, count)
+        self.assertEqual(num_restored, count)
+        self.assertEqual(committed, restored)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Tests onadata.libs.utils.batch_runner module
+"""
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+
+from onadata.apps.main.tests.test_base import TestBase
+from onadata.libs.utils.batch_runner import BatchRunner, iterable_batches
+
+
+class TestBatchRunner(TestBase):
+    """
+    Tests for onadata.libs.utils.batch_runner module
+    """
+
+    def setUp(self):
+        super(TestBatchRunner, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def test_run_resumes_from_checkpoint(self):
+        """
+        Test objects are processed in id order, a run resumes after the
+        last object processed by the previous run and the keys of the
+        failed objects are recorded
+        """
+        for username in ['alice', 'jane', 'john']:
+            self._create_user(username, username)
+        checkpoint = os.path.join(self.tmp_dir, 'checkpoint')
+        users = User.objects.exclude(username='AnonymousUser')
+        processed = []
+
+        def process(user):
+            processed.append(user.pk)
+            if user.username == 'jane':
+                raise ValueError('jane')
+
+        stderr = StringIO()
+        runner = BatchRunner(
+            batch_size=2, checkpoint=checkpoint, stderr=stderr)
+        self.assertEqual(runner.run(users, process), (users.count(), 1))
+        self.assertEqual(
+            processed, list(users.order_by('pk').values_list('pk', flat=True)))
+        with open(checkpoint) as checkpoint_file:
+            self.assertEqual(checkpoint_file.read(), str(processed[-1]))
+        jane = User.objects.get(username='jane')
+        with open(runner.failed_keys_file) as failed_file:
+            self.assertEqual(failed_file.read(), '{}\n'.format(jane.pk))
+        self.assertIn('jane', stderr.getvalue())
+
+        processed = []
+        user = self._create_user('mary', 'mary')
+        runner = BatchRunner(batch_size=2, checkpoint=checkpoint)
+        self.assertEqual(runner.run(users, process), (1, 0))
+        self.assertEqual(processed, [user.pk])
+
+    def test_run_batches_with_workers(self):
+        """
+        Test all objects are processed once by the workers
+        """
+        processed = []
+        runner = BatchRunner(workers=3, batch_size=4, rate=1000)
+        result = runner.run_batches(
+            lambda after: iterable_batches(range(10), runner.batch_size),
+            processed.append, key=lambda obj: obj)
+        self.assertEqual(result, (10, 0))
+        self.assertEqual(sorted(processed), list(range(10)))
+
+    def test_run_raises_errors_without_stderr(self):
+        """
+        Test errors are raised when the runner has no stderr to report them
+        """
+        checkpoint = os.path.join(self.tmp_dir, 'checkpoint')
+
+        def process(obj):
+            if obj == 3:
+                raise ValueError(obj)
+
+        runner = BatchRunner(batch_size=2, checkpoint=checkpoint)
+        with self.assertRaises(ValueError):
+            runner.run_batches(
+                lambda after: iterable_batches(range(5), runner.batch_size),
+                process, key=lambda obj: obj)
+        self.assertEqual(runner.failed, 1)
+        # the checkpoint is not moved past the batch that raised
+        with open(checkpoint) as checkpoint_file:
+            self.assertEqual(checkpoint_file.read(), '1')
+        with open(runner.failed_keys_file) as failed_file:
+            self.assertEqual(failed_file.read(), '3\n')
@@ -4,7 +4,19 @@ Test onadata.libs.utils.cache_tools module.
 """
 from unittest import TestCase
 
-from onadata.libs.utils.cache_tools import safe_key
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from onadata.libs.utils.cache_tools import (EXPORT_SINGLE_FLIGHT,
+                                            PROJ_FORMS_CACHE,
+                                            PROJ_OWNER_CACHE,
+                                            PROJECT_NAMESPACE, XFORM_COUNT,
+                                            XFORM_METADATA_CACHE,
+                                            LocalCache, bump_namespace,
+                                            cache_get, cache_set,
+                                            get_cache_key, get_cache_metrics,
+                                            get_local_cache, safe_delete,
+                                            safe_key)
 
 
 class TestCacheTools(TestCase):
@@ -15,3 +27,90 @@ class TestCacheTools(TestCase):
         self.assertEqual(
             safe_key("hello world"),
             "b94d27b9934d3e08a52e52d7da7dabfac484efe37a5380ee9088f7ace2efcde9")
+
+    def test_get_cache_key(self):
+        """Test get_cache_key() includes the version of namespaced keys"""
+        self.assertEqual(
+            get_cache_key(EXPORT_SINGLE_FLIGHT, 1),
+            '{}1'.format(EXPORT_SINGLE_FLIGHT))
+        key = get_cache_key(PROJ_OWNER_CACHE, 1)
+        self.assertTrue(key.startswith('{}1-v'.format(PROJ_OWNER_CACHE)))
+        self.assertEqual(get_cache_key(PROJ_OWNER_CACHE, 1), key)
+
+        bump_namespace(PROJECT_NAMESPACE, 1)
+        self.assertNotEqual(get_cache_key(PROJ_OWNER_CACHE, 1), key)
+
+    def test_bump_namespace(self):
+        """Test bump_namespace() invalidates the keys of the namespace only"""
+        cache_set(PROJ_OWNER_CACHE, 2, 'owner')
+        cache_set(PROJ_FORMS_CACHE, 2, ['forms'])
+        cache_set(PROJ_OWNER_CACHE, 3, 'other owner')
+        cache_set(XFORM_COUNT, 2, 5)
+
+        bump_namespace(PROJECT_NAMESPACE, 2)
+        self.assertIsNone(cache_get(PROJ_OWNER_CACHE, 2))
+        self.assertIsNone(cache_get(PROJ_FORMS_CACHE, 2))
+        self.assertEqual(cache_get(PROJ_OWNER_CACHE, 3), 'other owner')
+        self.assertEqual(cache_get(XFORM_COUNT, 2), 5)
+
+    def test_cache_metrics(self):
+        """Test cache_get() counts hits and misses per prefix"""
+        before = get_cache_metrics().get(
+            PROJ_OWNER_CACHE, {'hits': 0, 'misses': 0})
+        bump_namespace(PROJECT_NAMESPACE, 4)
+        self.assertEqual(cache_get(PROJ_OWNER_CACHE, 4, 'default'), 'default')
+        cache_set(PROJ_OWNER_CACHE, 4, 'owner')
+        self.assertEqual(cache_get(PROJ_OWNER_CACHE, 4), 'owner')
+
+        after = get_cache_metrics()[PROJ_OWNER_CACHE]
+        self.assertEqual(after['hits'], before['hits'] + 1)
+        self.assertEqual(after['misses'], before['misses'] + 1)
+
+    @override_settings(LOCAL_CACHE_TTL=60, LOCAL_CACHE_MAX_SIZE=2)
+    def test_local_cache(self):
+        """Test cache_get() reads values from the local cache"""
+        bump_namespace(PROJECT_NAMESPACE, 5)
+        cache_set(PROJ_OWNER_CACHE, 5, {'owner': 'bob'})
+        key = get_cache_key(PROJ_OWNER_CACHE, 5)
+        cache.delete(key)
+        value = cache_get(PROJ_OWNER_CACHE, 5)
+        self.assertEqual(value, {'owner': 'bob'})
+        # local values are copies
+        value['owner'] = 'alice'
+        self.assertEqual(cache_get(PROJ_OWNER_CACHE, 5), {'owner': 'bob'})
+
+        # bumping the namespace invalidates the local values
+        bump_namespace(PROJECT_NAMESPACE, 5)
+        self.assertIsNone(cache_get(PROJ_OWNER_CACHE, 5))
+
+        # namespace versions are read from the shared cache, a namespace
+        # bumped by another process is seen at once
+        cache_set(PROJ_OWNER_CACHE, 5, {'owner': 'bob'})
+        self.assertEqual(cache_get(PROJ_OWNER_CACHE, 5), {'owner': 'bob'})
+        cache.incr('ns-version-{}-5'.format(PROJECT_NAMESPACE))
+        self.assertIsNone(cache_get(PROJ_OWNER_CACHE, 5))
+
+        # values that are not versioned are not cached locally
+        cache_set(XFORM_METADATA_CACHE, 5, ['metadata'])
+        metadata_key = get_cache_key(XFORM_METADATA_CACHE, 5)
+        self.assertIsNone(get_local_cache().get(metadata_key))
+        cache.delete(metadata_key)
+        self.assertIsNone(cache_get(XFORM_METADATA_CACHE, 5))
+
+        safe_delete(key)
+        self.assertIsNone(get_local_cache().get(key))
+
+    def test_local_cache_lru(self):
+        """Test LocalCache evicts the least recently used and expired keys"""
+        local_cache = LocalCache(ttl=60, max_size=2)
+        local_cache.set('a', 1)
+        local_cache.set('b', 2)
+        self.assertEqual(local_cache.get('a'), 1)
+        local_cache.set('c', 3)
+        self.assertIsNone(local_cache.get('b'))
+        self.assertEqual(local_cache.get('a'), 1)
+        self.assertEqual(local_cache.get('c'), 3)
+
+        local_cache.ttl = -1
+        local_cache.set('d', 4)
+        self.assertIsNone(local_cache.get('d'))
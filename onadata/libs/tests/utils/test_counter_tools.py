@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Tests onadata.libs.utils.counter_tools module
+"""
+from mock import patch
+
+from onadata.apps.logger.models import Instance, XForm
+from onadata.apps.main.models import UserProfile
+from onadata.apps.main.tests.test_base import TestBase
+from onadata.libs.utils.counter_tools import (reconcile_attachment_counters,
+                                              reconcile_profile_counters,
+                                              reconcile_xform_counters)
+
+
+class TestCounterTools(TestBase):
+    """
+    Tests for onadata.libs.utils.counter_tools module
+    """
+
+    def test_reconcile_counters(self):
+        """
+        Test the submission counters are recomputed and only the counters
+        that drifted are updated
+        """
+        self._publish_transportation_form_and_submit_instance()
+        self.assertEqual(reconcile_xform_counters(), [])
+        self.assertEqual(reconcile_profile_counters(), 0)
+
+        instance = Instance.objects.filter(xform=self.xform).latest('pk')
+        XForm.objects.filter(pk=self.xform.pk).update(
+            num_of_submissions=10, last_submission_time=None)
+        UserProfile.objects.filter(user=self.user).update(
+            num_of_submissions=10)
+
+        self.assertEqual(reconcile_xform_counters(), [self.xform.pk])
+        self.assertEqual(reconcile_profile_counters(), 1)
+        self.xform.refresh_from_db()
+        self.assertEqual(self.xform.num_of_submissions, 1)
+        self.assertEqual(self.xform.last_submission_time,
+                         instance.date_created)
+        self.assertEqual(
+            UserProfile.objects.get(user=self.user).num_of_submissions, 1)
+
+    def test_reconcile_attachment_counters(self):
+        """
+        Test the attachment counts of the submissions missing media are
+        recomputed, including counts that are too high, and submissions
+        whose counts did not drift are not updated
+        """
+        self._publish_transportation_form()
+        self._submit_transport_instance_w_attachment()
+        self.assertEqual(reconcile_attachment_counters(), 0)
+
+        instance = self.xform.instances.get()
+        total_media = instance.total_media
+        Instance.objects.filter(pk=instance.pk).update(
+            total_media=total_media + 1, media_count=0,
+            media_all_received=False)
+
+        with patch('onadata.apps.logger.models.instance.'
+                   'update_project_date_modified') as mock_date_modified:
+            self.assertEqual(reconcile_attachment_counters(), 1)
+            # the submission is not saved
+            self.assertFalse(mock_date_modified.called)
+        instance.refresh_from_db()
+        self.assertEqual(instance.total_media, total_media)
+        self.assertEqual(instance.media_count, total_media)
+        self.assertTrue(instance.media_all_received)
+        self.assertEqual(instance.json['_media_count'], total_media)
+        self.assertTrue(instance.json['_media_all_received'])
+        self.assertEqual(reconcile_attachment_counters(), 0)
+
+        # media that did not arrive yet is not a drift
+        instance.attachments.all().delete()
+        Instance.objects.filter(pk=instance.pk).update(
+            media_count=0, media_all_received=False)
+        self.assertEqual(reconcile_attachment_counters(), 0)
@@ -9,17 +9,22 @@ import datetime
 import os
 import shutil
 import tempfile
+import time
 import zipfile
 from builtins import open
 from collections import OrderedDict
 from ctypes import ArgumentError
 from io import BytesIO
 
+import pyarrow
 import xlrd
 from django.conf import settings
 from django.core.files.temp import NamedTemporaryFile
+from django.test.utils import override_settings
+from mock import patch
 from openpyxl import load_workbook
 from past.builtins import basestring
+from pyarrow import parquet
 from pyxform.builder import create_survey_from_xls
 from savReaderWriter import SavHeaderReader, SavReader
 
@@ -37,7 +42,10 @@ from onadata.libs.utils.export_builder import (
     decode_mongo_encoded_section_names,
     dict_to_joined_export,
     ExportBuilder,
-    string_to_date_with_xls_validation)
+    get_task_progress_meta,
+    string_to_date_with_xls_validation,
+    to_parquet_value,
+    track_task_progress)
 from onadata.libs.utils.export_tools import get_columns_with_hxl
 from onadata.libs.utils.logger_tools import create_instance
 
@@ -483,6 +491,167 @@ class TestExportBuilder(TestBase):
             self.assertEqual(data['children.info/fav_colors/pink\'s'], 'False')
             # check that red and blue are set to true
 
+    def test_zipped_parquet_export_works(self):
+        survey = self._create_childrens_survey()
+        export_builder = ExportBuilder()
+        export_builder.set_survey(survey)
+        temp_zip_file = NamedTemporaryFile(suffix='.zip')
+        export_builder.to_zipped_parquet(temp_zip_file.name, self.data)
+        temp_zip_file.seek(0)
+        temp_dir = tempfile.mkdtemp()
+        zip_file = zipfile.ZipFile(temp_zip_file.name, 'r')
+        zip_file.extractall(temp_dir)
+        zip_file.close()
+        temp_zip_file.close()
+
+        # one parquet file per section with a row per record in the section
+        expected_rows = {
+            'childrens_survey': 2,
+            'children': 3,
+            'children_cartoons': 4,
+            'children_cartoons_characters': 2,
+        }
+        for (name, num_rows) in expected_rows.items():
+            file_path = os.path.join(temp_dir, "{0}.parquet".format(name))
+            self.assertTrue(os.path.exists(file_path))
+            table = parquet.read_table(file_path)
+            self.assertEqual(table.num_rows, num_rows)
+
+        table = parquet.read_table(
+            os.path.join(temp_dir, "childrens_survey.parquet"))
+        self.assertEqual(table.column('name').to_pylist(), ['Abe', None])
+        self.assertEqual(table.column('age').to_pylist(), [35, None])
+        self.assertEqual(str(table.schema.field('age').type), 'int64')
+        self.assertEqual(table.column('_index').to_pylist(), [1, 2])
+
+        table = parquet.read_table(os.path.join(temp_dir, "children.parquet"))
+        self.assertEqual(
+            table.column('children/name').to_pylist(),
+            ['Mike', 'John', 'Imora'])
+        self.assertEqual(
+            table.column('children/fav_colors/red').to_pylist(),
+            [True, None, None])
+        self.assertEqual(
+            table.column('_parent_index').to_pylist(), [1, 1, 1])
+
+        shutil.rmtree(temp_dir)
+
+    def test_zipped_parquet_export_column_types(self):
+        md = """
+        | survey |
+        |        | type              | name       | label      |
+        |        | integer           | age        | Age        |
+        |        | decimal           | amount     | Amount     |
+        |        | date              | start_date | Start Date |
+        |        | geopoint          | location   | Location   |
+        |        | select_one gender | gender     | Gender     |
+        |        | select_one gender | sex        | Sex        |
+
+        | choices |
+        |         | list name | name   | label  |
+        |         | gender    | male   | Male   |
+        |         | gender    | female | Female |
+        """
+        survey = self.md_to_pyxform_survey(md, {'name': 'exp'})
+        data = [{
+            "age": "12",
+            "amount": "100.5",
+            "start_date": "2017-06-13",
+            "location": "-1.2625 36.7924 0.0 0.0",
+            "gender": "male",
+            "sex": "female",
+            "_submission_time": "2016-11-21T03:43:43.000-08:00"
+        }, {
+            "age": "not a number",
+            "gender": "female",
+            "sex": "female",
+        }]
+        export_builder = ExportBuilder()
+        export_builder.set_survey(survey)
+        temp_zip_file = NamedTemporaryFile(suffix='.zip')
+        export_builder.to_zipped_parquet(temp_zip_file.name, data)
+        temp_zip_file.seek(0)
+        temp_dir = tempfile.mkdtemp()
+        zip_file = zipfile.ZipFile(temp_zip_file.name, "r")
+        zip_file.extractall(temp_dir)
+        zip_file.close()
+        temp_zip_file.close()
+
+        file_path = os.path.join(temp_dir, "exp.parquet")
+        table = parquet.read_table(file_path)
+        schema = table.schema
+        self.assertEqual(str(schema.field('age').type), 'int64')
+        self.assertEqual(str(schema.field('amount').type), 'double')
+        self.assertEqual(str(schema.field('start_date').type), 'date32[day]')
+        self.assertEqual(
+            str(schema.field('_location_latitude').type), 'double')
+        self.assertEqual(
+            str(schema.field('_submission_time').type), 'timestamp[ms]')
+        self.assertEqual(table.column('age').to_pylist(), [12, None])
+        self.assertEqual(table.column('amount').to_pylist(), [100.5, None])
+        self.assertEqual(
+            table.column('start_date').to_pylist(),
+            [datetime.date(2017, 6, 13), None])
+        self.assertEqual(
+            table.column('_location_latitude').to_pylist(), [-1.2625, None])
+        self.assertEqual(
+            table.column('_location_longitude').to_pylist(), [36.7924, None])
+        self.assertEqual(
+            table.column('gender').to_pylist(), ['male', 'female'])
+
+        # select one columns are dictionary encoded
+        row_group = parquet.ParquetFile(file_path).metadata.row_group(0)
+        encodings = {
+            row_group.column(i).path_in_schema:
+            ' '.join(row_group.column(i).encodings)
+            for i in range(row_group.num_columns)}
+        self.assertIn('DICTIONARY', encodings['gender'])
+        self.assertNotIn('DICTIONARY', encodings['age'])
+
+        shutil.rmtree(temp_dir)
+
+    def test_zipped_parquet_export_choice_labels(self):
+        md = """
+        | survey |
+        |        | type                     | name   | label  |
+        |        | select_multiple fruits   | fruits | Fruits |
+
+        | choices |
+        |         | list name | name   | label  |
+        |         | fruits    | mango  | Mango  |
+        |         | fruits    | orange | Orange |
+        """
+        survey = self.md_to_pyxform_survey(md, {'name': 'exp'})
+        data = [{"fruits": "mango"}, {"fruits": "mango orange"}]
+        export_builder = ExportBuilder()
+        export_builder.SHOW_CHOICE_LABELS = True
+        export_builder.set_survey(survey)
+        temp_zip_file = NamedTemporaryFile(suffix='.zip')
+        export_builder.to_zipped_parquet(temp_zip_file.name, data)
+        temp_zip_file.seek(0)
+        temp_dir = tempfile.mkdtemp()
+        zip_file = zipfile.ZipFile(temp_zip_file.name, "r")
+        zip_file.extractall(temp_dir)
+        zip_file.close()
+        temp_zip_file.close()
+
+        # the choice columns are named by label and still typed as booleans
+        table = parquet.read_table(os.path.join(temp_dir, "exp.parquet"))
+        self.assertEqual(str(table.schema.field('fruits/Mango').type), 'bool')
+        self.assertEqual(
+            table.column('fruits/Mango').to_pylist(), [True, True])
+        self.assertEqual(
+            table.column('fruits/Orange').to_pylist(), [False, True])
+
+        shutil.rmtree(temp_dir)
+
+    def test_to_parquet_value_boolean(self):
+        self.assertTrue(to_parquet_value(True, pyarrow.bool_()))
+        self.assertTrue(to_parquet_value('True', pyarrow.bool_()))
+        self.assertFalse(to_parquet_value('False', pyarrow.bool_()))
+        self.assertFalse(to_parquet_value('0', pyarrow.bool_()))
+        self.assertIsNone(to_parquet_value(None, pyarrow.bool_()))
+
     def test_zipped_sav_export_with_date_field(self):
         md = """
         | survey |
@@ -2995,3 +3164,40 @@ class TestExportBuilder(TestBase):
             [u'KCB Equity Co-operative CBA', u'Co-operative']]
         temp_xls_file.close()
         self.assertEqual(result, expected_result)
+
+    def test_get_task_progress_meta(self):
+        """
+        Test the export progress meta includes throughput and ETA.
+        """
+        self.assertEqual(get_task_progress_meta(100), {'progress': 100})
+
+        start_time = time.time() - 10
+        meta = get_task_progress_meta(
+            100, 300, start_time=start_time, section='children',
+            bytes_written=2048)
+        self.assertEqual(meta['progress'], 100)
+        self.assertEqual(meta['total'], 300)
+        self.assertEqual(meta['section'], 'children')
+        self.assertEqual(meta['bytes_written'], 2048)
+        self.assertAlmostEqual(meta['rows_per_second'], 10, delta=1)
+        self.assertAlmostEqual(meta['eta'], 20, delta=2)
+
+    @override_settings(EXPORT_TASK_PROGRESS_UPDATE_BATCH=2)
+    @patch('onadata.libs.utils.export_builder.current_task')
+    @patch('onadata.libs.utils.export_builder.get_files_size',
+           return_value=2048)
+    def test_track_task_progress_files_size(self, mock_get_files_size,
+                                            mock_current_task):
+        """
+        Test the size of the export files is only read when the progress is
+        reported.
+        """
+        files = ['/tmp/export.csv']
+        for i in range(1, 6):
+            track_task_progress(i, 5, start_time=time.time(), files=files)
+        self.assertEqual(mock_get_files_size.call_count, 2)
+        mock_get_files_size.assert_called_with(files)
+        self.assertEqual(mock_current_task.update_state.call_count, 2)
+        meta = mock_current_task.update_state.call_args[1]['meta']
+        self.assertEqual(meta['progress'], 4)
+        self.assertEqual(meta['bytes_written'], 2048)
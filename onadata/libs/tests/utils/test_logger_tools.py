@@ -1,7 +1,9 @@
 import re
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
 from django.conf import settings
+from django.test.utils import override_settings
 from mock import patch
 
 from pyxform.tests_v1.pyxform_test_case import PyxformTestCase
@@ -446,3 +448,62 @@ class TestLoggerTools(PyxformTestCase, TestBase):
         record = get_first_record(Instance.objects.all().only('id'))
         self.assertIsNotNone(record)
         self.assertEqual(record.id, instance.id)
+
+    @override_settings(ATTACHMENT_UPLOAD_CONCURRENCY=2)
+    def test_bulk_attachments(self):
+        """
+        Test the media files of a submission are uploaded concurrently and
+        saved in one query.
+        """
+        md = """
+        | survey |              |        |        |
+        |        | type         | name   | label  |
+        |        | begin repeat | images | Photos |
+        |        | image        | image1 | Photo  |
+        |        | end repeat   |        |        |
+        """
+        self._create_user_and_login()
+        self.xform = self._publish_markdown(md, self.user)
+
+        xml_string = """
+        <data id="{}">
+            <meta>
+                <instanceID>uuid:UJ5jz4EszdgH8uhy8nss1AsKaqBPO5VN8</instanceID>
+            </meta>
+            <images>
+                <image1>1300221157303.jpg</image1>
+            </images>
+            <images>
+                <image1>1300375832136.jpg</image1>
+            </images>
+        </data>
+        """.format(self.xform.id_string)
+        file_path = "{}/apps/logger/tests/Health_2011_03_13."\
+                    "xml_2011-03-15_20-30-28/1300221157303"\
+                    ".jpg".format(settings.PROJECT_ROOT)
+        file2_path = "{}/apps/logger/tests/Water_2011_03_17_2011-03-17_16-29"\
+                     "-59/1300375832136.jpg".format(settings.PROJECT_ROOT)
+        media_files = [
+            django_file(path=path, field_name="image1",
+                        content_type="image/jpeg")
+            for path in (file_path, file2_path)]
+        with patch('onadata.libs.utils.logger_tools.ThreadPoolExecutor',
+                   wraps=ThreadPoolExecutor) as executor_mock:
+            instance = create_instance(
+                self.user.username,
+                BytesIO(xml_string.strip().encode('utf-8')),
+                media_files=media_files)
+        executor_mock.assert_called_once_with(max_workers=2)
+        self.assertTrue(instance.json[MEDIA_ALL_RECEIVED])
+        self.assertEquals(instance.json[MEDIA_COUNT], 2)
+        attachments = instance.attachments.order_by('name')
+        self.assertEqual(
+            [a.name for a in attachments],
+            ['1300221157303.jpg', '1300375832136.jpg'])
+        for attachment in attachments:
+            self.assertTrue(
+                attachment.media_file.storage.exists(
+                    attachment.media_file.name))
+            self.assertEqual(attachment.file_size,
+                             attachment.media_file.size)
+            self.assertEqual(attachment.mimetype, 'image/jpeg')
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Tests onadata.libs.utils.media_tools module
+"""
+from django.core.files.base import ContentFile
+from django.core.files.storage import get_storage_class
+from django.test import RequestFactory, TestCase
+from django.test.utils import override_settings
+
+from onadata.libs.utils.media_tools import (get_media_file_response,
+                                            parse_range_header)
+
+
+class TestMediaTools(TestCase):
+    """
+    Tests for onadata.libs.utils.media_tools module
+    """
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.storage = get_storage_class()()
+        self.file_name = self.storage.save(
+            'media_tools_test.txt', ContentFile(b'0123456789'))
+
+    def tearDown(self):
+        self.storage.delete(self.file_name)
+
+    def test_parse_range_header(self):
+        """
+        Test parse_range_header returns the first and last byte positions
+        """
+        self.assertEqual(parse_range_header('bytes=0-4', 10), (0, 4))
+        self.assertEqual(parse_range_header('bytes=5-', 10), (5, 9))
+        self.assertEqual(parse_range_header('bytes=5-100', 10), (5, 9))
+        self.assertEqual(parse_range_header('bytes=-3', 10), (7, 9))
+        self.assertEqual(parse_range_header('bytes=-30', 10), (0, 9))
+        self.assertIsNone(parse_range_header(None, 10))
+        self.assertIsNone(parse_range_header('bytes=0-1,3-4', 10))
+        self.assertIsNone(parse_range_header('bytes=5-2', 10))
+        with self.assertRaises(ValueError):
+            parse_range_header('bytes=10-', 10)
+        with self.assertRaises(ValueError):
+            parse_range_header('bytes=-0', 10)
+
+    def test_get_media_file_response(self):
+        """
+        Test media files are streamed with Range and If-Range support
+        """
+        request = self.factory.get('/')
+        response = get_media_file_response(
+            request, self.file_name, 'text/plain')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        etag = response['ETag']
+
+        request = self.factory.get('/', HTTP_RANGE='bytes=2-4',
+                                   HTTP_IF_RANGE=etag)
+        response = get_media_file_response(
+            request, self.file_name, 'text/plain')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-4/10')
+        self.assertEqual(response['Content-Length'], '3')
+        self.assertEqual(b''.join(response.streaming_content), b'234')
+
+        # the whole file is sent if it changed
+        request = self.factory.get('/', HTTP_RANGE='bytes=2-4',
+                                   HTTP_IF_RANGE='"changed"')
+        response = get_media_file_response(
+            request, self.file_name, 'text/plain')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(MEDIA_X_ACCEL_REDIRECT_PREFIX='/protected/')
+    def test_x_accel_redirect(self):
+        """
+        Test local media files are offloaded to nginx
+        """
+        response = get_media_file_response(
+            self.factory.get('/'), self.file_name, 'text/plain')
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected/' + self.file_name)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Tests onadata.libs.utils.permission_cache module
+"""
+from django.core.cache import cache
+from django.test.utils import override_settings
+from guardian.shortcuts import assign_perm
+
+from onadata.apps.main.tests.test_base import TestBase
+from onadata.libs.permissions import CAN_VIEW_XFORM, ReadOnlyRole
+from onadata.libs.utils.permission_cache import (permission_cache,
+                                                 prefetch_perms)
+
+
+class TestPermissionCache(TestBase):
+    """
+    Tests for onadata.libs.utils.permission_cache module
+    """
+
+    def setUp(self):
+        super(TestPermissionCache, self).setUp()
+        self._publish_transportation_form()
+        self.alice = self._create_user('alice', 'alice')
+
+    def test_permission_cache_scope(self):
+        """
+        Test permissions are fetched once per object within a scope
+        """
+        ReadOnlyRole.add(self.alice, self.xform)
+        with permission_cache():
+            self.assertTrue(self.alice.has_perm(CAN_VIEW_XFORM, self.xform))
+            with self.assertNumQueries(0):
+                self.assertTrue(
+                    ReadOnlyRole.user_has_role(self.alice, self.xform))
+                self.assertTrue(
+                    self.alice.has_perm('logger.view_xform', self.xform))
+
+    def test_permission_cache_invalidation(self):
+        """
+        Test changing permissions invalidates the permission cache
+        """
+        user_has_role = ReadOnlyRole.user_has_role
+        with permission_cache():
+            self.assertFalse(user_has_role(self.alice, self.xform))
+            ReadOnlyRole.add(self.alice, self.xform)
+            self.assertTrue(user_has_role(self.alice, self.xform))
+            ReadOnlyRole.remove_obj_permissions(self.alice, self.xform)
+            self.assertFalse(user_has_role(self.alice, self.xform))
+            assign_perm(CAN_VIEW_XFORM, self.alice, self.xform)
+            self.assertTrue(self.alice.has_perm(CAN_VIEW_XFORM, self.xform))
+
+    def test_prefetch_perms(self):
+        """
+        Test prefetch_perms fetches the permissions of all objects at once
+        """
+        ReadOnlyRole.add(self.alice, self.xform)
+        with permission_cache():
+            prefetch_perms(self.alice, [self.xform])
+            with self.assertNumQueries(0):
+                self.assertTrue(
+                    self.alice.has_perm(CAN_VIEW_XFORM, self.xform))
+
+    @override_settings(PERMISSIONS_CACHE_TTL=300)
+    def test_shared_permission_cache(self):
+        """
+        Test permissions are shared between scopes with PERMISSIONS_CACHE_TTL
+        """
+        cache.clear()
+        ReadOnlyRole.add(self.alice, self.xform)
+        with permission_cache():
+            self.assertTrue(self.alice.has_perm(CAN_VIEW_XFORM, self.xform))
+        with permission_cache():
+            with self.assertNumQueries(0):
+                self.assertTrue(
+                    self.alice.has_perm(CAN_VIEW_XFORM, self.xform))
+
+        ReadOnlyRole.remove_obj_permissions(self.alice, self.xform)
+        with permission_cache():
+            self.assertFalse(self.alice.has_perm(CAN_VIEW_XFORM, self.xform))
+
+    @override_settings(PERMISSIONS_CACHE_TTL=300)
+    def test_shared_permission_cache_user_status(self):
+        """
+        Test the shared permissions follow the superuser and active status
+        of the user
+        """
+        cache.clear()
+        self.alice.is_superuser = True
+        self.alice.save()
+        with permission_cache():
+            self.assertIn(
+                'view_xform', self.alice.get_all_permissions(self.xform))
+
+        self.alice.is_superuser = False
+        self.alice.save()
+        with permission_cache():
+            self.assertNotIn(
+                'view_xform', self.alice.get_all_permissions(self.xform))
+
+        ReadOnlyRole.add(self.alice, self.xform)
+        with permission_cache():
+            self.assertIn(
+                'view_xform', self.alice.get_all_permissions(self.xform))
+
+        self.alice.is_active = False
+        self.alice.save()
+        with permission_cache():
+            self.assertEqual(self.alice.get_all_permissions(self.xform),
+                             set())
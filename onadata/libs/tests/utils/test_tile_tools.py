@@ -0,0 +1,26 @@
+from django.test import TestCase
+
+from onadata.libs.utils.tile_tools import (WEB_MERCATOR_EXTENT,
+                                           get_tile_bounds)
+
+
+class TestTileTools(TestCase):
+
+    def test_get_tile_bounds(self):
+        self.assertEqual(
+            get_tile_bounds(0, 0, 0),
+            (-WEB_MERCATOR_EXTENT, -WEB_MERCATOR_EXTENT,
+             WEB_MERCATOR_EXTENT, WEB_MERCATOR_EXTENT))
+        self.assertEqual(
+            get_tile_bounds(1, 1, 0),
+            (0, 0, WEB_MERCATOR_EXTENT, WEB_MERCATOR_EXTENT))
+        self.assertEqual(
+            get_tile_bounds('1', '0', '1'),
+            (-WEB_MERCATOR_EXTENT, -WEB_MERCATOR_EXTENT, 0, 0))
+
+        with self.assertRaises(ValueError):
+            get_tile_bounds(1, 2, 0)
+        with self.assertRaises(ValueError):
+            get_tile_bounds(-1, 0, 0)
+        with self.assertRaises(ValueError):
+            get_tile_bounds(25, 0, 0)
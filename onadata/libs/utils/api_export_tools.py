@@ -62,6 +62,7 @@ EXPORT_EXT = {
     'csv': Export.CSV_EXPORT,
     'csvzip': Export.CSV_ZIP_EXPORT,
     'savzip': Export.SAV_ZIP_EXPORT,
+    'parquet': Export.PARQUET_EXPORT,
     'uuid': Export.EXTERNAL_EXPORT,
     'kml': Export.KML_EXPORT,
     'zip': Export.ZIP_EXPORT,
@@ -349,7 +350,8 @@ def _get_extension_from_export_type(export_type):
 
     if export_type == Export.XLS_EXPORT:
         extension = 'xlsx'
-    elif export_type in [Export.CSV_ZIP_EXPORT, Export.SAV_ZIP_EXPORT]:
+    elif export_type in [Export.CSV_ZIP_EXPORT, Export.SAV_ZIP_EXPORT,
+                         Export.PARQUET_EXPORT]:
         extension = 'zip'
 
     return extension
@@ -480,6 +482,8 @@ def export_async_export_response(request, export):
             export_url = export.export_url
         resp = async_status(SUCCESSFUL)
         resp['export_url'] = export_url
+        if export.metrics:
+            resp['metrics'] = export.metrics
     elif export.status == Export.PENDING:
         resp = async_status(PENDING)
     else:
@@ -503,7 +507,9 @@ def get_async_response(job_uuid, request, xform, count=0):
         else:
             resp = async_status(celery_state_to_status(job.state))
 
-            # append task result to the response
+            # append task result to the response, exports in progress report
+            # progress, total, rows_per_second, eta, section and
+            # bytes_written
             if job.result:
                 result = job.result
                 if isinstance(result, dict):
@@ -1,17 +1,17 @@
-import codecs
-from datetime import datetime
-import errno
 import os
-import shutil
+import posixpath
 import sys
-import tempfile
 import zipfile
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
+
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.db import transaction
 
 from onadata.apps.logger.import_tools import django_file
 from onadata.apps.logger.models import Instance
 from onadata.libs.utils.logger_tools import create_instance
-from onadata.libs.utils.model_tools import queryset_iterator
 
 
 DATE_FORMAT = "%Y-%m-%d-%H-%M-%S"
@@ -31,98 +31,82 @@ def _date_created_from_filename(filename):
         parts_dict, DATE_FORMAT)
 
 
-def create_zip_backup(zip_output_file, user, xform=None):
-    # create a temp dir that we'll create our structure within and zip it
-    # when we are done
-    tmp_dir_path = tempfile.mkdtemp()
+def _get_archive_name(date_created, names):
+    """
+    Returns the unique archive name of a submission in the form
+    instances/YYYY/MM/DD/YYYY-MM-DD-HH-MM-SS[-i].xml
+    """
+    date_time_str = date_created.strftime(DATE_FORMAT)
+    path = posixpath.join("instances", *date_time_str.split("-")[:3])
+    name = posixpath.join(path, date_time_str + ".xml")
+    file_index = 1
+    while name in names:
+        name = posixpath.join(path, "%s-%d.xml" % (date_time_str, file_index))
+        file_index += 1
+    names.add(name)
+
+    return name
+
 
-    instances_path = os.path.join(tmp_dir_path, "instances")
+def _iter_instance_chunks(queryset, chunk_size):
+    """
+    Yields the (pk, date_created, xml) of the submissions in chunks of
+    chunk_size in id order.
+    """
+    last_pk = 0
+    while True:
+        chunk = list(
+            queryset.filter(pk__gt=last_pk).order_by("pk").values_list(
+                "pk", "date_created", "xml")[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1][0]
+        yield chunk
+
+
+def _write_zip_entries(zf, entries):
+    for name, xml in entries:
+        zf.writestr(name, xml)
 
-    # get the xls file from storage
 
-    # for each submission in the database - create an xml file in this
-    # form
-    # /<id_string>/YYYY/MM/DD/YYYY-MM-DD-HH-MM-SS.xml
+def create_zip_backup(zip_output_file, user, xform=None, chunk_size=100):
+    """
+    Writes the xml of the submissions to the forms of user, or only to xform,
+    to a zip archive in the form
+    instances/YYYY/MM/DD/YYYY-MM-DD-HH-MM-SS[-i].xml
+
+    The submissions are read in chunks of chunk_size, a chunk is compressed
+    into the archive while the next one is fetched from the database.
+    """
     qs = Instance.objects.filter(xform__user=user)
     if xform:
         qs = qs.filter(xform=xform)
 
     num_instances = qs.count()
     done = 0
-    sys.stdout.write("Creating XML Instances\n")
-    for instance in queryset_iterator(qs, 100):
-        # get submission time
-        date_time_str = instance.date_created.strftime(DATE_FORMAT)
-        date_parts = date_time_str.split("-")
-        sub_dirs = os.path.join(*date_parts[:3])
-        # create the directories
-        full_path = os.path.join(instances_path, sub_dirs)
-        if not os.path.exists(full_path):
-            try:
-                os.makedirs(full_path)
-            except OSError as e:
-                if e.errno != errno.EEXIST:
-                    raise
-
-        full_xml_path = os.path.join(full_path, date_time_str + ".xml")
-        # check for duplicate file names
-        file_index = 1
-        while os.path.exists(full_xml_path):
-            full_xml_path = os.path.join(
-                full_path, "%s-%d.xml" % (date_time_str, file_index))
-            file_index += 1
-        # create the instance xml
-        with codecs.open(full_xml_path, "wb", "utf-8") as f:
-            f.write(instance.xml)
-        done += 1
-        sys.stdout.write("\r%.2f %% done" % (
-            float(done)/float(num_instances) * 100))
-        sys.stdout.flush()
-        sleep(0)
-
-    # write zip file
-    sys.stdout.write("\nWriting to ZIP arhive.\n")
-    zf = zipfile.ZipFile(zip_output_file, "w", zipfile.ZIP_DEFLATED,
-                         allowZip64=True)
-    done = 0
-    for dir_path, dir_names, file_names in os.walk(tmp_dir_path):
-        for file_name in file_names:
-            archive_path = dir_path.replace(tmp_dir_path + os.path.sep,
-                                            "", 1)
-            zf.write(os.path.join(dir_path, file_name),
-                     os.path.join(archive_path, file_name))
-            done += 1
+    names = set()
+    pending = None
+    sys.stdout.write("Writing XML Instances to ZIP archive\n")
+    with zipfile.ZipFile(zip_output_file, "w", zipfile.ZIP_DEFLATED,
+                         allowZip64=True) as zf, \
+            ThreadPoolExecutor(max_workers=1) as executor:
+        for chunk in _iter_instance_chunks(qs, chunk_size):
+            entries = [(_get_archive_name(date_created, names), xml)
+                       for _pk, date_created, xml in chunk]
+            if pending is not None:
+                pending.result()
+            pending = executor.submit(_write_zip_entries, zf, entries)
+            done += len(entries)
             sys.stdout.write("\r%.2f %% done" % (
-                float(done)/float(num_instances) * 100))
+                float(done)/float(max(num_instances, done)) * 100))
             sys.stdout.flush()
-            sleep(0)
-    zf.close()
-    # removed dir tree
-    shutil.rmtree(tmp_dir_path)
+        if pending is not None:
+            pending.result()
     sys.stdout.write("\nBackup saved to %s\n" % zip_output_file)
 
 
-def restore_backup_from_zip(zip_file_path, username):
-    try:
-        temp_directory = tempfile.mkdtemp()
-        zf = zipfile.ZipFile(zip_file_path)
-
-        zf.extractall(temp_directory)
-    except zipfile.BadZipfile:
-        sys.stderr.write("Bad zip arhcive.")
-    else:
-        return restore_backup_from_path(temp_directory, username, "backup")
-    finally:
-        shutil.rmtree(temp_directory)
-
-
-def restore_backup_from_xml_file(xml_instance_path, username):
-    # check if its a valid xml instance
-    file_name = os.path.basename(xml_instance_path)
-    xml_file = django_file(
-        xml_instance_path,
-        field_name="xml_file",
-        content_type="text/xml")
+def _restore_xml_file(xml_file, username):
+    file_name = os.path.basename(xml_file.name)
     media_files = []
     try:
         date_created = _date_created_from_filename(file_name)
@@ -132,11 +116,12 @@ def restore_backup_from_xml_file(xml_instance_path, username):
             file_name)
         date_created = datetime.now()
 
-    sys.stdout.write("Creating instance from '%s'\n" % file_name)
     try:
-        create_instance(
-            username, xml_file, media_files,
-            date_created_override=date_created)
+        # a failed submission only rolls back its own transaction
+        with transaction.atomic():
+            create_instance(
+                username, xml_file, media_files,
+                date_created_override=date_created)
         return 1
     except Exception as e:
         sys.stderr.write(
@@ -145,6 +130,53 @@ def restore_backup_from_xml_file(xml_instance_path, username):
         return 0
 
 
+def restore_backup_from_zip(zip_file_path, username, batch_size=100):
+    """
+    Restores the xml submissions of a zip backup straight from the archive,
+    progress is reported every batch_size submissions. Each submission is
+    committed on its own so the post-submission tasks it queues find it.
+    """
+    num_instances = 0
+    num_restored = 0
+    try:
+        zf = zipfile.ZipFile(zip_file_path)
+    except zipfile.BadZipfile:
+        sys.stderr.write("Bad zip arhcive.")
+        return num_instances, num_restored
+
+    with zf:
+        members = [info for info in zf.infolist()
+                   if not info.filename.endswith("/")]
+        for i in range(0, len(members), batch_size):
+            batch = members[i:i + batch_size]
+            for info in batch:
+                xml_file = InMemoryUploadedFile(
+                    file=BytesIO(zf.read(info)),
+                    field_name="xml_file",
+                    name=posixpath.basename(info.filename),
+                    content_type="text/xml",
+                    size=info.file_size,
+                    charset=None)
+                num_restored += _restore_xml_file(xml_file, username)
+            num_instances += len(batch)
+            sys.stdout.write("Restored %d of %d submissions\n" % (
+                num_restored, num_instances))
+
+    return num_instances, num_restored
+
+
+def restore_backup_from_xml_file(xml_instance_path, username):
+    # check if its a valid xml instance
+    file_name = os.path.basename(xml_instance_path)
+    xml_file = django_file(
+        xml_instance_path,
+        field_name="xml_file",
+        content_type="text/xml")
+
+    sys.stdout.write("Creating instance from '%s'\n" % file_name)
+    return _restore_xml_file(xml_file, username)
+
+
 def restore_backup_from_path(dir_path, username, status):
     """
     Only restores xml submissions, media files are assumed to still be in
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel batch runner for management commands.
+
+Processes the objects of a queryset, or of any source that can be read after
+a key, in batches with a pool of worker threads. The key of the last object
+of every finished batch is written to a checkpoint file so that an
+interrupted run resumes after it, the keys of the objects that failed are
+appended to a file next to it so that they can be retried.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.db import connection
+from django.utils.translation import ugettext as _
+from django.utils.translation import ugettext_lazy
+
+
+def add_batch_arguments(parser):
+    """
+    Adds the BatchRunner options to the parser of a management command.
+    """
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help=ugettext_lazy("number of objects processed at the same time."))
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=100,
+        dest='batch_size',
+        help=ugettext_lazy("number of objects read at a time."))
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=0,
+        help=ugettext_lazy("maximum number of objects processed per second."))
+    parser.add_argument(
+        '--checkpoint',
+        help=ugettext_lazy("file recording the last processed object, an "
+                           "interrupted run resumes after it. The keys of "
+                           "the objects that failed are appended to the "
+                           "file with the .failed extension."))
+
+
+def queryset_batches(queryset, batch_size, after=None):
+    """
+    Yields the objects of the queryset in batches of batch_size in id order,
+    starting after the id after.
+    """
+    last_pk = after
+    while True:
+        batch_qs = queryset if last_pk is None else \
+            queryset.filter(pk__gt=last_pk)
+        batch = list(batch_qs.order_by('pk')[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        yield batch
+
+
+def iterable_batches(iterable, batch_size):
+    """
+    Yields the items of iterable in lists of batch_size.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            break
+        yield batch
+
+
+class RateLimiter(object):
+    """
+    Spaces out calls to wait() so that at most rate calls a second return,
+    a rate of 0 does not limit.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_time = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(self.next_time, now) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class BatchRunner(object):
+    """
+    Calls a function with every object of a source, workers objects at a
+    time and at most rate objects a second, reporting the progress after
+    every batch.
+
+    Errors are counted and recorded in the failed keys file of the
+    checkpoint. They are reported to stderr and do not stop the run, without
+    a stderr they are raised.
+    """
+
+    def __init__(self, workers=1, batch_size=100, rate=0, checkpoint=None,
+                 stdout=None, stderr=None):
+        self.workers = max(workers, 1)
+        self.batch_size = batch_size
+        self.rate_limiter = RateLimiter(rate)
+        self.checkpoint = checkpoint
+        self.stdout = stdout
+        self.stderr = stderr
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+
+    @classmethod
+    def from_options(cls, options, stdout=None, stderr=None, suffix=None):
+        """
+        Returns a BatchRunner for the options added by add_batch_arguments,
+        suffix is appended to the checkpoint file name.
+        """
+        checkpoint = options.get('checkpoint')
+        if checkpoint and suffix:
+            checkpoint = u'{}.{}'.format(checkpoint, suffix)
+
+        return cls(
+            workers=options.get('workers') or 1,
+            batch_size=options.get('batch_size') or 100,
+            rate=options.get('rate') or 0,
+            checkpoint=checkpoint,
+            stdout=stdout,
+            stderr=stderr)
+
+    def read_checkpoint(self):
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            with open(self.checkpoint) as checkpoint_file:
+                return checkpoint_file.read().strip() or None
+
+        return None
+
+    def write_checkpoint(self, key):
+        if self.checkpoint:
+            tmp_path = self.checkpoint + '.tmp'
+            with open(tmp_path, 'w') as checkpoint_file:
+                checkpoint_file.write(str(key))
+            os.replace(tmp_path, self.checkpoint)
+
+    @property
+    def failed_keys_file(self):
+        return self.checkpoint + '.failed' if self.checkpoint else None
+
+    def write_failed_key(self, key):
+        if self.checkpoint:
+            with self.lock, open(self.failed_keys_file, 'a') as failed_file:
+                failed_file.write(u'{}\n'.format(key))
+
+    def run(self, queryset, func):
+        """
+        Calls func with every object of the queryset in id order, returns
+        the number of processed and failed objects.
+        """
+        return self.run_batches(
+            lambda after: queryset_batches(queryset, self.batch_size, after),
+            func, key=lambda obj: obj.pk)
+
+    def run_batches(self, get_batches, func, key):
+        """
+        Calls func with every object of the batches returned by
+        get_batches(after), after is the key of the last object processed by
+        a previous run or None. Returns the number of processed and failed
+        objects.
+        """
+        started = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=self.workers) \
+            if self.workers > 1 else None
+        try:
+            for batch in get_batches(self.read_checkpoint()):
+                if executor is None:
+                    self._process(func, batch, key)
+                else:
+                    # worker threads have their own database connection
+                    list(executor.map(
+                        self._process_in_thread,
+                        [func] * self.workers,
+                        [batch[i::self.workers] for i in range(self.workers)],
+                        [key] * self.workers))
+                self.write_checkpoint(key(batch[-1]))
+                self.report(started, key(batch[-1]))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return self.processed, self.failed
+
+    def _process(self, func, objects, key):
+        for obj in objects:
+            self.rate_limiter.wait()
+            try:
+                func(obj)
+            except Exception as e:  # pylint: disable=broad-except
+                with self.lock:
+                    self.failed += 1
+                self.write_failed_key(key(obj))
+                if self.stderr is None:
+                    raise
+                self.stderr.write(
+                    _(u'Error on %(key)s: %(error)s')
+                    % {'key': key(obj), 'error': e})
+            with self.lock:
+                self.processed += 1
+
+    def _process_in_thread(self, func, objects, key):
+        try:
+            self._process(func, objects, key)
+        finally:
+            connection.close()
+
+    def report(self, started, last_key):
+        if self.stdout:
+            elapsed = max(time.monotonic() - started, 0.001)
+            self.stdout.write(
+                _(u'Processed %(processed)d (%(failed)d failed, %(rate).1f '
+                  u'per second), last %(key)s')
+                % {'processed': self.processed, 'failed': self.failed,
+                   'rate': self.processed / elapsed, 'key': last_key})
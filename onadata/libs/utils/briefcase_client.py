@@ -1,6 +1,7 @@
 import logging
 import mimetypes
 import os
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 from xml.parsers.expat import ExpatError
 
@@ -10,9 +11,11 @@ from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.db import transaction
+from django.utils.encoding import force_bytes, force_text
 from django.utils.translation import ugettext as _
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPDigestAuth
 
 from onadata.apps.logger.xform_instance_parser import clean_and_parse_xml
@@ -21,6 +24,7 @@ from onadata.libs.utils.logger_tools import (PublishXForm, create_instance,
                                              publish_form)
 
 NUM_RETRIES = 3
+CURSOR_FILENAME = 'resumption_cursor.txt'
 
 
 def django_file(file_obj, field_name, content_type):
@@ -74,10 +78,27 @@ def _get_instances_uuids(xml_doc):
 
 
 class BriefcaseClient(object):
-    def __init__(self, url, username, password, user):
+    """
+    Pulls forms, form media, submissions and submission media from an ODK
+    Aggregate or Briefcase compatible server to storage and pushes them to
+    this server.
+
+    Requests share a keep-alive session, up to `workers` submissions and media
+    files are downloaded at a time. The submission list cursor of each form
+    is saved after every page so that a pull that stops partway resumes from
+    the last complete page.
+    """
+
+    def __init__(self, url, username, password, user, workers=1):
         self.url = url
         self.user = user
+        self.workers = max(1, workers)
         self.auth = HTTPDigestAuth(username, password)
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        adapter = HTTPAdapter(pool_maxsize=self.workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.form_list_url = urljoin(self.url, 'formList')
         self.submission_list_url = urljoin(self.url, 'view/submissionList')
         self.download_submission_url = urljoin(self.url,
@@ -87,10 +108,19 @@ class BriefcaseClient(object):
         self.resumption_cursor = 0
         self.logger = logging.getLogger('console_logger')
 
-    def download_manifest(self, manifest_url, id_string):
-        if self._get_response(manifest_url):
-            manifest_res = self._current_response
+    def _map(self, func, items):
+        """
+        Calls func on every item, on up to `workers` threads at a time.
+        """
+        if self.workers == 1:
+            return [func(item) for item in items]
 
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(func, items))
+
+    def download_manifest(self, manifest_url, id_string):
+        manifest_res = self._get_response(manifest_url)
+        if manifest_res.success:
             try:
                 manifest_doc = clean_and_parse_xml(manifest_res.content)
             except ExpatError:
@@ -104,14 +134,13 @@ class BriefcaseClient(object):
 
     def download_xforms(self, include_instances=False):
         # fetch formList
-        if not self._get_response(self.form_list_url):
-            response = self._current_response.content \
-                if self._current_response else "Unknown Error"
-            self.logger.error("Failed to download xforms %s." % response)
+        response = self._get_response(self.form_list_url)
+        if not response.success:
+            self.logger.error("Failed to download xforms %s." %
+                              response.content)
 
             return
 
-        response = self._current_response
         forms = _get_form_list(response.content)
 
         self.logger.debug('Successfull fetched %s.' % self.form_list_url)
@@ -121,17 +150,14 @@ class BriefcaseClient(object):
                 self.forms_path, id_string, '%s.xml' % id_string)
 
             if not default_storage.exists(form_path):
-                if not self._get_response(download_url):
+                form_res = self._get_response(download_url)
+                if not form_res.success:
                     self.logger.error("Failed to download xform %s."
                                       % download_url)
                     continue
 
-                form_res = self._current_response
                 content = ContentFile(form_res.content.strip())
                 default_storage.save(form_path, content)
-            else:
-                form_res = default_storage.open(form_path)
-                content = form_res.read()
 
             self.logger.debug("Fetched %s." % download_url)
 
@@ -145,29 +171,34 @@ class BriefcaseClient(object):
 
     @retry(NUM_RETRIES)
     def _get_response(self, url, params=None):
-        self._current_response = None
-        response = requests.get(url, auth=self.auth, params=params)
-        success = response.status_code == 200
-        self._current_response = response
+        """
+        Returns the response, with success set if the status code is 200.
+        """
+        response = self.session.get(url, params=params)
+        response.success = response.status_code == 200
 
-        return success
+        return response
 
     @retry(NUM_RETRIES)
     def _get_media_response(self, url):
-        self._current_response = None
-        head_response = requests.head(url, auth=self.auth)
-
-        # S3 redirects, avoid using formhub digest on S3
-        if head_response.status_code == 302:
-            url = head_response.headers.get('location')
-
-        response = requests.get(url)
-        success = response.status_code == 200
-        self._current_response = response
-
-        return success
-
-    def download_media_files(self, xml_doc, media_path):
+        # S3 redirects are followed without the digest auth header
+        response = self.session.get(url)
+        response.success = response.status_code == 200
+
+        return response
+
+    def _download_media_file(self, media):
+        filename, download_url, path = media
+        download_res = self._get_media_response(download_url)
+        if download_res.success:
+            media_content = ContentFile(download_res.content)
+            default_storage.save(path, media_content)
+            self.logger.debug("Fetched %s." % filename)
+        else:
+            self.logger.error("Failed to fetch %s." % filename)
+
+    def download_media_files(self, xml_doc, media_path, parallel=True):
+        media_files = []
         for media_node in xml_doc.getElementsByTagName('mediaFile'):
             filename_node = media_node.getElementsByTagName('filename')
             url_node = media_node.getElementsByTagName('downloadUrl')
@@ -177,72 +208,130 @@ class BriefcaseClient(object):
                 if default_storage.exists(path):
                     continue
                 download_url = url_node[0].childNodes[0].nodeValue
-                if self._get_media_response(download_url):
-                    download_res = self._current_response
-                    media_content = ContentFile(download_res.content)
-                    default_storage.save(path, media_content)
-                    self.logger.debug("Fetched %s." % filename)
-                else:
-                    self.logger.error("Failed to fetch %s." % filename)
-
-    def download_instances(self, form_id, cursor=0, num_entries=100):
-        self.logger.debug("Starting submissions download for %s" % form_id)
-        if not self._get_response(self.submission_list_url,
-                                  params={'formId': form_id,
-                                          'numEntries': num_entries,
-                                          'cursor': cursor}):
-            self.logger.error("Fetching %s formId: %s, cursor: %s" %
-                              (self.submission_list_url, form_id, cursor))
-            return
+                media_files.append((filename, download_url, path))
+
+        if parallel:
+            self._map(self._download_media_file, media_files)
+        else:
+            for media in media_files:
+                self._download_media_file(media)
+
+    def _get_cursor_path(self, form_id):
+        return os.path.join(self.forms_path, form_id, CURSOR_FILENAME)
+
+    def get_resumption_cursor(self, form_id):
+        """
+        Returns the saved submission list cursor of a form.
+        """
+        cursor_path = self._get_cursor_path(form_id)
+        if default_storage.exists(cursor_path):
+            with default_storage.open(cursor_path) as cursor_file:
+                return force_text(cursor_file.read()).strip() or 0
+
+        return 0
+
+    def save_resumption_cursor(self, form_id, cursor):
+        """
+        Saves the submission list cursor of a form.
+        """
+        cursor_path = self._get_cursor_path(form_id)
+        if default_storage.exists(cursor_path):
+            default_storage.delete(cursor_path)
+        default_storage.save(cursor_path, ContentFile(force_bytes(cursor)))
+
+    def _download_instance(self, form_id, uuid):
+        self.logger.debug("Fetching %s %s submission" % (uuid, form_id))
+        path = os.path.join(self.forms_path, form_id, 'instances')
+        form_str = u'%(formId)s[@version=null and @uiVersion=null]/'\
+            u'%(formId)s[@key=%(instanceId)s]' % {
+                'formId': form_id,
+                'instanceId': uuid
+            }
+        instance_path = os.path.join(path, uuid.replace(':', ''),
+                                     'submission.xml')
+        if not default_storage.exists(instance_path):
+            instance_res = self._get_response(self.download_submission_url,
+                                              params={'formId': form_str})
+            if not instance_res.success:
+                return False
+            content = instance_res.content.strip()
+            default_storage.save(instance_path, ContentFile(content))
+        else:
+            instance_res = default_storage.open(instance_path)
+            content = instance_res.read()
 
-        response = self._current_response
-        self.logger.debug("Fetching %s formId: %s, cursor: %s" %
-                          (self.submission_list_url, form_id, cursor))
         try:
-            xml_doc = clean_and_parse_xml(response.content)
+            instance_doc = clean_and_parse_xml(content)
         except ExpatError:
-            return
+            return False
 
-        instances = _get_instances_uuids(xml_doc)
-        path = os.path.join(self.forms_path, form_id, 'instances')
+        media_path = os.path.join(path, uuid.replace(':', ''))
+        self.download_media_files(instance_doc, media_path, parallel=False)
+        self.logger.debug("Fetched %s %s submission" % (form_id, uuid))
 
-        for uuid in instances:
-            self.logger.debug("Fetching %s %s submission" % (uuid, form_id))
-            form_str = u'%(formId)s[@version=null and @uiVersion=null]/'\
-                u'%(formId)s[@key=%(instanceId)s]' % {
-                    'formId': form_id,
-                    'instanceId': uuid
-                }
-            instance_path = os.path.join(path, uuid.replace(':', ''),
-                                         'submission.xml')
-            if not default_storage.exists(instance_path):
-                if self._get_response(self.download_submission_url,
-                                      params={'formId': form_str}):
-                    instance_res = self._current_response
-                    content = instance_res.content.strip()
-                    default_storage.save(instance_path, ContentFile(content))
-                else:
-                    continue
-            else:
-                instance_res = default_storage.open(instance_path)
-                content = instance_res.read()
+        return True
+
+    def _try_download_instance(self, form_id, uuid):
+        try:
+            return self._download_instance(form_id, uuid)
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception(
+                "Failed to fetch %s %s submission" % (form_id, uuid))
+
+            return False
+
+    def download_instances(self, form_id, cursor=None, num_entries=100):
+        """
+        Downloads the submissions of a form page by page, starting from the
+        saved cursor of the form unless a cursor is given. The cursor is not
+        saved past a page with submissions that failed to download.
+        """
+        self.logger.debug("Starting submissions download for %s" % form_id)
+        if cursor is None:
+            cursor = self.get_resumption_cursor(form_id)
+        complete = True
+
+        while True:
+            response = self._get_response(self.submission_list_url,
+                                          params={'formId': form_id,
+                                                  'numEntries': num_entries,
+                                                  'cursor': cursor})
+            if not response.success:
+                self.logger.error("Fetching %s formId: %s, cursor: %s" %
+                                  (self.submission_list_url, form_id, cursor))
+                return
 
+            self.logger.debug("Fetching %s formId: %s, cursor: %s" %
+                              (self.submission_list_url, form_id, cursor))
             try:
-                instance_doc = clean_and_parse_xml(content)
+                xml_doc = clean_and_parse_xml(response.content)
             except ExpatError:
-                continue
+                return
 
-            media_path = os.path.join(path, uuid.replace(':', ''))
-            self.download_media_files(instance_doc, media_path)
-            self.logger.debug("Fetched %s %s submission" % (form_id, uuid))
+            instances = _get_instances_uuids(xml_doc)
+            downloaded = self._map(
+                lambda uuid: self._try_download_instance(form_id, uuid),
+                instances)
+            failed = [uuid for uuid, success in zip(instances, downloaded)
+                      if not success]
+            if failed:
+                self.logger.error("Failed to fetch %s submissions: %s" %
+                                  (form_id, ', '.join(failed)))
+                # a resumed pull retries from the page of the failures
+                complete = False
+
+            if not xml_doc.getElementsByTagName('resumptionCursor'):
+                return
 
-        if xml_doc.getElementsByTagName('resumptionCursor'):
             rs_node = xml_doc.getElementsByTagName('resumptionCursor')[0]
-            cursor = rs_node.childNodes[0].nodeValue
+            next_cursor = rs_node.childNodes[0].nodeValue
+            if str(cursor) == next_cursor:
+                return
 
-            if self.resumption_cursor != cursor:
-                self.resumption_cursor = cursor
-                self.download_instances(form_id, cursor)
+            if complete:
+                # the pages are complete, a pull that stops resumes from here
+                self.save_resumption_cursor(form_id, next_cursor)
+            self.resumption_cursor = cursor = next_cursor
 
     @transaction.atomic
     def _upload_xform(self, path, file_name):
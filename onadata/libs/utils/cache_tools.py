@@ -1,6 +1,13 @@
 import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
 
+from django.conf import settings
 from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
 from django.utils.encoding import force_bytes
 
 # Cache names used in project serializer
@@ -28,16 +35,259 @@ PROJ_TEAM_USERS_CACHE = "ps-project-team-users"
 XFORM_LINKED_DATAVIEWS = "xfs-linked_dataviews"
 PROJECT_LINKED_DATAVIEWS = "ps-project-linked_dataviews"
 
+# Cache names used in xform list viewset
+FORMLIST_CACHE = "xfl-formlist-"
+MANIFEST_CACHE = "xfl-manifest-"
+
+# Cache names used in export tools
+EXPORT_SINGLE_FLIGHT = "export-single_flight-"
+
+# Cache names used in rest services
+RESTSERVICE_CONCURRENCY = "restservice-concurrency-"
+RESTSERVICE_BATCH = "restservice-batch-"
+RESTSERVICE_BATCH_LOCK = "restservice-batch_lock-"
+
+# Cache names used in the messaging coalescer
+MESSAGE_BATCH = "messaging-batch-"
+
+# Cache names used in permission cache
+PERMISSIONS_CACHE = "perms-object_permissions-"
+PERMISSIONS_CACHE_VERSION = "perms-version"
+
+# Cache names used in presigned uploads
+PRESIGNED_UPLOAD_USED = "presigned_upload-used-"
+
+# Cache names used in data viewset
+VECTOR_TILE_CACHE = "data-vector_tile-"
+
 # cache login attempts
 LOCKOUT_USER = "lockout_user-"
 LOGIN_ATTEMPTS = "login_attempts-"
 LOCKOUT_CHANGE_PASSWORD_USER = 'lockout_change_password_user-'
 CHANGE_PASSWORD_ATTEMPTS = 'change_password_attempts-'
 
+# Cache namespaces, bumping the version of a namespace e.g. of a project
+# invalidates all the keys of the namespace prefixes for the project
+NAMESPACE_VERSION = "ns-version-"
+PROJECT_NAMESPACE = "project"
+USER_NAMESPACE = "user"
+XFORM_NAMESPACE = "xform"
+# bumped for the users whose formList, or manifests, may have changed
+FORMLIST_NAMESPACE = "formlist"
+
+NAMESPACE_PREFIXES = {
+    PROJ_PERM_CACHE: PROJECT_NAMESPACE,
+    PROJ_NUM_DATASET_CACHE: PROJECT_NAMESPACE,
+    PROJ_SUB_DATE_CACHE: PROJECT_NAMESPACE,
+    PROJ_FORMS_CACHE: PROJECT_NAMESPACE,
+    PROJ_BASE_FORMS_CACHE: PROJECT_NAMESPACE,
+    PROJ_OWNER_CACHE: PROJECT_NAMESPACE,
+    PROJ_TEAM_USERS_CACHE: PROJECT_NAMESPACE,
+    PROJECT_LINKED_DATAVIEWS: PROJECT_NAMESPACE,
+    USER_PROFILE_PREFIX: USER_NAMESPACE,
+    XFORM_DATA_VERSIONS: XFORM_NAMESPACE,
+    XFORM_COUNT: XFORM_NAMESPACE,
+    DATAVIEW_COUNT: XFORM_NAMESPACE,
+    DATAVIEW_LAST_SUBMISSION_TIME: XFORM_NAMESPACE,
+    XFORM_LINKED_DATAVIEWS: XFORM_NAMESPACE,
+}
+
+CACHE_METRICS = defaultdict(lambda: {'local_hits': 0, 'hits': 0, 'misses': 0})
+CACHE_METRICS_LOCK = threading.Lock()
+
+
+class LocalCache(object):
+    """
+    In-process LRU cache of up to max_size values that expire ttl seconds
+    after they are set. Values are stored pickled so that callers never
+    share, and mutate, the same object.
+    """
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        """
+        Returns the value of key, None if it is missing or expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+
+        return pickle.loads(value)
+
+    def set(self, key, value):
+        """
+        Sets the value of key, evicting the least recently used values.
+        """
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (value, time.time() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Deletes key.
+        """
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """
+        Deletes all the keys.
+        """
+        with self.lock:
+            self.entries.clear()
+
+
+LOCAL_CACHE = None
+LOCAL_CACHE_LOCK = threading.Lock()
+LOCAL_CACHE_PID = None
+
+
+def get_local_cache():
+    """
+    Returns the LocalCache of this process, None when LOCAL_CACHE_TTL is not
+    set.
+    """
+    global LOCAL_CACHE, LOCAL_CACHE_PID  # pylint: disable=global-statement
+
+    ttl = getattr(settings, 'LOCAL_CACHE_TTL', 0)
+    if not ttl:
+        return None
+
+    max_size = getattr(settings, 'LOCAL_CACHE_MAX_SIZE', 1000)
+    with LOCAL_CACHE_LOCK:
+        if LOCAL_CACHE is None or LOCAL_CACHE_PID != os.getpid() or \
+                (LOCAL_CACHE.ttl, LOCAL_CACHE.max_size) != (ttl, max_size):
+            LOCAL_CACHE = LocalCache(ttl, max_size)
+            LOCAL_CACHE_PID = os.getpid()
+
+    return LOCAL_CACHE
+
+
+def _get(key, local=False):
+    local_cache = get_local_cache() if local else None
+    if local_cache is not None:
+        value = local_cache.get(key)
+        if value is not None:
+            return value, 'local_hits'
+
+    value = cache.get(key)
+    if value is None:
+        return None, 'misses'
+    if local_cache is not None:
+        local_cache.set(key, value)
+
+    return value, 'hits'
+
+
+def _set(key, value, timeout=DEFAULT_TIMEOUT, local=False):
+    cache.set(key, value, timeout)
+    local_cache = get_local_cache() if local else None
+    if local_cache is not None:
+        local_cache.set(key, value)
+
 
 def safe_delete(key):
     """Safely deletes a given key from the cache."""
-    _ = cache.get(key) and cache.delete(key)
+    cache.delete(key)
+    local_cache = get_local_cache()
+    if local_cache is not None:
+        local_cache.delete(key)
+
+
+def _get_version_key(namespace, pk):
+    return '{}{}-{}'.format(NAMESPACE_VERSION, namespace, pk)
+
+
+def get_namespace_version(namespace, pk):
+    """
+    Returns the version of the namespace of the object with the given pk,
+    versions are always read from the shared cache.
+    """
+    version_key = _get_version_key(namespace, pk)
+    version = cache.get(version_key)
+    if version is None:
+        # start from the time so that a version that was evicted from the
+        # cache is not reused
+        cache.add(version_key, int(time.time() * 1000), None)
+        version = cache.get(version_key)
+
+    return version
+
+
+def bump_namespace(namespace, pk):
+    """
+    Invalidates all the cached keys of the namespace of the object with the
+    given pk.
+    """
+    version_key = _get_version_key(namespace, pk)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        # no version yet, nothing is cached for the namespace
+        pass
+
+
+def get_cache_key(prefix, pk):
+    """
+    Returns the cache key of the object with the given pk, the key includes
+    the version of the object namespace for namespaced prefixes.
+    """
+    namespace = NAMESPACE_PREFIXES.get(prefix)
+    if namespace is None:
+        return '{}{}'.format(prefix, pk)
+
+    return '{}{}-v{}'.format(
+        prefix, pk, get_namespace_version(namespace, pk))
+
+
+def cache_get(prefix, pk, default=None):
+    """
+    Returns the value cached for the object with the given pk, counting local
+    hits, hits and misses per prefix.
+
+    With LOCAL_CACHE_TTL set the values of namespaced prefixes are also kept
+    in the local cache of the process, their keys change when the namespace
+    is bumped. Other values are only read from the shared cache, they are
+    deleted rather than versioned.
+    """
+    value, tier = _get(
+        get_cache_key(prefix, pk), local=prefix in NAMESPACE_PREFIXES)
+    with CACHE_METRICS_LOCK:
+        CACHE_METRICS[prefix][tier] += 1
+
+    return default if value is None else value
+
+
+def cache_set(prefix, pk, value, timeout=DEFAULT_TIMEOUT):
+    """
+    Caches the value for the object with the given pk.
+    """
+    _set(get_cache_key(prefix, pk), value, timeout,
+         local=prefix in NAMESPACE_PREFIXES)
+
+
+def get_cache_metrics():
+    """
+    Returns the cache local hits, hits and misses of this process per
+    prefix.
+    """
+    with CACHE_METRICS_LOCK:
+        return {
+            prefix: dict(counts) for prefix, counts in CACHE_METRICS.items()}
 
 
 def safe_key(key):
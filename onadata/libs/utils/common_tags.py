@@ -145,6 +145,7 @@ EXPORT_MIMES = {
     'zip': 'zip',
     'csv_zip': 'zip',
     'sav_zip': 'zip',
+    'parquet': 'zip',
     'sav': 'sav',
     'kml': 'vnd.google-earth.kml+xml',
     OSM: OSM
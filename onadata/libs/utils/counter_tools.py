@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Set-based reconciliation of the denormalized submission counters.
+
+The num_of_submissions, last_submission_time and instances_with_geopoints
+counters of forms and the num_of_submissions of user profiles are updated
+incrementally as submissions are received and deleted. These functions
+recompute them with one GROUP BY per table and update the rows that drifted.
+Attachment counts depend on the XML of each submission, they are checked one
+submission at a time for the submissions missing media and only the counts
+that drifted are updated.
+"""
+from celery import task
+from django.db import connection, transaction
+from multidb.pinning import use_master
+
+from onadata.apps.logger.models import Instance
+from onadata.libs.utils.cache_tools import XFORM_NAMESPACE, bump_namespace
+from onadata.libs.utils.common_tags import (MEDIA_ALL_RECEIVED, MEDIA_COUNT,
+                                            TOTAL_MEDIA)
+from onadata.libs.utils.model_tools import queryset_iterator
+
+XFORM_COUNTERS_SQL = """
+WITH counts AS (
+    SELECT xform_id, COUNT(*) AS num_of_submissions,
+        MAX(date_created) AS last_submission_time,
+        BOOL_OR(geom IS NOT NULL) AS instances_with_geopoints
+    FROM logger_instance
+    WHERE deleted_at IS NULL
+    GROUP BY xform_id
+)
+UPDATE logger_xform SET
+    num_of_submissions = COALESCE(counts.num_of_submissions, 0),
+    last_submission_time = counts.last_submission_time,
+    instances_with_geopoints = COALESCE(
+        counts.instances_with_geopoints, FALSE)
+FROM logger_xform xform
+LEFT JOIN counts ON counts.xform_id = xform.id
+WHERE logger_xform.id = xform.id
+    AND NOT xform.is_merged_dataset
+    AND (xform.num_of_submissions <> COALESCE(counts.num_of_submissions, 0)
+        OR xform.last_submission_time IS DISTINCT FROM
+            counts.last_submission_time
+        OR xform.instances_with_geopoints <> COALESCE(
+            counts.instances_with_geopoints, FALSE))
+RETURNING logger_xform.id
+"""
+
+PROFILE_COUNTERS_SQL = """
+WITH counts AS (
+    SELECT user_id, SUM(num_of_submissions) AS num_of_submissions
+    FROM logger_xform
+    WHERE NOT is_merged_dataset
+    GROUP BY user_id
+)
+UPDATE main_userprofile SET
+    num_of_submissions = COALESCE(counts.num_of_submissions, 0)
+FROM main_userprofile profile
+LEFT JOIN counts ON counts.user_id = profile.user_id
+WHERE main_userprofile.id = profile.id
+    AND profile.num_of_submissions <> COALESCE(counts.num_of_submissions, 0)
+"""
+
+
+@use_master
+def reconcile_xform_counters():
+    """
+    Recomputes the submission counters of all forms, except merged datasets
+    that count the submissions of their forms, and returns the ids of the
+    forms whose counters were updated.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(XFORM_COUNTERS_SQL)
+        xform_ids = [row[0] for row in cursor.fetchall()]
+
+    for xform_id in xform_ids:
+        bump_namespace(XFORM_NAMESPACE, xform_id)
+
+    return xform_ids
+
+
+@use_master
+def reconcile_profile_counters():
+    """
+    Sets the num_of_submissions of every user profile to the number of
+    submissions to the forms of the user, returns the number of profiles
+    updated.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(PROFILE_COUNTERS_SQL)
+
+        return cursor.rowcount
+
+
+def get_incomplete_media_instances(queryset=None):
+    """
+    Returns the live submissions of the queryset, to active forms, that are
+    not marked as having received all their media.
+    """
+    if queryset is None:
+        queryset = Instance.objects.all()
+
+    return queryset.filter(
+        media_all_received=False, deleted_at__isnull=True,
+        xform__downloadable=True, xform__deleted_at__isnull=True)
+
+
+@use_master
+def reconcile_attachment_counters(queryset=None):
+    """
+    Updates the attachment counts of the submissions returned by
+    get_incomplete_media_instances that drifted, returns the number of
+    submissions updated.
+
+    The expected media of a submission are read from its XML, so the counts
+    are checked one submission at a time. The counts are updated without
+    saving the submission, the data of the submission did not change.
+    """
+    count = 0
+    for instance in queryset_iterator(
+            get_incomplete_media_instances(queryset)):
+        total_media = instance.num_of_media
+        media_count = instance.attachments_count
+        media_all_received = media_count == total_media
+        if (total_media, media_count, media_all_received) == (
+                instance.total_media, instance.media_count,
+                instance.media_all_received):
+            continue
+
+        json = instance.json or {}
+        if json:
+            json.update({
+                TOTAL_MEDIA: total_media,
+                MEDIA_COUNT: media_count,
+                MEDIA_ALL_RECEIVED: media_all_received})
+        Instance.objects.filter(pk=instance.pk).update(
+            total_media=total_media, media_count=media_count,
+            media_all_received=media_all_received, json=json)
+        count += 1
+
+    return count
+
+
+@task()
+def reconcile_counters():
+    """
+    Reconciles the form, user profile and attachment counters, suitable to
+    run periodically with celery beat.
+    """
+    xform_ids = reconcile_xform_counters()
+    num_profiles = reconcile_profile_counters()
+    num_instances = reconcile_attachment_counters()
+
+    return len(xform_ids), num_profiles, num_instances
@@ -1,3 +1,4 @@
+import time
 from collections import OrderedDict
 from itertools import chain
 
@@ -136,11 +137,14 @@ def write_to_csv(path, rows, columns, columns_with_hxl=None,
             hxl_row = [columns_with_hxl.get(col, '') for col in columns]
             hxl_row and writer.writerow(hxl_row)
 
+        files = [path]
+        start_time = time.time()
         for i, row in enumerate(rows, start=1):
             for col in AbstractDataFrameBuilder.IGNORED_COLUMNS:
                 row.pop(col, None)
             writer.writerow([row.get(col, na_rep) for col in columns])
-            track_task_progress(i, total_records)
+            track_task_progress(i, total_records, start_time=start_time,
+                                files=files)
 
 
 class AbstractDataFrameBuilder(object):
@@ -6,12 +6,14 @@ from __future__ import unicode_literals
 
 import csv
 import logging
+import os
 import sys
+import time
 import uuid
 import re
 from builtins import str as text
 from datetime import datetime, date
-from zipfile import ZipFile, ZIP_DEFLATED
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
 
 from celery import current_task
 from django.conf import settings
@@ -20,6 +22,8 @@ from django.utils.translation import ugettext as _
 from future.utils import iteritems
 from openpyxl.utils.datetime import to_excel
 from openpyxl.workbook import Workbook
+import pyarrow
+from pyarrow import parquet
 from pyxform.question import Question
 from pyxform.section import RepeatingSection, Section
 from savReaderWriter import SavWriter
@@ -34,11 +38,13 @@ from onadata.libs.utils.common_tags import (
     PARENT_TABLE_NAME, REPEAT_INDEX_TAGS, SAV_255_BYTES_TYPE,
     SAV_NUMERIC_TYPE, STATUS, SUBMISSION_TIME, SUBMITTED_BY, TAGS, UUID,
     VERSION, XFORM_ID_STRING, REVIEW_STATUS, REVIEW_COMMENT, SELECT_BIND_TYPE)
+from onadata.libs.utils.common_tools import str_to_bool
 from onadata.libs.utils.mongo import _decode_from_mongo, _is_invalid_for_mongo
 # the bind type of select multiples that we use to compare
 GEOPOINT_BIND_TYPE = 'geopoint'
 OSM_BIND_TYPE = 'osm'
 DEFAULT_UPDATE_BATCH = 100
+DEFAULT_PARQUET_ROW_GROUP_SIZE = 10000
 
 YES = 1
 NO = 0
@@ -249,21 +255,61 @@ def is_all_numeric(items):
                      for i in items if isinstance(i, text)]))
 
 
-def track_task_progress(additions, total=None):
+def get_task_progress_meta(additions, total=None, start_time=None,
+                           section=None, bytes_written=None):
+    """
+    Returns the progress meta of an export task: the number of records
+    processed, and when known the total, throughput in records per second,
+    estimated seconds remaining (eta), current section and bytes written.
+    """
+    meta = {'progress': additions}
+    if total:
+        meta['total'] = total
+    if start_time is not None:
+        elapsed = time.time() - start_time
+        if elapsed > 0:
+            rows_per_second = additions / elapsed
+            meta['rows_per_second'] = round(rows_per_second, 2)
+            if total and rows_per_second:
+                meta['eta'] = int(
+                    max(total - additions, 0) / rows_per_second)
+    if section:
+        meta['section'] = section
+    if bytes_written is not None:
+        meta['bytes_written'] = bytes_written
+
+    return meta
+
+
+def get_files_size(file_paths):
+    """
+    Returns the total size in bytes of the files in file_paths that exist.
+    """
+    return sum([os.path.getsize(file_path) for file_path in file_paths
+                if os.path.exists(file_path)])
+
+
+def track_task_progress(additions, total=None, start_time=None,
+                        section=None, files=None):
     """
     Updates the current export task with number of submission processed.
     Updates in batches of settings EXPORT_TASK_PROGRESS_UPDATE_BATCH defaults
     to 100.
     :param additions:
     :param total:
+    :param start_time: time the export started writing records, used to
+                       compute the throughput and ETA
+    :param section: the section currently being written
+    :param files: paths of the files being written, used to compute the
+                  bytes written so far
     :return:
     """
     try:
         if additions % getattr(settings, 'EXPORT_TASK_PROGRESS_UPDATE_BATCH',
                                DEFAULT_UPDATE_BATCH) == 0:
-            meta = {'progress': additions}
-            if total:
-                meta.update({'total': total})
+            meta = get_task_progress_meta(
+                additions, total, start_time, section,
+                get_files_size(files) if files else None)
             current_task.update_state(state='PROGRESS', meta=meta)
     except Exception as e:
         logging.exception(
@@ -305,6 +351,38 @@ def decode_mongo_encoded_section_names(data):
     return results
 
 
+def to_parquet_value(value, data_type):
+    """
+    Coerce a pre-processed export value to the python type pyarrow expects
+    for a column of `data_type`. Values that do not fit the column type are
+    written as nulls.
+
+    :param value: the value to convert
+    :param data_type: the pyarrow DataType of the column
+    :return: the converted value or None
+    """
+    if value is None:
+        return None
+
+    try:
+        if pyarrow.types.is_boolean(data_type):
+            return str_to_bool(value)
+        if pyarrow.types.is_integer(data_type):
+            return int(value)
+        if pyarrow.types.is_floating(data_type):
+            return float(value)
+        if pyarrow.types.is_date(data_type):
+            if isinstance(value, datetime):
+                return value.date()
+            return value if isinstance(value, date) else None
+        if pyarrow.types.is_timestamp(data_type):
+            return value if isinstance(value, datetime) else None
+    except (TypeError, ValueError):
+        return None
+
+    return text(value)
+
+
 class ExportBuilder(object):
     IGNORED_COLUMNS = [XFORM_ID_STRING, STATUS, ATTACHMENTS, GEOLOCATION,
                        BAMBOO_DATASET_ID, DELETEDAT]
@@ -342,6 +420,21 @@ class ExportBuilder(object):
         'dateTime': lambda x: datetime.strptime(x[:19], '%Y-%m-%dT%H:%M:%S')
     }
 
+    # pyarrow types of the columns in parquet exports, any other column is
+    # written as a string column
+    PARQUET_TYPES = {
+        'int': pyarrow.int64(),
+        'decimal': pyarrow.float64(),
+        'date': pyarrow.date32(),
+    }
+    PARQUET_EXTRA_FIELD_TYPES = {
+        ID: pyarrow.int64(),
+        INDEX: pyarrow.int64(),
+        PARENT_INDEX: pyarrow.int64(),
+        SUBMISSION_TIME: pyarrow.timestamp('ms'),
+        DURATION: pyarrow.float64(),
+    }
+
     TRUNCATE_GROUP_TITLE = False
 
     XLS_SHEET_NAME_MAX_CHARS = 31
@@ -786,6 +879,9 @@ class ExportBuilder(object):
         index = 1
         indices = {}
         survey_name = self.survey.name
+        files = [csv_def['csv_file'].name for csv_def in csv_defs.values()]
+        start_time = time.time()
+        current_section = survey_name
         for i, d in enumerate(data, start=1):
             # decode mongo section names
             joined_export = dict_to_joined_export(d, index, indices,
@@ -808,6 +904,8 @@ class ExportBuilder(object):
                 # section name might not exist within the output, e.g. data was
                 # not provided for said repeat - write test to check this
                 row = output.get(section_name, None)
+                if row:
+                    current_section = section_name
                 if isinstance(row, dict):
                     write_row(
                         self.pre_process_row(row, section),
@@ -818,7 +916,10 @@ class ExportBuilder(object):
                             self.pre_process_row(child_row, section),
                             csv_writer, fields)
             index += 1
-            track_task_progress(i, total_records)
+            track_task_progress(
+                i, total_records, start_time=start_time,
+                section=current_section,
+                files=files)
 
         # write zipfile
         with ZipFile(path, 'w', ZIP_DEFLATED, allowZip64=True) as zip_file:
@@ -916,6 +1017,8 @@ class ExportBuilder(object):
         index = 1
         indices = {}
         survey_name = self.survey.name
+        start_time = time.time()
+        current_section = survey_name
         for i, d in enumerate(data, start=1):
             joined_export = dict_to_joined_export(d, index, indices,
                                                   survey_name,
@@ -937,6 +1040,8 @@ class ExportBuilder(object):
                 # section might not exist within the output, e.g. data was
                 # not provided for said repeat - write test to check this
                 row = output.get(section_name, None)
+                if row:
+                    current_section = section_name
                 if isinstance(row, dict):
                     write_row(
                         self.pre_process_row(row, section),
@@ -947,7 +1052,9 @@ class ExportBuilder(object):
                             self.pre_process_row(child_row, section),
                             ws, fields, work_sheet_titles)
             index += 1
-            track_task_progress(i, total_records)
+            track_task_progress(
+                i, total_records, start_time=start_time,
+                section=current_section)
 
         wb.save(filename=path)
 
@@ -1210,6 +1317,9 @@ class ExportBuilder(object):
         index = 1
         indices = {}
         survey_name = self.survey.name
+        files = [sav_def['sav_file'].name for sav_def in sav_defs.values()]
+        start_time = time.time()
+        current_section = survey_name
         for i, d in enumerate(data, start=1):
             # decode mongo section names
             joined_export = dict_to_joined_export(d, index, indices,
@@ -1232,6 +1342,8 @@ class ExportBuilder(object):
                     section['elements']]
                 sav_writer = sav_def['sav_writer']
                 row = output.get(section_name, None)
+                if row:
+                    current_section = section_name
                 if isinstance(row, dict):
                     write_row(
                         self.pre_process_row(row, section),
@@ -1242,7 +1354,10 @@ class ExportBuilder(object):
                             self.pre_process_row(child_row, section),
                             sav_writer, fields)
             index += 1
-            track_task_progress(i, total_records)
+            track_task_progress(
+                i, total_records, start_time=start_time,
+                section=current_section,
+                files=files)
 
         for (section_name, sav_def) in iteritems(sav_defs):
             sav_def['sav_writer'].closeSavFile(
@@ -1260,6 +1375,169 @@ class ExportBuilder(object):
         for (section_name, sav_def) in iteritems(sav_defs):
             sav_def['sav_file'].close()
 
+    def _get_parquet_columns(self, dataview, section):
+        """
+        Return a list of column definitions for the `section` parquet file.
+        Each column is a dict with the row lookup `xpath`, the column `title`,
+        the pyarrow `type`, its `label` and whether the column should be
+        `dictionary` encoded.
+        """
+        section_name = section['name']
+        elements = [element for element in section['elements']
+                    if not dataview or element['title'] in dataview.columns]
+        xpaths = self.get_fields(dataview, section, 'xpath')
+        titles = self.get_fields(dataview, section, 'title')
+        # key the choice columns the way get_fields names them
+        choice_key = '_label_xpath' if self.SHOW_CHOICE_LABELS else 'xpath'
+        select_xpaths = set(self.select_ones.get(section_name, {}))
+        choice_xpaths = set()
+        for (xpath, choices) in iteritems(
+                self.select_multiples.get(section_name, {})):
+            select_xpaths.add(xpath)
+            choice_xpaths.update([choice[choice_key] for choice in choices])
+
+        columns = []
+        for i, (xpath, title) in enumerate(zip(xpaths, titles)):
+            element = elements[i] if i < len(elements) else {}
+            dictionary = xpath in select_xpaths
+            if xpath in choice_xpaths:
+                if self.VALUE_SELECT_MULTIPLES:
+                    data_type = pyarrow.string()
+                    dictionary = True
+                elif self.BINARY_SELECT_MULTIPLES:
+                    data_type = pyarrow.int8()
+                else:
+                    data_type = pyarrow.bool_()
+            elif element:
+                data_type = self.PARQUET_TYPES.get(
+                    element.get('type'), pyarrow.string())
+            else:
+                data_type = self.PARQUET_EXTRA_FIELD_TYPES.get(
+                    xpath, pyarrow.string())
+                dictionary = xpath == PARENT_TABLE_NAME
+            columns.append({
+                'xpath': xpath,
+                'title': title,
+                'type': data_type,
+                'label': element.get('label'),
+                'dictionary': dictionary
+            })
+
+        return columns
+
+    def to_zipped_parquet(self, path, data, *args, **kwargs):
+        """
+        Writes a zip file with one parquet file per section, i.e. the main
+        form and each repeat. Rows are buffered per section and written out
+        in row groups of EXPORT_PARQUET_ROW_GROUP_SIZE rows so that memory use
+        does not grow with the number of submissions.
+        """
+        dataview = kwargs.get('dataview')
+        total_records = kwargs.get('total_records')
+        row_group_size = getattr(settings, 'EXPORT_PARQUET_ROW_GROUP_SIZE',
+                                 DEFAULT_PARQUET_ROW_GROUP_SIZE)
+
+        def write_row(row, parquet_def):
+            for column, values in zip(parquet_def['columns'],
+                                      parquet_def['values']):
+                values.append(
+                    to_parquet_value(row.get(column['xpath']),
+                                     column['type']))
+            if len(parquet_def['values'][0]) >= row_group_size:
+                write_row_group(parquet_def)
+
+        def write_row_group(parquet_def):
+            if not parquet_def['values'] or not parquet_def['values'][0]:
+                return
+            arrays = [
+                pyarrow.array(values, type=column['type'])
+                for column, values in zip(parquet_def['columns'],
+                                          parquet_def['values'])]
+            parquet_def['writer'].write_table(
+                pyarrow.Table.from_arrays(
+                    arrays, schema=parquet_def['schema']))
+            parquet_def['values'] = [[] for _i in parquet_def['columns']]
+
+        parquet_defs = {}
+        for section in self.sections:
+            columns = self._get_parquet_columns(dataview, section)
+            schema = pyarrow.schema([
+                pyarrow.field(
+                    column['title'], column['type'],
+                    metadata={'label': column['label']}
+                    if isinstance(column['label'], text) else None)
+                for column in columns])
+            parquet_file = NamedTemporaryFile(suffix='.parquet')
+            writer = parquet.ParquetWriter(
+                parquet_file.name, schema, compression='snappy',
+                use_dictionary=[column['title'] for column in columns
+                                if column['dictionary']])
+            parquet_defs[section['name']] = {
+                'parquet_file': parquet_file,
+                'writer': writer,
+                'schema': schema,
+                'columns': columns,
+                'values': [[] for _i in columns]}
+
+        media_xpaths = [] if not self.INCLUDE_IMAGES \
+            else self.dd.get_media_survey_xpaths()
+
+        index = 1
+        indices = {}
+        survey_name = self.survey.name
+        files = [parquet_def['parquet_file'].name
+                 for parquet_def in parquet_defs.values()]
+        start_time = time.time()
+        current_section = survey_name
+        for i, d in enumerate(data, start=1):
+            # decode mongo section names
+            joined_export = dict_to_joined_export(d, index, indices,
+                                                  survey_name,
+                                                  self.survey, d,
+                                                  media_xpaths)
+            output = decode_mongo_encoded_section_names(joined_export)
+            # attach meta fields (index, parent_index, parent_table)
+            # output has keys for every section
+            if survey_name not in output:
+                output[survey_name] = {}
+            output[survey_name][INDEX] = index
+            output[survey_name][PARENT_INDEX] = -1
+            for section in self.sections:
+                # get data for this section and buffer it for its file
+                section_name = section['name']
+                parquet_def = parquet_defs[section_name]
+                row = output.get(section_name, None)
+                if row:
+                    current_section = section_name
+                if isinstance(row, dict):
+                    write_row(
+                        self.pre_process_row(row, section), parquet_def)
+                elif isinstance(row, list):
+                    for child_row in row:
+                        write_row(
+                            self.pre_process_row(child_row, section),
+                            parquet_def)
+            index += 1
+            track_task_progress(
+                i, total_records, start_time=start_time,
+                section=current_section,
+                files=files)
+
+        for (section_name, parquet_def) in iteritems(parquet_defs):
+            write_row_group(parquet_def)
+            parquet_def['writer'].close()
+
+        # parquet files are already compressed, store them as is
+        with ZipFile(path, 'w', ZIP_STORED, allowZip64=True) as zip_file:
+            for (section_name, parquet_def) in iteritems(parquet_defs):
+                zip_file.write(
+                    parquet_def['parquet_file'].name,
+                    '_'.join(section_name.split('/')) + '.parquet')
+
+        # close files when we are done
+        for (section_name, parquet_def) in iteritems(parquet_defs):
+            parquet_def['parquet_file'].close()
+
     def get_fields(self, dataview, section, key):
         """
         Return list of element value with the key in section['elements'].
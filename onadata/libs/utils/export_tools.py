@@ -9,6 +9,7 @@ import json
 import os
 import re
 import sys
+import time
 from datetime import datetime, timedelta
 
 import builtins
@@ -35,6 +36,7 @@ from onadata.apps.viewer.models.export import (Export,
                                                get_export_options_query_kwargs)
 from onadata.apps.viewer.models.parsed_instance import query_data
 from onadata.libs.exceptions import J2XException, NoRecordsFoundError
+from onadata.libs.utils.cache_tools import EXPORT_SINGLE_FLIGHT, safe_key
 from onadata.libs.utils.common_tags import (DATAVIEW_EXPORT,
                                             GROUPNAME_REMOVED_FLAG)
 from onadata.libs.utils.common_tools import (str_to_bool,
@@ -74,6 +76,42 @@ def get_export_options(options):
     return export_options
 
 
+def get_export_single_flight_key(xform, export_type, export_options,
+                                 force_xlsx=False):
+    """
+    Returns the cache key shared by identical export requests, i.e. the same
+    xform, export type, export options and file format at the same data
+    version. The data version changes whenever a submission is added, edited
+    or deleted.
+    """
+    data_version = "{}-{}".format(
+        xform.num_of_submissions, xform.time_of_last_submission_update())
+    normalized_options = json.dumps(
+        get_export_options(export_options), sort_keys=True, default=str)
+
+    return EXPORT_SINGLE_FLIGHT + safe_key("{}-{}-{}-{}-{}".format(
+        xform.pk, export_type, normalized_options, bool(force_xlsx),
+        data_version))
+
+
+def get_export_metrics(start_time, records, file_path):
+    """
+    Returns the performance metrics of an export run that started at
+    start_time, processed records and wrote the file at file_path.
+    """
+    duration = time.time() - start_time
+    metrics = {
+        'records': records,
+        'duration': round(duration, 3),
+        'bytes': os.path.getsize(file_path)
+        if os.path.exists(file_path) else None,
+    }
+    if records and duration > 0:
+        metrics['records_per_second'] = round(records / duration, 2)
+
+    return metrics
+
+
 def get_or_create_export(export_id, xform, export_type, options):
     """
     Returns an existing export object or creates a new one with the given
@@ -130,6 +168,7 @@ def generate_export(export_type, xform, export_id=None, options=None):
         Export.CSV_EXPORT: 'to_flat_csv_export',
         Export.CSV_ZIP_EXPORT: 'to_zipped_csv',
         Export.SAV_ZIP_EXPORT: 'to_zipped_sav',
+        Export.PARQUET_EXPORT: 'to_zipped_parquet',
         Export.GOOGLE_SHEETS_EXPORT: 'to_google_sheets',
     }
 
@@ -142,8 +181,8 @@ def generate_export(export_type, xform, export_id=None, options=None):
         dataview = DataView.objects.get(pk=options.get("dataview_pk"))
         records = dataview.query_data(dataview, all_data=True,
                                       filter_query=filter_query)
-        total_records = dataview.query_data(dataview,
-                                            count=True)[0].get('count')
+        total_records = next(dataview.query_data(dataview,
+                                                 count=True)).get('count')
     else:
         records = query_data(xform, query=filter_query, start=start, end=end)
 
@@ -204,6 +243,7 @@ def generate_export(export_type, xform, export_id=None, options=None):
 
     # get the export function by export type
     func = getattr(export_builder, export_type_func_map[export_type])
+    start_time = time.time()
     try:
         func.__call__(
             temp_file.name, records, username, id_string, filter_query,
@@ -221,6 +261,8 @@ def generate_export(export_type, xform, export_id=None, options=None):
         report_exception("SAV Export Failure", e, sys.exc_info())
         return export
 
+    metrics = get_export_metrics(start_time, total_records, temp_file.name)
+
     # generate filename
     basename = "%s_%s" % (
         id_string, datetime.now().strftime("%Y_%m_%d_%H_%M_%S_%f"))
@@ -258,6 +300,7 @@ def generate_export(export_type, xform, export_id=None, options=None):
     export.filedir = dir_name
     export.filename = basename
     export.internal_status = Export.SUCCESSFUL
+    export.metrics = metrics
     # do not persist exports that have a filter
     # Get URL of the exported sheet.
     if export_type == Export.GOOGLE_SHEETS_EXPORT:
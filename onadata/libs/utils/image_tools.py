@@ -51,36 +51,47 @@ def _save_thumbnails(image, path, size, suffix, extension):
 
 
 def resize(filename, extension):
+    """
+    Creates the THUMB_CONF thumbnails of an image in one pass, the image is
+    decoded once and each thumbnail is resized from the previous, larger,
+    one. Returns the sizes of the thumbnails created.
+    """
     if extension == 'non':
         extension = settings.DEFAULT_IMG_FILE_TYPE
     default_storage = get_storage_class()()
+    conf = settings.THUMB_CONF
+    largest = max([conf[key]['size'] for key in settings.THUMB_ORDER])
 
     try:
         with default_storage.open(filename) as image_file:
             image = Image.open(image_file)
-            conf = settings.THUMB_CONF
-
-            for key in settings.THUMB_ORDER:
-                _save_thumbnails(
-                    image, filename,
-                    conf[key]['size'],
-                    conf[key]['suffix'],
-                    extension)
+            # decode JPEGs at the smallest scale that fits the largest size
+            image.draft(image.mode, (largest, largest))
+            image.load()
     except IOError:
         raise Exception("The image file couldn't be identified")
 
+    for key in settings.THUMB_ORDER:
+        path = get_path(filename, conf[key]['suffix'])
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        _save_thumbnails(
+            image, filename, conf[key]['size'], conf[key]['suffix'],
+            extension)
+
+    return list(settings.THUMB_ORDER)
 
-def resize_local_env(filename, extension):
-    if extension == 'non':
-        extension = settings.DEFAULT_IMG_FILE_TYPE
-    default_storage = get_storage_class()()
-    path = default_storage.path(filename)
-    image = Image.open(path)
-    conf = settings.THUMB_CONF
 
-    [_save_thumbnails(
-        image, path, conf[key]['size'],
-        conf[key]['suffix'], extension) for key in settings.THUMB_ORDER]
+def generate_thumbnails(attachment):
+    """
+    Creates the thumbnails of an image attachment and records them on the
+    attachment.
+    """
+    attachment.thumbnails = resize(
+        attachment.media_file.name, attachment.extension)
+    # update the row only, saving the attachment checks the file size
+    attachment.__class__.objects.filter(pk=attachment.pk).update(
+        thumbnails=attachment.thumbnails)
 
 
 def image_url(attachment, suffix):
@@ -93,26 +104,16 @@ def image_url(attachment, suffix):
         return url
     else:
         default_storage = get_storage_class()()
-        fs = get_storage_class('django.core.files.storage.FileSystemStorage')()
 
         if suffix in settings.THUMB_CONF:
             size = settings.THUMB_CONF[suffix]['suffix']
             filename = attachment.media_file.name
 
-            if default_storage.exists(filename):
-                if default_storage.exists(get_path(filename, size)) and\
-                        default_storage.size(get_path(filename, size)) > 0:
-                    url = default_storage.url(
-                        get_path(filename, size))
-                else:
-                    if default_storage.__class__ != fs.__class__:
-                        resize(filename, extension=attachment.extension)
-                    else:
-                        resize_local_env(filename,
-                                         extension=attachment.extension)
-
-                    return image_url(attachment, suffix)
-            else:
-                return None
+            if suffix not in attachment.thumbnails:
+                if not default_storage.exists(filename):
+                    return None
+                generate_thumbnails(attachment)
+
+            url = default_storage.url(get_path(filename, size))
 
     return url
@@ -3,6 +3,7 @@ import re
 import sys
 import tempfile
 from builtins import str as text
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from hashlib import sha256
 from wsgiref.util import FileWrapper
@@ -18,6 +19,7 @@ from django.core.exceptions import (MultipleObjectsReturned, PermissionDenied,
 from django.core.files.storage import get_storage_class
 from django.db import IntegrityError, transaction, DataError
 from django.db.models import Q
+from django.db.models.signals import post_save
 from django.http import (HttpResponse, HttpResponseNotFound,
                          StreamingHttpResponse, UnreadablePostError)
 from django.shortcuts import get_object_or_404
@@ -46,6 +48,7 @@ from onadata.apps.viewer.signals import process_submission
 from onadata.libs.utils.common_tags import METADATA_FIELDS
 from onadata.libs.utils.common_tools import report_exception
 from onadata.libs.utils.model_tools import set_uuid
+from onadata.libs.utils.presigned_uploads import UploadedMediaFile
 from onadata.libs.utils.user_auth import get_user_default_project
 
 OPEN_ROSA_VERSION_HEADER = 'X-OpenRosa-Version'
@@ -241,11 +244,60 @@ def update_attachment_tracking(instance):
                                  'media_all_received', 'json'])
 
 
+def _upload_attachment(attachment):
+    """
+    Stores the media file of an unsaved attachment.
+    """
+    media_file = attachment.media_file
+    # a storage per upload, storage clients may not be thread safe
+    media_file.storage = get_storage_class()()
+    media_file.save(media_file.name, media_file.file, save=False)
+
+
+def upload_attachments(attachments):
+    """
+    Stores the media files of unsaved attachments, uploading up to
+    ATTACHMENT_UPLOAD_CONCURRENCY files at a time.
+    """
+    concurrency = min(
+        getattr(settings, 'ATTACHMENT_UPLOAD_CONCURRENCY', 4),
+        len(attachments))
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(_upload_attachment, attachments))
+    else:
+        for attachment in attachments:
+            _upload_attachment(attachment)
+
+
+def bulk_create_attachments(instance, attachments):
+    """
+    Uploads the media files of the unsaved attachments of a submission
+    concurrently and inserts the attachments in one query.
+    """
+    for attachment in attachments:
+        attachment.set_media_file_fields()
+    # load the objects the upload path needs before the upload threads
+    instance.xform.user  # pylint: disable=pointless-statement
+    # files uploaded straight to the storage are committed already
+    upload_attachments([
+        attachment for attachment in attachments
+        if not attachment.media_file._committed])  # pylint: disable=W0212
+    attachments = Attachment.objects.bulk_create(attachments)
+    for attachment in attachments:
+        post_save.send(sender=Attachment, instance=attachment, created=True,
+                       update_fields=None, raw=False,
+                       using=attachment._state.db)
+
+    return attachments
+
+
 def save_attachments(xform, instance, media_files, remove_deleted_media=False):
     """
     Saves attachments for the given instance/submission.
     """
     # upload_path = os.path.join(instance.xform.user.username, 'attachments')
+    attachments = []
 
     for f in media_files:
         filename, extension = os.path.splitext(f.name)
@@ -261,13 +313,21 @@ def save_attachments(xform, instance, media_files, remove_deleted_media=False):
             [instance.xml.decode('utf-8').find(filename) != -1 if
              isinstance(instance.xml, bytes) else
              instance.xml.find(filename) != -1])
+        media_file = f
+        if isinstance(f, UploadedMediaFile):
+            if f.xform_id != xform.pk:
+                raise PermissionDenied(
+                    _(u"The upload token was issued for another form."))
+            media_file = f.storage_name
         if media_in_submission:
-            Attachment.objects.get_or_create(
+            attachments.append(Attachment(
                 instance=instance,
-                media_file=f,
+                media_file=media_file,
                 mimetype=content_type,
                 name=filename,
-                extension=extension)
+                extension=extension))
+    if attachments:
+        bulk_create_attachments(instance, attachments)
     if remove_deleted_media:
         instance.soft_delete_attachments()
 
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Media file download responses.
+
+Media files are streamed from the storage in blocks and support single range
+HTTP Range requests so that audio and video can be seeked. Depending on the
+settings the web server sends local files, MEDIA_X_ACCEL_REDIRECT_PREFIX or
+MEDIA_X_SENDFILE, or the client is redirected to the signed URL of a remote
+storage, MEDIA_SIGNED_URL_REDIRECT.
+"""
+import re
+from hashlib import md5
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, get_storage_class
+from django.http import (HttpResponse, HttpResponseRedirect,
+                         StreamingHttpResponse)
+from django.utils.six.moves.urllib.parse import quote
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# bytes read from the storage at a time
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+def parse_range_header(range_header, size):
+    """
+    Returns the (first, last) byte positions requested by a Range header for
+    a file of size bytes, None if there is no supported range. Raises a
+    ValueError if the range can not be satisfied.
+    """
+    match = RANGE_RE.match(range_header or u'')
+    if match is None or match.groups() == (u'', u''):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # the last bytes of the file
+        suffix_length = int(last)
+        if suffix_length == 0:
+            raise ValueError(u'Unsatisfiable range %s' % range_header)
+        first = max(size - suffix_length, 0)
+        last = size - 1
+    else:
+        first = int(first)
+        if last and int(last) < first:
+            # invalid ranges are ignored
+            return None
+        last = min(int(last), size - 1) if last else size - 1
+    if first >= size:
+        raise ValueError(u'Unsatisfiable range %s' % range_header)
+
+    return first, last
+
+
+def iter_file(media_file, first, length, block_size=STREAM_BLOCK_SIZE):
+    """
+    Yields length bytes of media_file from position first in blocks and
+    closes the file.
+    """
+    try:
+        if first:
+            media_file.seek(first)
+        while length > 0:
+            data = media_file.read(min(block_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        media_file.close()
+
+
+def get_media_file_response(request, file_name, mimetype, storage=None):
+    """
+    Returns a response that sends the file_name media file of the storage,
+    the default storage if not specified.
+    """
+    storage = storage or get_storage_class()()
+
+    if not isinstance(storage, FileSystemStorage):
+        if getattr(settings, 'MEDIA_SIGNED_URL_REDIRECT', False):
+            return HttpResponseRedirect(storage.url(file_name))
+    elif getattr(settings, 'MEDIA_X_ACCEL_REDIRECT_PREFIX', None):
+        response = HttpResponse(content_type=mimetype)
+        response['X-Accel-Redirect'] = u'{}/{}'.format(
+            settings.MEDIA_X_ACCEL_REDIRECT_PREFIX.rstrip('/'),
+            quote(file_name))
+
+        return response
+    elif getattr(settings, 'MEDIA_X_SENDFILE', False):
+        response = HttpResponse(content_type=mimetype)
+        response['X-Sendfile'] = storage.path(file_name)
+
+        return response
+
+    size = storage.size(file_name)
+    # media files are not modified once stored
+    etag = u'"{}"'.format(
+        md5(u'{}:{}'.format(file_name, size).encode('utf-8')).hexdigest())
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range is None or if_range == etag:
+        try:
+            byte_range = parse_range_header(
+                request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = u'bytes */{}'.format(size)
+
+            return response
+
+    media_file = storage.open(file_name, 'rb')
+    if byte_range is None:
+        length = size
+        response = StreamingHttpResponse(
+            iter_file(media_file, 0, length), content_type=mimetype)
+    else:
+        first, last = byte_range
+        length = last - first + 1
+        response = StreamingHttpResponse(
+            iter_file(media_file, first, length), content_type=mimetype,
+            status=206)
+        response['Content-Range'] = u'bytes {}-{}/{}'.format(
+            first, last, size)
+    response['Content-Length'] = length
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+
+    return response
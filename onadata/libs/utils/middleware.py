@@ -11,6 +11,8 @@ from django.utils.translation import ugettext as _
 from django.utils.translation.trans_real import parse_accept_lang_header
 from multidb.pinning import use_master
 
+from onadata.libs.utils.permission_cache import permission_cache
+
 
 class BaseMiddleware:
     def __init__(self, get_response):
@@ -94,3 +96,12 @@ class OperationalErrorMiddleware(BaseMiddleware):
                         response = self.get_response(request)
                         return response
                 settings.ALREADY_RAISED = False
+
+
+class PermissionCacheMiddleware(BaseMiddleware):
+    """
+    Caches the object permissions checked while handling a request.
+    """
+    def __call__(self, request):
+        with permission_cache():
+            return self.get_response(request)
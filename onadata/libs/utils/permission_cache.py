@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Object permission cache.
+
+Within a permission cache scope, i.e. a request handled by
+PermissionCacheMiddleware, the django-guardian object permissions of a user
+are fetched once per object and answered from memory afterwards. With
+PERMISSIONS_CACHE_TTL set the permissions are also shared between requests
+and processes through the django cache.
+
+Any change to object permissions or group membership clears the scope and
+invalidates the shared permissions.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from guardian.core import ObjectPermissionChecker
+
+from onadata.libs.utils.cache_tools import (PERMISSIONS_CACHE,
+                                            PERMISSIONS_CACHE_VERSION)
+
+_local = threading.local()
+
+# the guardian object permission models, generic and with direct foreign keys
+OBJECT_PERMISSION_MODELS = (
+    'guardian.UserObjectPermission',
+    'guardian.GroupObjectPermission',
+    'api.OrgProfileUserObjectPermission',
+    'api.OrgProfileGroupObjectPermission',
+    'logger.ProjectUserObjectPermission',
+    'logger.ProjectGroupObjectPermission',
+    'logger.XFormUserObjectPermission',
+    'logger.XFormGroupObjectPermission',
+    'main.UserProfileUserObjectPermission',
+    'main.UserProfileGroupObjectPermission',
+)
+
+
+class CachedObjectPermissionChecker(ObjectPermissionChecker):
+    """
+    ObjectPermissionChecker that shares the permissions it fetches through
+    the django cache for PERMISSIONS_CACHE_TTL seconds. The shared
+    permissions are per superuser status, inactive users have none.
+    """
+
+    def __init__(self, user_or_group=None, version=None):
+        super(CachedObjectPermissionChecker, self).__init__(user_or_group)
+        self.version = version
+
+    def get_perms(self, obj):
+        if self.user is not None and not self.user.is_active:
+            return []
+
+        local_key = self.get_local_cache_key(obj)
+        ttl = getattr(settings, 'PERMISSIONS_CACHE_TTL', 0)
+        if local_key in self._obj_perms_cache or not ttl or \
+                self.user is None or self.version is None:
+            return super(CachedObjectPermissionChecker, self).get_perms(obj)
+
+        cache_key = u'{}{}-{}-{}-{}-{}'.format(
+            PERMISSIONS_CACHE, self.version, self.user.pk,
+            int(self.user.is_superuser), *local_key)
+        perms = cache.get(cache_key)
+        if perms is None:
+            perms = super(CachedObjectPermissionChecker, self).get_perms(obj)
+            cache.set(cache_key, perms, ttl)
+        else:
+            self._obj_perms_cache[local_key] = perms
+
+        return perms
+
+
+def _get_scope():
+    return getattr(_local, 'scope', None)
+
+
+def _get_version():
+    version = cache.get(PERMISSIONS_CACHE_VERSION)
+    if version is None:
+        cache.add(PERMISSIONS_CACHE_VERSION, 1, None)
+        version = cache.get(PERMISSIONS_CACHE_VERSION)
+
+    return version
+
+
+@contextmanager
+def permission_cache():
+    """
+    Caches the object permissions checked within the block.
+    """
+    previous_scope = _get_scope()
+    _local.scope = {}
+    try:
+        yield
+    finally:
+        _local.scope = previous_scope
+
+
+def get_permission_checker(user):
+    """
+    Returns the ObjectPermissionChecker of the user. Within a permission
+    cache scope the checker, and the permissions it fetched, are reused.
+    """
+    scope = _get_scope()
+    if scope is None:
+        return ObjectPermissionChecker(user)
+
+    checker = scope.get(user.pk)
+    if checker is None or checker.user.is_active != user.is_active or \
+            checker.user.is_superuser != user.is_superuser:
+        version = _get_version() \
+            if getattr(settings, 'PERMISSIONS_CACHE_TTL', 0) else None
+        checker = CachedObjectPermissionChecker(user, version)
+        scope[user.pk] = checker
+
+    return checker
+
+
+def prefetch_perms(user, objects):
+    """
+    Fetches the permissions of the user on all objects, which must be of the
+    same model, in one query within a permission cache scope.
+    """
+    if _get_scope() is not None and user.pk is not None and objects:
+        get_permission_checker(user).prefetch_perms(objects)
+
+
+def invalidate_permission_cache():
+    """
+    Forgets the object permissions cached in the current scope and the ones
+    shared through the django cache.
+    """
+    scope = _get_scope()
+    if scope:
+        scope.clear()
+    if getattr(settings, 'PERMISSIONS_CACHE_TTL', 0):
+        try:
+            cache.incr(PERMISSIONS_CACHE_VERSION)
+        except ValueError:
+            cache.add(PERMISSIONS_CACHE_VERSION, 1, None)
+
+
+def object_permission_changed(sender, instance, **kwargs):
+    """
+    Invalidates the permission cache when object permissions change.
+    """
+    invalidate_permission_cache()
+
+
+for permission_model in OBJECT_PERMISSION_MODELS:
+    post_save.connect(
+        object_permission_changed, sender=permission_model,
+        dispatch_uid='permission_cache_post_save_' + permission_model)
+    post_delete.connect(
+        object_permission_changed, sender=permission_model,
+        dispatch_uid='permission_cache_post_delete_' + permission_model)
+
+
+@receiver(m2m_changed, sender=User.groups.through,
+          dispatch_uid='permission_cache_groups_changed')
+def user_groups_changed(sender, action, **kwargs):
+    """
+    Invalidates the permission cache when users join or leave groups.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_permission_cache()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Direct to storage media uploads.
+
+With PRESIGNED_UPLOADS_ENABLED and an S3 compatible default storage, e.g.
+AWS S3 or MinIO through AWS_S3_ENDPOINT_URL, clients request presigned
+upload URLs for the media files of a submission, upload the files straight
+to the storage and post the submission XML with the upload tokens in the
+uploaded_media field. The server checks the uploaded objects and creates the
+attachments without the media files going through the app.
+"""
+import os
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.files.storage import get_storage_class
+from django.utils.translation import ugettext as _
+
+from onadata.apps.logger.models import Attachment
+from onadata.libs.utils.cache_tools import PRESIGNED_UPLOAD_USED
+
+PRESIGNED_UPLOAD_SALT = 'onadata.presigned_upload'
+
+
+class UploadedMediaFile(object):
+    """
+    A media file uploaded straight to the storage, stored as storage_name.
+    """
+
+    def __init__(self, storage_name, name, content_type, xform_id):
+        self.storage_name = storage_name
+        self.name = name
+        self.content_type = content_type
+        self.xform_id = xform_id
+
+
+def get_presigned_upload_storage():
+    """
+    Returns the default storage if it supports presigned uploads and they
+    are enabled, None otherwise.
+    """
+    storage = get_storage_class()()
+    if getattr(settings, 'PRESIGNED_UPLOADS_ENABLED', False) and \
+            hasattr(storage, 'bucket'):
+        return storage
+
+    return None
+
+
+def get_upload_name(xform, filename):
+    """
+    Returns a unique storage name for a media file of a submission to xform.
+    """
+    folder = "{}_{}".format(xform.id, xform.id_string)
+
+    return os.path.join(
+        xform.user.username, 'attachments', folder, uuid.uuid4().hex,
+        os.path.basename(filename))
+
+
+def get_upload_token(storage_name, name, content_type, xform, user):
+    """
+    Returns the signed token the user submits to reference an upload.
+    """
+    return signing.dumps({
+        'storage_name': storage_name,
+        'name': name,
+        'content_type': content_type,
+        'xform': xform.pk,
+        'id_string': xform.id_string,
+        'user': user.pk,
+    }, salt=PRESIGNED_UPLOAD_SALT)
+
+
+def create_presigned_upload(storage, xform, user, name, content_type):
+    """
+    Returns the presigned URL to upload a media file of a submission to xform
+    and the token that references the upload.
+    """
+    name = os.path.basename(name)
+    storage_name = get_upload_name(xform, name)
+    params = {
+        'Bucket': storage.bucket.name,
+        # pylint: disable=protected-access
+        'Key': storage._normalize_name(storage_name),
+    }
+    headers = {}
+    if content_type:
+        params['ContentType'] = headers['Content-Type'] = content_type
+    url = storage.bucket.meta.client.generate_presigned_url(
+        'put_object', Params=params,
+        ExpiresIn=getattr(settings, 'PRESIGNED_UPLOAD_EXPIRY', 3600))
+
+    return {
+        'name': name,
+        'url': url,
+        'method': 'PUT',
+        'headers': headers,
+        'token': get_upload_token(
+            storage_name, name, content_type, xform, user),
+    }
+
+
+def release_uploaded_media_files(media_files):
+    """
+    Releases the upload tokens of the UploadedMediaFile objects of a
+    submission that was not saved, so they can be submitted again.
+    """
+    cache.delete_many([
+        PRESIGNED_UPLOAD_USED + media_file.storage_name
+        for media_file in media_files])
+
+
+def get_uploaded_media_files(tokens, user, xform_pk=None, id_string=None):
+    """
+    Returns the UploadedMediaFile objects of the upload tokens of a
+    submission, raises a ValueError if a token is not valid for the user or
+    the submitted form, the file was not uploaded or the token was already
+    used.
+
+    A token is used once it is returned here, until it is released with
+    release_uploaded_media_files or expires, and for good once its file is
+    attached to a submission.
+    """
+    storage = get_storage_class()()
+    # leave time to submit after the upload URL expired
+    max_age = getattr(settings, 'PRESIGNED_UPLOAD_EXPIRY', 3600) * 2
+    media_files = []
+    try:
+        for token in tokens:
+            try:
+                upload = signing.loads(
+                    token, salt=PRESIGNED_UPLOAD_SALT, max_age=max_age)
+            except signing.BadSignature:
+                raise ValueError(_(u"Invalid or expired upload token."))
+            if upload['user'] != user.pk:
+                raise ValueError(_(u"Invalid or expired upload token."))
+            if (xform_pk is not None and
+                    upload['xform'] != int(xform_pk)) or \
+                    (id_string is not None and
+                     upload.get('id_string') != id_string):
+                raise ValueError(
+                    _(u"The upload token was issued for another form."))
+            if not storage.exists(upload['storage_name']):
+                raise ValueError(
+                    _(u"The media file %(name)s was not uploaded.")
+                    % {'name': upload['name']})
+            # claim the token, only one submission can add the key
+            if not cache.add(PRESIGNED_UPLOAD_USED + upload['storage_name'],
+                             True, max_age):
+                raise ValueError(_(u"The upload token was already used."))
+            media_file = UploadedMediaFile(
+                upload['storage_name'], upload['name'],
+                upload['content_type'], upload['xform'])
+            media_files.append(media_file)
+            if Attachment.objects.filter(
+                    media_file=upload['storage_name']).exists():
+                raise ValueError(_(u"The upload token was already used."))
+    except ValueError:
+        release_uploaded_media_files(media_files)
+        raise
+
+    return media_files
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Submission map vector tile utility functions.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils.translation import ugettext as _
+
+from onadata.libs.utils.cache_tools import VECTOR_TILE_CACHE, safe_key
+
+# half the width of the world in web mercator (EPSG:3857) metres
+WEB_MERCATOR_EXTENT = 20037508.342789244
+MAX_TILE_ZOOM = 24
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+TILE_LAYER_NAME = 'submissions'
+
+TILE_ENVELOPE_SQL = "ST_MakeEnvelope(%s, %s, %s, %s, 3857)"
+
+# One feature per submission, carrying the submission id.
+POINTS_TILE_SQL = """
+WITH mvtgeom AS (
+    SELECT ST_AsMVTGeom(
+               ST_Transform(ST_CollectionExtract(i.geom, 1), 3857),
+               {envelope}, %s, %s, true) AS geom,
+           i.id AS id
+    FROM logger_instance i
+    WHERE i.id IN ({subquery})
+    AND i.geom && ST_Transform({envelope}, 4326)
+)
+SELECT ST_AsMVT(mvtgeom.*, %s, %s, 'geom') FROM mvtgeom
+WHERE mvtgeom.geom IS NOT NULL
+"""
+
+# One feature per grid cell, carrying the number of submissions in the cell
+# and the submission id when the cell holds a single submission.
+CLUSTERED_TILE_SQL = """
+WITH points AS (
+    SELECT ST_Transform(ST_Centroid(i.geom), 3857) AS geom, i.id AS id
+    FROM logger_instance i
+    WHERE i.id IN ({subquery})
+    AND i.geom && ST_Transform({envelope}, 4326)
+), mvtgeom AS (
+    SELECT ST_AsMVTGeom(
+               ST_Centroid(ST_Collect(points.geom)),
+               {envelope}, %s, %s, true) AS geom,
+           count(*) AS point_count,
+           CASE WHEN count(*) = 1 THEN min(points.id) END AS id
+    FROM points
+    GROUP BY ST_SnapToGrid(points.geom, %s)
+)
+SELECT ST_AsMVT(mvtgeom.*, %s, %s, 'geom') FROM mvtgeom
+WHERE mvtgeom.geom IS NOT NULL
+"""
+
+
+def get_tile_bounds(zoom, x, y):
+    """
+    Returns the web mercator (xmin, ymin, xmax, ymax) bounds of the z/x/y
+    tile, raises ValueError for tiles outside the tile grid.
+    """
+    zoom, x, y = int(zoom), int(x), int(y)
+    num_tiles = 2 ** zoom if 0 <= zoom <= MAX_TILE_ZOOM else 0
+    if not (0 <= x < num_tiles and 0 <= y < num_tiles):
+        raise ValueError(_(u"Invalid tile %(z)s/%(x)s/%(y)s." % {
+            'z': zoom, 'x': x, 'y': y}))
+
+    tile_size = 2 * WEB_MERCATOR_EXTENT / num_tiles
+    xmin = -WEB_MERCATOR_EXTENT + x * tile_size
+    ymax = WEB_MERCATOR_EXTENT - y * tile_size
+
+    return xmin, ymax - tile_size, xmin + tile_size, ymax
+
+
+def get_tile_cache_key(xform, queryset, zoom, x, y):
+    """
+    Returns the cache key of a tile. The key changes with the form data
+    version, i.e. whenever a submission is added, edited or deleted, and
+    with the submissions queryset filters.
+    """
+    data_version = "{}-{}".format(
+        xform.num_of_submissions, xform.time_of_last_submission_update())
+    sql, params = queryset.query.sql_with_params()
+
+    return VECTOR_TILE_CACHE + safe_key("{}-{}-{}-{}-{}/{}/{}".format(
+        xform.pk, data_version, sql, params, zoom, x, y))
+
+
+def get_vector_tile(xform, queryset, zoom, x, y):
+    """
+    Returns the z/x/y Mapbox vector tile of the geom of the submissions in
+    queryset. Submissions are clustered on a grid at zoom levels up to
+    VECTOR_TILE_CLUSTER_MAX_ZOOM.
+    """
+    zoom, x, y = int(zoom), int(x), int(y)
+    bounds = list(get_tile_bounds(zoom, x, y))
+    queryset = queryset.order_by().values('pk')
+    cache_key = get_tile_cache_key(xform, queryset, zoom, x, y)
+    tile = cache.get(cache_key)
+    if tile is not None:
+        return tile
+
+    subquery, subquery_params = queryset.query.sql_with_params()
+    cluster_max_zoom = getattr(settings, 'VECTOR_TILE_CLUSTER_MAX_ZOOM', 12)
+    if zoom <= cluster_max_zoom:
+        grid = getattr(settings, 'VECTOR_TILE_CLUSTER_GRID', 64)
+        cell_size = (bounds[2] - bounds[0]) * grid / TILE_EXTENT
+        sql = CLUSTERED_TILE_SQL.format(
+            envelope=TILE_ENVELOPE_SQL, subquery=subquery)
+        params = list(subquery_params) + bounds + bounds + [
+            TILE_EXTENT, TILE_BUFFER, cell_size, TILE_LAYER_NAME,
+            TILE_EXTENT]
+    else:
+        sql = POINTS_TILE_SQL.format(
+            envelope=TILE_ENVELOPE_SQL, subquery=subquery)
+        params = bounds + [TILE_EXTENT, TILE_BUFFER] + \
+            list(subquery_params) + bounds + [TILE_LAYER_NAME, TILE_EXTENT]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    tile = bytes(row[0]) if row and row[0] is not None else b''
+    cache.set(
+        cache_key, tile, getattr(settings, 'VECTOR_TILE_CACHE_TTL', 3600))
+
+    return tile
@@ -167,6 +167,7 @@ MIDDLEWARE = (
     'django.middleware.csrf.CsrfViewMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'onadata.libs.utils.middleware.PermissionCacheMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'onadata.libs.utils.middleware.HTTPResponseNotAllowedMiddleware',
     'onadata.libs.utils.middleware.OperationalErrorMiddleware',
@@ -281,7 +282,7 @@ AUTH_PROFILE_MODULE = 'onadata.apps.main.UserProfile'
 # case insensitive usernames
 AUTHENTICATION_BACKENDS = (
     'onadata.apps.main.backends.ModelBackend',
-    'guardian.backends.ObjectPermissionBackend',
+    'onadata.apps.main.backends.ObjectPermissionBackend',
 )
 
 # Settings for Django Registration
@@ -430,12 +431,28 @@ THUMB_CONF = {
 THUMB_ORDER = ['large', 'medium', 'small']
 DEFAULT_IMG_FILE_TYPE = 'jpg'
 
+# Media file downloads, by default files are streamed by the app. Set
+# MEDIA_X_ACCEL_REDIRECT_PREFIX to the internal nginx location of MEDIA_ROOT
+# or MEDIA_X_SENDFILE to let the web server send local files, and
+# MEDIA_SIGNED_URL_REDIRECT to redirect to the (signed) URL of remote storages
+MEDIA_X_ACCEL_REDIRECT_PREFIX = None
+MEDIA_X_SENDFILE = False
+MEDIA_SIGNED_URL_REDIRECT = False
+# media files of a submission uploaded to the storage at the same time
+ATTACHMENT_UPLOAD_CONCURRENCY = 4
+# let clients upload submission media straight to an S3 compatible default
+# storage through presigned URLs valid for PRESIGNED_UPLOAD_EXPIRY seconds
+PRESIGNED_UPLOADS_ENABLED = False
+PRESIGNED_UPLOAD_EXPIRY = 3600
+
 # celery
 CELERY_RESULT_BACKEND = 'django-db'
 CELERY_TASK_ALWAYS_EAGER = False
 CELERY_TASK_IGNORE_RESULT = False
 CELERY_TASK_TRACK_STARTED = True
-CELERY_IMPORTS = ('onadata.libs.utils.csv_import',)
+CELERY_IMPORTS = ('onadata.libs.utils.csv_import',
+                  'onadata.libs.utils.counter_tools',
+                  'onadata.apps.messaging.coalescer')
 
 
 CSV_FILESIZE_IMPORT_ASYNC_THRESHOLD = 100000  # Bytes
@@ -448,6 +465,37 @@ ZIP_EXPORT_COUNTDOWN = 3600  # 1 hour
 # number of records on export or CSV import before a progress update
 EXPORT_TASK_PROGRESS_UPDATE_BATCH = 1000
 EXPORT_TASK_LIFESPAN = 6  # six hours
+# number of rows buffered per section before a parquet row group is written
+EXPORT_PARQUET_ROW_GROUP_SIZE = 10000
+# seconds identical export requests attach to an in-flight export
+EXPORT_SINGLE_FLIGHT_TIMEOUT = 3600
+# Route export tasks to size-tiered queues so that large exports do not
+# starve submission processing on the default queue. Each tier is a dict
+# with the "queue" name, the "max_submissions" of the forms it handles (None
+# for no limit) and optional "priority", "time_limit" and "soft_time_limit"
+# (seconds). Forms are matched against the tiers in order. Run workers with
+# the desired concurrency on each queue, see script/etc/default. Exports
+# run on the default queue when no tiers are configured.
+EXPORT_TASK_QUEUES = []
+
+# Submission map vector tiles: seconds a rendered tile is cached for (tiles
+# are keyed by the form data version) and the highest zoom level at which
+# points are clustered into grid cells of VECTOR_TILE_CLUSTER_GRID pixels
+VECTOR_TILE_CACHE_TTL = 3600
+VECTOR_TILE_CLUSTER_MAX_ZOOM = 12
+VECTOR_TILE_CLUSTER_GRID = 64
+
+# Seconds the object permissions of a user are shared between requests for
+# through the cache, 0 caches them for the duration of a request only
+PERMISSIONS_CACHE_TTL = 0
+
+# Seconds namespaced values read through cache_tools are kept in an
+# in-process LRU cache of LOCAL_CACHE_MAX_SIZE values in front of the shared
+# cache, 0 disables it. Bumping a namespace changes the keys of its values,
+# the namespace versions and other values are always read from the shared
+# cache.
+LOCAL_CACHE_TTL = 0
+LOCAL_CACHE_MAX_SIZE = 1000
 
 # default content length for submission requests
 DEFAULT_CONTENT_LENGTH = 10000000
@@ -573,6 +621,30 @@ LOCKOUT_TIME = 30 * 60
 MAX_LOGIN_ATTEMPTS = 10
 SUPPORT_EMAIL = "support@example.com"
 FULL_MESSAGE_PAYLOAD = False
+# Seconds to aggregate the submission messages of a form for, the messages
+# are then sent as one message with the list of submission ids. A batch is
+# sent early once it has NOTIFICATION_BATCH_MAX_SIZE submissions. Batches
+# are kept in the cache and sent by celery tasks. Set to 0 to send a message
+# per submission.
+NOTIFICATION_BATCH_WINDOW = 0
+NOTIFICATION_BATCH_MAX_SIZE = 1000
+
+# Rest service (webhook) delivery: the (connect, read) request timeout in
+# seconds, failed deliveries are retried RESTSERVICE_MAX_RETRIES times after
+# RESTSERVICE_RETRY_BACKOFF * 2 ** attempt seconds and then stored as dead
+# letters. At most RESTSERVICE_MAX_CONCURRENCY deliveries run at a time for
+# a service, a delivery waits RESTSERVICE_MAX_SLOT_WAITS times for a slot
+# before it is stored as a dead letter. RESTSERVICE_POOL_SIZE connections
+# are kept alive per host.
+RESTSERVICE_TIMEOUT = (5, 30)
+RESTSERVICE_MAX_RETRIES = 5
+RESTSERVICE_RETRY_BACKOFF = 10
+RESTSERVICE_MAX_CONCURRENCY = 4
+RESTSERVICE_MAX_SLOT_WAITS = 30
+RESTSERVICE_POOL_SIZE = 10
+# seconds a rest service in batch mode waits for the submissions being saved
+# to the form before it reads the next batch, it tries again later otherwise
+RESTSERVICE_BATCH_LOCK_TIMEOUT = 1
 
 # Project & XForm Visibility Settings
 ALLOW_PUBLIC_DATASETS = True
@@ -65,6 +65,39 @@ MIDDLEWARE_CLASSES += ('django.middleware.cache.UpdateCacheMiddleware',
 CACHE_MIDDLEWARE_SECONDS = 3600  # 1 hour
 CACHE_MIDDLEWARE_KEY_PREFIX = ''
 
+# Size-tiered export queues, run workers for each queue e.g.
+# celery worker -A onadata.celery -Q exports_small --concurrency=4
+EXPORT_TASK_QUEUES = [
+    {'queue': 'exports_small', 'max_submissions': 10000, 'priority': 9,
+     'soft_time_limit': 1800, 'time_limit': 2100},
+    {'queue': 'exports_medium', 'max_submissions': 100000, 'priority': 5,
+     'soft_time_limit': 3 * 3600, 'time_limit': 3 * 3600 + 300},
+    {'queue': 'exports_large', 'max_submissions': None, 'priority': 1,
+     'soft_time_limit': 6 * 3600, 'time_limit': 6 * 3600 + 300},
+]
+# declare queues with x-max-priority so that the tier priorities apply
+CELERY_TASK_QUEUE_MAX_PRIORITY = 10
+# reconcile the submission and attachment counters once a day, run with
+# celery beat -A onadata.celery
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-counters': {
+        'task': 'onadata.libs.utils.counter_tools.reconcile_counters',
+        'schedule': 24 * 3600,
+    },
+}
+
+# send one submission message per form every 5 seconds
+NOTIFICATION_BATCH_WINDOW = 5
+
+# share object permissions between requests for 5 minutes
+PERMISSIONS_CACHE_TTL = 300
+
+# keep hot cache values in process memory for 5 seconds
+LOCAL_CACHE_TTL = 5
+
+# redirect media downloads to the signed URLs of remote storages e.g. S3
+MEDIA_SIGNED_URL_REDIRECT = True
+
 REST_SERVICES_TO_MODULES = {
     'google_sheets': 'google_export.services',
 }
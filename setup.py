@@ -76,6 +76,8 @@ setup(
         "pyxform",
         # spss
         "savreaderwriter",
+        # parquet
+        "pyarrow",
         # tests
         "mock",
         "httmock",